@@ -0,0 +1,11 @@
+"""
+Benchmarks do Email Processor API.
+
+Execute a partir do diretório backend, por exemplo:
+    python -m benchmarks.bench_ai_concurrency
+
+Suíte completa em JSON e comparação entre commits:
+    python -m benchmarks.suite --output base.json
+    python -m benchmarks.suite --output candidato.json
+    python -m benchmarks.compare base.json candidato.json
+"""
@@ -0,0 +1,71 @@
+"""
+Mede requisições/segundo de chamadas concorrentes a /processar.
+
+Compara a chamada síncrona antiga (bloqueia o event loop) com o caminho
+assíncrono atual do GeminiAIService, usando um modelo falso local.
+
+    python -m benchmarks.bench_ai_concurrency --requests 64 --latency 0.2
+"""
+import argparse
+import asyncio
+
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+
+from .common import Timer, build_client, report
+from .fakes import FakeGeminiModel
+
+EMAIL_BODY = "Olá, preciso de ajuda com o status do meu pedido número 12345, que ainda não chegou."
+
+
+class BlockingGeminiAIService(GeminiAIService):
+    """Reproduz o comportamento anterior: chamada síncrona dentro do handler assíncrono"""
+    
+    async def _generate(self, prompt: str, generation_config=None) -> str:
+        return self._model.generate_content(prompt, generation_config=generation_config).text
+
+
+async def _run(ai_service: GeminiAIService, requests: int) -> float:
+    async with build_client(ai_service) as client:
+        async def call():
+            response = await client.post("/processar", data={"body": EMAIL_BODY})
+            response.raise_for_status()
+        
+        with Timer() as timer:
+            await asyncio.gather(*(call() for _ in range(requests)))
+    
+    return timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64, help="Chamadas concorrentes a /processar")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência simulada do modelo (s)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Limite de chamadas simultâneas ao modelo")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    rows = []
+    variants = [
+        ("antes (bloqueante)", BlockingGeminiAIService),
+        ("depois (assíncrono)", GeminiAIService),
+    ]
+    
+    for label, service_class in variants:
+        service = service_class(
+            "benchmark",
+            max_concurrency=args.concurrency,
+            model=FakeGeminiModel(latency=args.latency)
+        )
+        elapsed = asyncio.run(_run(service, args.requests))
+        rows.append({
+            "variante": label,
+            "requisicoes": args.requests,
+            "tempo_s": elapsed,
+            "req_por_s": args.requests / elapsed,
+        })
+    
+    report("concorrência /processar", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
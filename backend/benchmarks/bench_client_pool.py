@@ -0,0 +1,146 @@
+"""
+Chamadas concorrentes ao Gemini contra upstreams falsos com cota (429 acima
+de N chamadas por segundo ou de M simultâneas, latência crescendo com a
+carga): concorrência fixa com uma chave, como antes do pool, contra o pool
+com limite adaptativo (AIMD) com uma e com várias chaves. Todas as
+variantes passam pelo wrapper de resiliência (retries com backoff).
+
+    python -m benchmarks.bench_client_pool --requests 300 --concurrency 32 --keys 3
+"""
+import argparse
+import asyncio
+import random
+import statistics
+from typing import Dict, List
+
+from src.domain.entities.email import Email, ProcessedText
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+from src.infrastructure.external.gemini_client_pool import GeminiClientPool, PooledClient
+from src.infrastructure.resilience.adaptive_limiter import AdaptiveConcurrencyLimit
+from src.infrastructure.resilience.circuit_breaker import CircuitBreaker
+from src.infrastructure.resilience.resilient_ai_service import ResilientAIService
+
+from .common import Timer, report
+from .fakes import QuotaFakeGeminiModel
+
+
+def build_service(models: List[QuotaFakeGeminiModel], adaptive: bool, max_concurrency: int, seed: int):
+    if adaptive:
+        pool = GeminiClientPool([
+            PooledClient(
+                name=f"chave{index}",
+                model=model,
+                limit=AdaptiveConcurrencyLimit(max_limit=max_concurrency, cooldown_seconds=0.2, max_cooldown_seconds=2.0)
+            )
+            for index, model in enumerate(models)
+        ])
+        base = GeminiAIService("benchmark", model=pool, max_concurrency=max_concurrency * len(models), propagate_errors=True)
+    else:
+        pool = None
+        base = GeminiAIService("benchmark", model=models[0], max_concurrency=max_concurrency, propagate_errors=True)
+    
+    service = ResilientAIService(
+        base,
+        circuit_breaker=CircuitBreaker(failure_threshold=5, reset_timeout=1.0),
+        timeout_seconds=2.0,
+        deadline_seconds=5.0,
+        max_retries=2,
+        backoff_base=0.05,
+        backoff_max=0.4,
+        rng=random.Random(seed)
+    )
+    return service, pool
+
+
+async def run_variant(
+    keys: int,
+    adaptive: bool,
+    requests: int,
+    concurrency: int,
+    quota: Dict,
+    max_concurrency: int,
+    seed: int
+) -> Dict:
+    models = [QuotaFakeGeminiModel(seed=seed + index, **quota) for index in range(keys)]
+    service, pool = build_service(models, adaptive, max_concurrency, seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def one(index: int):
+        nonlocal errors
+        text = f"Solicito atualização do chamado {index} aberto na semana passada."
+        async with semaphore:
+            with Timer() as timer:
+                result = await service.analyze_email(Email(content=text), ProcessedText(text, text))
+        latencies.append(timer.elapsed * 1000)
+        errors += result.error is not None
+    
+    with Timer() as total:
+        await asyncio.gather(*(one(index) for index in range(requests)))
+    
+    latencies.sort()
+    row = {
+        "sucessos_s": round((requests - errors) / total.elapsed, 1),
+        "sucesso": f"{1 - errors / requests:.0%}",
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1),
+        "respostas_429": sum(model.rejected for model in models),
+        "pico_simultaneas": max(model.peak_in_flight for model in models),
+    }
+    if pool is not None:
+        row["limites_finais"] = "/".join(str(client["limit"]) for client in pool.stats()["clients"].values())
+    return row
+
+
+async def run(
+    requests: int = 300,
+    concurrency: int = 32,
+    keys: int = 3,
+    rate: int = 40,
+    max_concurrent: int = 8,
+    latency: float = 0.05,
+    congestion: float = 0.1,
+    max_concurrency: int = 32,
+    seed: int = 42
+) -> List[Dict]:
+    quota = dict(
+        requests_per_window=rate, max_concurrent=max_concurrent, latency=latency, congestion=congestion
+    )
+    rows = []
+    
+    for variant, variant_keys, adaptive in [
+        ("fixa, 1 chave", 1, False),
+        ("adaptativa, 1 chave", 1, True),
+        (f"adaptativa, {keys} chaves", keys, True),
+    ]:
+        row = {"variante": variant}
+        row.update(await run_variant(variant_keys, adaptive, requests, concurrency, quota, max_concurrency, seed))
+        rows.append(row)
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32, help="Emails analisados ao mesmo tempo")
+    parser.add_argument("--keys", type=int, default=3, help="Chaves do pool na última variante")
+    parser.add_argument("--rate", type=int, default=40, help="Cota de cada chave (chamadas por segundo)")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Chamadas simultâneas aceitas por chave")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--congestion", type=float, default=0.1, help="Aumento da latência por chamada em andamento")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="AI_MAX_CONCURRENCY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    rows = asyncio.run(run(
+        args.requests, args.concurrency, args.keys, args.rate, args.max_concurrent,
+        args.latency, args.congestion, args.max_concurrency, args.seed
+    ))
+    report("pool de clientes do Gemini com cota", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Cold start do app (como em uma função serverless da Vercel): cada execução
+é um processo Python novo que importa `main` com `-X importtime` e faz a
+primeira requisição a /health e a /preprocess. Compara a inicialização
+eager com a lazy (LAZY_INIT=true) e indica se o SDK do Gemini e o PyPDF2
+foram carregados.
+
+    python -m benchmarks.bench_cold_start --repeat 5 --top 10
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+from .common import Timer, report
+
+# Executado no processo filho: importa o app e mede as primeiras respostas
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+import_s = time.perf_counter() - start
+import httpx
+
+async def first_requests():
+    timings = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold-start") as client:
+        for name, method, path, data in [
+            ("health", "GET", "/health", None),
+            ("preprocess", "POST", "/preprocess", {"body": "Olá, qual o status do chamado 1234?"}),
+        ]:
+            response = await client.request(method, path, data=data)
+            response.raise_for_status()
+            timings[name] = time.perf_counter() - start
+    return timings
+
+timings = asyncio.run(first_requests())
+print(json.dumps({
+    "import_s": import_s,
+    "timings": timings,
+    "gemini_sdk": "google.generativeai" in sys.modules,
+    "pypdf2": "PyPDF2" in sys.modules,
+}))
+"""
+
+# Linhas de `-X importtime`: "import time: <próprio> | <cumulativo> | <módulo>" (µs)
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+MODES = {"eager": "false", "lazy": "true"}
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Tempo cumulativo (µs) de cada módulo importado"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def cold_start(lazy_init: str) -> Tuple[Dict, Dict[str, int], float]:
+    """Um processo novo: resultado do filho, tempos de import e duração total (s)"""
+    env = dict(os.environ, LAZY_INIT=lazy_init)
+    # Sem workers de jobs nem banco em disco; o rate limit não interessa aqui
+    env.setdefault("JOBS_ENABLED", "false")
+    env.setdefault("RATE_LIMIT_ENABLED", "false")
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    
+    with Timer() as timer:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD],
+            capture_output=True, text=True, env=env, check=True
+        )
+    
+    # O app imprime o progresso da inicialização antes do JSON
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(completed.stderr), timer.elapsed
+
+
+def heaviest(modules: Dict[str, int], top: int) -> List[Tuple[str, int]]:
+    """Módulos com maior tempo cumulativo de import (sem o próprio main)"""
+    ranked = sorted(((name, us) for name, us in modules.items() if name != "main"), key=lambda item: -item[1])
+    return ranked[:top]
+
+
+def run(repeat: int = 5, modes: Sequence[str] = tuple(MODES), top: int = 0) -> List[Dict]:
+    rows = []
+    for mode in modes:
+        runs = [cold_start(MODES[mode]) for _ in range(repeat)]
+        # Melhor de `repeat`: o primeiro processo ainda compila os .pyc e aquece o cache de disco
+        best, modules, _ = min(runs, key=lambda run: run[2])
+        
+        rows.append({
+            "modo": mode,
+            "import_main_ms": round(min(r[1].get("main", 0) for r in runs) / 1000, 1),
+            "primeira_health_ms": round(min(r[0]["timings"]["health"] for r in runs) * 1000, 1),
+            "primeira_preprocess_ms": round(min(r[0]["timings"]["preprocess"] for r in runs) * 1000, 1),
+            "processo_ms": round(min(r[2] for r in runs) * 1000, 1),
+            "gemini_sdk": best["gemini_sdk"],
+            "pypdf2": best["pypdf2"],
+        })
+        
+        if top:
+            print(f"\n{mode}: imports mais pesados (cumulativo)")
+            for name, us in heaviest(modules, top):
+                print(f"  {us / 1000:>9.1f} ms  {name}")
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Processos por modo (usa o melhor)")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--top", type=int, default=0, help="Lista os N imports mais pesados de cada modo")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("cold start (import de main e primeiras respostas)", run(args.repeat, args.modes, args.top), args.output)
+
+
+if __name__ == "__main__":
+    main()
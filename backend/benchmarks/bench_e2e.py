@@ -0,0 +1,120 @@
+"""
+Teste de carga de /processar através do app ASGI, com um serviço de IA
+falso de latência configurável no lugar do Gemini: mede o pipeline
+completo (multipart, leitura do upload, extração, pré-processamento) por
+tipo de entrada e nível de concorrência.
+
+    python -m benchmarks.bench_e2e --requests 200 --concurrency 1 16 64 --latency 0.05
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Sequence
+
+from .common import build_client, report
+from .corpus import eml_document, generate_email_text, pdf_document
+from .fakes import FakeAIService
+
+
+def build_payloads(pdf_pages: int, seed: int) -> Dict[str, Dict]:
+    """Requisições de /processar por tipo de entrada (campos de formulário e arquivo)"""
+    rng = random.Random(seed)
+    
+    return {
+        "texto": {"data": {"body": generate_email_text(rng, 300), "subject": "Status do pedido"}},
+        "arquivo .txt": {"files": {"file": ("email.txt", generate_email_text(rng, 1500).encode("utf-8"), "text/plain")}},
+        f"pdf {pdf_pages} páginas": {
+            "files": {"file": ("documento.pdf", pdf_document(pdf_pages, seed=seed), "application/pdf")}
+        },
+        "eml com anexos": {
+            "files": {"file": ("mensagem.eml", eml_document(attachments=2, attachment_kb=256, seed=seed), "message/rfc822")}
+        },
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil pelo método do vizinho mais próximo"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def load(client, payload: Dict, requests: int, concurrency: int) -> Dict:
+    """Dispara `requests` chamadas com no máximo `concurrency` simultâneas"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def call():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/processar", **payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get("erro"):
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "req_s": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "erros": errors,
+    }
+
+
+async def run_async(
+    requests: int,
+    concurrency_levels: Sequence[int],
+    latency: float,
+    jitter: float,
+    pdf_pages: int,
+    seed: int
+) -> List[Dict]:
+    ai_service = FakeAIService(latency=latency, jitter=jitter, seed=seed)
+    rows = []
+    
+    async with build_client(ai_service) as client:
+        for name, payload in build_payloads(pdf_pages, seed).items():
+            await client.post("/processar", **payload)  # Aquecimento (pools, caches, imports)
+            for concurrency in concurrency_levels:
+                row = {"entrada": f"{name} c={concurrency}"}
+                row.update(await load(client, payload, requests, concurrency))
+                rows.append(row)
+    
+    return rows
+
+
+def run(
+    requests: int = 100,
+    concurrency_levels: Sequence[int] = (1, 16, 64),
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    pdf_pages: int = 5,
+    seed: int = 42
+) -> List[Dict]:
+    return asyncio.run(run_async(requests, concurrency_levels, latency, jitter, pdf_pages, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência do serviço de IA falso (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variação da latência (± s)")
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    rows = run(args.requests, args.concurrency, args.latency, args.jitter, args.pdf_pages, args.seed)
+    report("/processar ponta a ponta", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
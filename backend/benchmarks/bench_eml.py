@@ -0,0 +1,74 @@
+"""
+Compara o EMLParser (feed parser da biblioteca padrão) com o parser original
+baseado em regex, em mensagens multipart grandes: tempo por mensagem e se o
+corpo esperado foi extraído corretamente.
+
+    python -m benchmarks.bench_eml
+"""
+import argparse
+import random
+from typing import Callable, Dict, List
+
+from src.infrastructure.parsers.eml_parser import EMLParser
+
+from .common import Timer, report
+from .corpus import generate_email_text, make_eml
+from .reference_eml_parser import ReferenceEMLParser
+
+
+def build_scenarios(attachment_mb: float, attachments: int, seed: int) -> Dict[str, List]:
+    """Cenários de mensagens grandes: (eml, trecho esperado no corpo)"""
+    rng = random.Random(seed)
+    body = generate_email_text(rng, 300)
+    html = "<html><body>" + "".join(f"<p>{generate_email_text(rng, 30)}&nbsp;</p>" for _ in range(10)) + "</body></html>"
+    blobs = [rng.randbytes(int(attachment_mb * 1024 * 1024)) for _ in range(attachments)]
+    expected = " ".join(body.split()[:8])
+    
+    return {
+        "texto antes dos anexos": [make_eml(body, attachments=blobs), expected],
+        "texto após os anexos": [make_eml(body, attachments=blobs, text_last=True), expected],
+        "texto base64 + anexos": [make_eml(body, attachments=blobs, text_last=True, cte="base64"), expected],
+        "latin-1 8bit + anexos": [make_eml(body, attachments=blobs, cte="8bit", charset="iso-8859-1"), expected],
+        "alternative + anexos": [make_eml(body, html=html, attachments=blobs, text_last=True), expected],
+    }
+
+
+def measure(parse: Callable[[bytes], str], raw: bytes, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        with Timer() as timer:
+            text = parse(raw)
+        best = min(best, timer.elapsed)
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attachment-mb", type=float, default=2.0)
+    parser.add_argument("--attachments", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    current, reference = EMLParser(), ReferenceEMLParser()
+    rows = []
+    
+    for name, (raw, expected) in build_scenarios(args.attachment_mb, args.attachments, args.seed).items():
+        reference_time, reference_text = measure(reference.parse, raw, args.repeat)
+        current_time, current_text = measure(current.parse, raw, args.repeat)
+        rows.append({
+            "cenario": name,
+            "tamanho_mb": round(len(raw) / 1024 / 1024, 1),
+            "regex_ms": round(reference_time * 1000, 2),
+            "feed_ms": round(current_time * 1000, 2),
+            "ganho": f"{reference_time / current_time:.1f}x",
+            "regex_ok": expected in reference_text,
+            "feed_ok": expected in current_text,
+        })
+    
+    report("eml", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Custo de registrar métricas (contador, histograma, etapa cronometrada)
+e de exportar /metrics, para confirmar que dá para deixá-las ligadas.
+
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import timeit
+from typing import Dict, List
+
+from src.infrastructure.observability.metrics import PipelineMetrics
+
+from .common import Timer, report
+
+
+def run(iterations: int) -> List[Dict]:
+    metrics = PipelineMetrics()
+    operations = {
+        "counter.inc": lambda: metrics.requests.inc("POST", "/processar", "200"),
+        "histogram.observe": lambda: metrics.stage_duration.observe(0.0123, PipelineMetrics.STAGE_AI),
+        "observe_file": lambda: metrics.observe_file("relatorio.pdf", 250_000),
+    }
+    
+    def timed_stage():
+        with metrics.stage(PipelineMetrics.STAGE_PREPROCESS):
+            pass
+    
+    operations["stage() com with"] = timed_stage
+    rows = []
+    
+    for name, operation in operations.items():
+        seconds = min(timeit.repeat(operation, number=iterations, repeat=5))
+        rows.append({"operação": name, "custo_ns": round(seconds / iterations * 1e9, 1)})
+    
+    with Timer() as timer:
+        size = len(metrics.render())
+    rows.append({"operação": "render /metrics", "custo_ns": round(timer.elapsed * 1e9, 1), "bytes": size})
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("métricas", run(args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Latência de /health e /processar com o SecurityMiddleware original
+(BaseHTTPMiddleware) e com a versão ASGI pura.
+
+    python -m benchmarks.bench_middleware
+"""
+import argparse
+import asyncio
+import statistics
+from typing import Dict, List
+
+from .common import Timer, build_client, report
+from .fakes import FakeGeminiModel
+from .reference_security_middleware import ReferenceSecurityMiddleware
+
+
+async def measure(client, method: str, path: str, requests: int, **kwargs) -> Dict[str, float]:
+    latencies: List[float] = []
+    
+    for _ in range(requests):
+        with Timer() as timer:
+            response = await client.request(method, path, **kwargs)
+        response.raise_for_status()
+        latencies.append(timer.elapsed * 1000)
+    
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "req_s": round(len(latencies) / (sum(latencies) / 1000)),
+    }
+
+
+async def run(requests: int) -> List[Dict]:
+    from src.infrastructure.external.gemini_ai_service import GeminiAIService
+    from src.infrastructure.security.middleware import SecurityMiddleware
+    
+    ai_service = GeminiAIService("benchmark", model=FakeGeminiModel(latency=0))
+    client = build_client(ai_service)
+    import main
+    
+    registered = next(m for m in main.app.user_middleware if m.cls is SecurityMiddleware)
+    original_kwargs = registered.kwargs
+    # A versão original não tem o limite configurável (usa 50MB fixo)
+    reference_kwargs = {key: value for key, value in original_kwargs.items() if key != "max_body_size"}
+    body = {"body": "Olá, preciso de uma atualização sobre o chamado 4521 aberto na semana passada.", "subject": "Chamado"}
+    rows = []
+    
+    async with client:
+        variants = (
+            ("BaseHTTPMiddleware", ReferenceSecurityMiddleware, reference_kwargs),
+            ("ASGI puro", SecurityMiddleware, original_kwargs),
+        )
+        for name, middleware_class, kwargs in variants:
+            registered.cls, registered.kwargs = middleware_class, kwargs
+            main.app.middleware_stack = None  # Reconstruída na próxima requisição
+            
+            # Aquecimento
+            await measure(client, "GET", "/health", 50)
+            
+            for method, path, request_kwargs in (("GET", "/health", {}), ("POST", "/processar", {"data": body})):
+                row = {"middleware": name, "endpoint": f"{method} {path}"}
+                row.update(await measure(client, method, path, requests, **request_kwargs))
+                rows.append(row)
+    
+    registered.cls, registered.kwargs = SecurityMiddleware, original_kwargs
+    main.app.middleware_stack = None
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("security middleware", asyncio.run(run(args.requests)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Índice de emails quase duplicados (MinHash + LSH) em um corpus de emails
+gerados a partir de modelos (mudam nome, data e número do chamado):
+quantos seriam reaproveitados pelo cache exato e pelo índice em cada
+limite de similaridade, quantos com a categoria errada, e o custo da
+assinatura e da consulta. Mede também a consulta em um índice cheio.
+
+    python -m benchmarks.bench_near_duplicate --emails 500 --similarity 0.7 0.8 0.9
+"""
+import argparse
+import hashlib
+import random
+import string
+import time
+from typing import Dict, List, Sequence
+
+from src.infrastructure.cache.near_duplicate_index import MinHasher, NearDuplicateIndex
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+
+from .common import report
+from .corpus import TEMPLATES, template_emails
+
+
+def exact_reuse(emails: List[List[str]]) -> int:
+    """Emails que o cache exato (hash do texto pré-processado) reaproveitaria"""
+    seen = set()
+    reused = 0
+    for tokens in emails:
+        key = hashlib.sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+        reused += key in seen
+        seen.add(key)
+    return reused
+
+
+def near_duplicate_reuse(templates: List[int], emails: List[List[str]], similarity: float) -> Dict:
+    """Percorre os emails como requisições: acerto reaproveita, erro indexa o email"""
+    hasher = MinHasher()
+    index = NearDuplicateIndex(threshold=similarity)
+    reused = wrong = 0
+    signature_ns = query_ns = 0
+    
+    for template, tokens in zip(templates, emails):
+        start = time.perf_counter_ns()
+        signature = hasher.signature(tokens)
+        signature_ns += time.perf_counter_ns() - start
+        if signature is None:
+            continue
+        
+        start = time.perf_counter_ns()
+        match = index.query(signature)
+        query_ns += time.perf_counter_ns() - start
+        
+        if match is None:
+            index.add(signature, {"categoria": TEMPLATES[template][0], "modelo": template})
+        else:
+            reused += 1
+            wrong += match[1]["modelo"] != template
+    
+    return {
+        "reaproveitados": reused,
+        "errados": wrong,
+        "assinatura_ns": signature_ns // len(emails),
+        "consulta_ns": query_ns // len(emails),
+    }
+
+
+def distinct_tokens(rng: random.Random, vocabulary: List[str], size: int = 40) -> List[str]:
+    """Tokens de um email sem relação com os demais (o corpus sintético tem vocabulário pequeno demais)"""
+    return [rng.choice(vocabulary) for _ in range(size)]
+
+
+def full_index_query(entries: int, repeat: int, seed: int) -> Dict:
+    """Consulta (com acerto e sem) em um índice com `entries` emails distintos"""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(20000)]
+    hasher = MinHasher()
+    index = NearDuplicateIndex(max_entries=entries)
+    
+    signatures = []
+    for _ in range(entries):
+        signature = hasher.signature(distinct_tokens(rng, vocabulary))
+        index.add(signature, {"categoria": "Produtivo"})
+        signatures.append(signature)
+    
+    unseen = hasher.signature(distinct_tokens(rng, vocabulary))
+    
+    def best_ns(signature: bytes) -> int:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            index.query(signature)
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    
+    return {"consulta_acerto_ns": best_ns(signatures[-1]), "consulta_erro_ns": best_ns(unseen)}
+
+
+def run(
+    emails: int = 500,
+    similarities: Sequence[float] = (0.7, 0.8, 0.9),
+    index_entries: int = 10000,
+    seed: int = 42
+) -> List[Dict]:
+    processor = HybridTextProcessor()
+    generated = template_emails(emails, seed=seed)
+    templates = [template for template, _ in generated]
+    tokens = [processor.preprocess_text(text).processed.split() for _, text in generated]
+    
+    rows = [{"caso": "cache exato", "reaproveitados": exact_reuse(tokens), "errados": 0}]
+    for similarity in similarities:
+        rows.append({"caso": f"similaridade {similarity:g}", **near_duplicate_reuse(templates, tokens, similarity)})
+    
+    rows.append({"caso": f"índice com {index_entries} emails", **full_index_query(index_entries, 1000, seed)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--similarity", type=float, nargs="+", default=[0.7, 0.8, 0.9])
+    parser.add_argument("--index-entries", type=int, default=10000, help="Tamanho do índice na medida da consulta")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("emails quase duplicados", run(args.emails, args.similarity, args.index_entries, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Microbenchmarks de cada etapa síncrona do pipeline: parsers de texto, EML
+e PDF (N páginas), as regex de limpeza do EMLParser e o
+HybridTextProcessor.preprocess_text. Mede o melhor tempo de `repeat`
+execuções e o throughput em MB/s.
+
+    python -m benchmarks.bench_parsers --pdf-pages 1 10 50
+"""
+import argparse
+import random
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+from src.infrastructure.parsers.eml_parser import EMLParser
+from src.infrastructure.parsers.pdf_parser import PDFParser
+from src.infrastructure.parsers.text_parser import TextParser
+
+from .common import Timer, report
+from .corpus import eml_document, generate_email_text, large_text, pdf_document, preprocess_corpus
+
+# (nome, bytes de entrada, operação)
+Case = Tuple[str, int, Callable[[], object]]
+
+
+def measure(operation: Callable[[], object], repeat: int) -> float:
+    """Melhor tempo (s) de `repeat` execuções"""
+    best = float("inf")
+    for _ in range(repeat):
+        with Timer() as timer:
+            operation()
+        best = min(best, timer.elapsed)
+    return best
+
+
+def row(name: str, size_bytes: int, seconds: float) -> Dict:
+    """Linha do relatório: tempo por execução e throughput"""
+    return {
+        "caso": name,
+        "kb": round(size_bytes / 1024, 1),
+        "ms": round(seconds * 1000, 3),
+        "mb_s": round(size_bytes / 1024 / 1024 / seconds, 2) if seconds else 0.0,
+    }
+
+
+def parser_cases(pdf_pages: Sequence[int], seed: int) -> List[Case]:
+    """Cada parser com entradas do corpus sintético"""
+    rows = []
+    text_parser, eml_parser, pdf_parser = TextParser(), EMLParser(), PDFParser()
+    
+    text = large_text(100_000, seed=seed).encode("utf-8")
+    rows.append(("TextParser 100k", len(text), lambda: text_parser.parse(text)))
+    
+    latin = large_text(100_000, seed=seed).encode("latin-1", errors="replace")
+    rows.append(("TextParser 100k latin-1", len(latin), lambda: text_parser.parse(latin)))
+    
+    for name, attachments, text_last in [
+        ("EMLParser sem anexos", 0, False),
+        ("EMLParser 3 anexos", 3, False),
+        ("EMLParser 3 anexos (texto no fim)", 3, True),
+    ]:
+        raw = eml_document(attachments=attachments, attachment_kb=512, seed=seed, text_last=text_last)
+        rows.append((name, len(raw), lambda raw=raw: eml_parser.parse(raw)))
+    
+    for pages in pdf_pages:
+        raw = pdf_document(pages, seed=seed)
+        rows.append((f"PDFParser {pages} páginas", len(raw), lambda raw=raw: pdf_parser.parse(raw)))
+    
+    return rows
+
+
+def regex_cases(seed: int) -> List[Case]:
+    """As regex de limpeza do EMLParser (HTML para texto e normalização do corpo)"""
+    rng = random.Random(seed)
+    parser = EMLParser()
+    html = "<html><head><style>p { color: red; }</style><script>var x = 1;</script></head><body>" + "".join(
+        f"<div><p>{generate_email_text(rng, 40)}</p><br/><span>{rng.randint(1, 9999)}</span></div>"
+        for _ in range(500)
+    ) + "</body></html>"
+    body = "\n\n\n".join(generate_email_text(rng, 60) + "   \n \t " for _ in range(500))
+    
+    return [
+        ("EML _html_to_text", len(html.encode("utf-8")), lambda: parser._html_to_text(html)),
+        ("EML _clean_body_text", len(body.encode("utf-8")), lambda: parser._clean_body_text(body)),
+    ]
+
+
+def preprocess_cases(seed: int) -> List[Case]:
+    """preprocess_text no corpus (emails variados) e em um texto grande"""
+    corpus = preprocess_corpus(300, seed=seed)
+    large = large_text(1_000_000, seed=seed)
+    
+    def run_corpus():
+        processor = HybridTextProcessor()  # Cache do stemmer vazio: inclui o aquecimento
+        for text in corpus:
+            processor.preprocess_text(text)
+    
+    warm = HybridTextProcessor()
+    return [
+        ("preprocess corpus (frio)", sum(len(text.encode("utf-8")) for text in corpus), run_corpus),
+        ("preprocess 1M chars", len(large.encode("utf-8")), lambda: warm.preprocess_text(large)),
+    ]
+
+
+def run(pdf_pages: Sequence[int] = (1, 10, 50), repeat: int = 5, seed: int = 42) -> List[Dict]:
+    cases = parser_cases(pdf_pages, seed) + regex_cases(seed) + preprocess_cases(seed)
+    return [row(name, size, measure(operation, repeat)) for name, size, operation in cases]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf-pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições (usa a melhor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("parsers e pré-processamento", run(args.pdf_pages, args.repeat, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Verifica a equivalência e mede o throughput (caracteres/segundo) do
+HybridTextProcessor.preprocess_text contra a implementação de referência.
+
+    python -m benchmarks.bench_preprocess --repeat 3
+"""
+import argparse
+import sys
+from typing import Callable, List
+
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+
+from .common import Timer, report
+from .corpus import large_text, preprocess_corpus
+from .reference_preprocessor import ReferenceTextProcessor
+
+
+def check_equivalence(corpus: List[str]) -> List[int]:
+    """Retorna os índices do corpus em que as saídas divergem"""
+    current = HybridTextProcessor()
+    reference = ReferenceTextProcessor()
+    
+    return [
+        index for index, text in enumerate(corpus)
+        if current.preprocess_text(text).processed != reference.preprocess_text(text).processed
+    ]
+
+
+def measure(preprocess: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    """Retorna caracteres/segundo (melhor de `repeat` execuções)"""
+    n_chars = sum(len(text) for text in texts)
+    best = float("inf")
+    
+    for _ in range(repeat):
+        with Timer() as timer:
+            for text in texts:
+                preprocess(text)
+        best = min(best, timer.elapsed)
+    
+    return n_chars / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus-size", type=int, default=300, help="Quantidade de emails sintéticos")
+    parser.add_argument("--large-chars", type=int, default=1_000_000, help="Tamanho do texto grande")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (usa a melhor)")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    corpus = preprocess_corpus(args.corpus_size)
+    large = [large_text(args.large_chars)]
+    
+    mismatches = check_equivalence(corpus + large)
+    if mismatches:
+        print(f"❌ Saída divergente da referência em {len(mismatches)} textos: {mismatches[:10]}")
+        sys.exit(1)
+    print(f"✅ Saída idêntica à referência em {len(corpus) + len(large)} textos")
+    
+    current = HybridTextProcessor()
+    reference = ReferenceTextProcessor()
+    rows = []
+    
+    for label, texts in [("corpus", corpus), ("texto grande", large)]:
+        before = measure(reference.preprocess_text, texts, args.repeat)
+        after = measure(current.preprocess_text, texts, args.repeat)
+        rows.append({
+            "entrada": label,
+            "chars": sum(len(text) for text in texts),
+            "antes_chars_s": round(before),
+            "depois_chars_s": round(after),
+            "aceleracao": after / before,
+        })
+    
+    report("preprocess_text", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Throughput (textos/segundo) do pré-processamento em lote em função do
+tamanho do lote e da quantidade de processos: um preprocess_text por texto,
+preprocess_batch no processo atual e preprocess_batch com o pool de
+processos (cada worker inicializa stop words, regras de sufixo e memo do
+stemmer uma única vez). O ganho do pool depende dos núcleos disponíveis
+(coluna `cpus`).
+
+    python -m benchmarks.bench_preprocess_batch --batch-sizes 10,100,1000,5000 --workers 1,2,4
+"""
+import argparse
+import os
+from typing import Dict, List, Sequence
+
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+from src.infrastructure.external.preprocessing_pool import PreprocessingPool
+
+from .common import Timer, report
+from .corpus import preprocess_corpus
+
+
+def measure(run, texts: List[str], repeat: int) -> float:
+    """Textos/segundo (melhor de `repeat` execuções)"""
+    best = float("inf")
+    
+    for _ in range(repeat):
+        with Timer() as timer:
+            run(texts)
+        best = min(best, timer.elapsed)
+    
+    return len(texts) / best
+
+
+def run(
+    batch_sizes: Sequence[int] = (10, 100, 1000, 5000),
+    workers: Sequence[int] = (1, 2, 4),
+    repeat: int = 3,
+    seed: int = 42
+) -> List[Dict]:
+    corpus = preprocess_corpus(max(batch_sizes), seed=seed)
+    single = HybridTextProcessor()
+    variants = [
+        ("preprocess_text", 0, lambda texts: [single.preprocess_text(text) for text in texts], None),
+        ("lote, processo atual", 0, single.preprocess_batch, None),
+    ]
+    
+    for count in workers:
+        pool = PreprocessingPool(max_workers=count)
+        processor = HybridTextProcessor(batch_pool=pool, parallel_threshold=1)
+        # Sobe os processos antes de medir (o custo do spawn é pago uma vez por pool)
+        processor.preprocess_batch(corpus[:count * 4])
+        variants.append((f"lote, pool de {count}", count, processor.preprocess_batch, processor))
+    
+    rows = []
+    try:
+        for size in batch_sizes:
+            texts = corpus[:size]
+            for variant, count, preprocess, _ in variants:
+                rows.append({
+                    "variante": variant,
+                    "lote": size,
+                    "processos": count,
+                    "textos_s": round(measure(preprocess, texts, repeat)),
+                    "cpus": os.cpu_count(),
+                })
+    finally:
+        for *_, processor in variants:
+            if processor is not None:
+                processor.shutdown()
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", default="10,100,1000,5000", help="Tamanhos de lote separados por vírgula")
+    parser.add_argument("--workers", default="1,2,4", help="Quantidades de processos separadas por vírgula")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (usa a melhor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    rows = run(
+        [int(size) for size in args.batch_sizes.split(",")],
+        [int(count) for count in args.workers.split(",")],
+        args.repeat,
+        args.seed
+    )
+    report("pré-processamento em lote", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
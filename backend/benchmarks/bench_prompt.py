@@ -0,0 +1,105 @@
+"""
+Tamanho dos prompts antes e depois do PromptBuilder: o prompt original
+enviava o texto pré-processado e o email completo, sem limite; o atual envia
+o email uma vez, sem histórico citado nem assinatura e dentro do orçamento.
+
+    python -m benchmarks.bench_prompt
+"""
+import argparse
+import random
+import statistics
+from typing import Dict, List
+
+from src.domain.entities.email import Email
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+from src.infrastructure.external.prompt_builder import PromptBuilder
+
+from .common import Timer, report
+from .corpus import generate_email_text, large_text
+
+SIGNATURE = "\n\nAtenciosamente,\nMaria Souza\nCoordenadora Financeira\n(11) 3456-7890\nEnviado do meu iPhone"
+REPLY_HEADER = "\n\nEm seg., 3 de jun. de 2024 às 10:00, Suporte <suporte@empresa.com.br> escreveu:\n"
+
+
+def legacy_prompt(email: Email, processed: str) -> str:
+    """Prompt original de GeminiAIService._build_analysis_prompt"""
+    return f"""
+        Analise o seguinte email e execute as seguintes tarefas:
+
+        1. Classifique como 'Produtivo' ou 'Improdutivo'
+        2. Gere uma resposta automática adequada à categoria:
+           - Se PRODUTIVO: resposta que facilita o diálogo e encoraja comunicação
+           - Se IMPRODUTIVO: resposta educada mas que desencoraja continuidade
+
+        Email (pré-processado): {processed}
+        Email original (para contexto): {email.get_full_content()}
+
+        Responda OBRIGATORIAMENTE no seguinte formato JSON:
+        {{
+            "categoria": "Produtivo" ou "Improdutivo",
+            "resposta": "texto da resposta adequada à categoria"
+        }}
+
+        DIRETRIZES para respostas:
+        - PRODUTIVO: Seja receptivo, ofereça ajuda, peça mais detalhes se necessário
+        - IMPRODUTIVO: Seja educado mas firme, redirecione ou encerre gentilmente
+        - Todas as respostas devem ser profissionais
+        - Responda APENAS o JSON, sem texto adicional
+        """
+
+
+def reply_thread(rng: random.Random, replies: int) -> str:
+    """Email com resposta nova no topo, assinatura e histórico citado"""
+    text = generate_email_text(rng, rng.choice([20, 60, 150])) + SIGNATURE
+    for _ in range(replies):
+        quoted = "\n".join("> " + line for line in generate_email_text(rng, 120).split(". "))
+        text += REPLY_HEADER + quoted
+    return text
+
+
+def build_corpus(size: int, seed: int) -> Dict[str, List[Email]]:
+    rng = random.Random(seed)
+    return {
+        "curtos": [Email(content=generate_email_text(rng, rng.choice([10, 30, 80]))) for _ in range(size)],
+        "com histórico": [Email(content=reply_thread(rng, rng.randint(1, 5)), subject="Re: chamado") for _ in range(size)],
+        "grandes (1MB)": [Email(content=large_text(1_000_000, seed=index)) for index in range(3)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus-size", type=int, default=200)
+    parser.add_argument("--token-budget", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    processor = HybridTextProcessor()
+    builder = PromptBuilder(token_budget=args.token_budget)
+    rows = []
+    
+    for name, emails in build_corpus(args.corpus_size, args.seed).items():
+        legacy_tokens, current_tokens = [], []
+        
+        with Timer() as timer:
+            for email in emails:
+                current_tokens.append(builder.build_single(email).tokens)
+        
+        for email in emails:
+            processed = processor.preprocess_text(email.get_full_content()).processed
+            legacy_tokens.append(builder.estimate_tokens(legacy_prompt(email, processed)))
+        
+        rows.append({
+            "corpus": name,
+            "tokens_antes": round(statistics.mean(legacy_tokens)),
+            "tokens_depois": round(statistics.mean(current_tokens)),
+            "max_depois": max(current_tokens),
+            "reducao": f"{1 - sum(current_tokens) / sum(legacy_tokens):.0%}",
+            "build_ms": round(timer.elapsed / len(emails) * 1000, 3),
+        })
+    
+    report("prompt", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Comportamento do GeminiAIService com e sem o ResilientAIService diante de
+um modelo falso que injeta falhas, respostas lentas e indisponibilidade total.
+
+    python -m benchmarks.bench_resilience
+"""
+import argparse
+import asyncio
+import random
+import statistics
+from typing import Dict, List
+
+from src.domain.entities.email import Email, ProcessedText
+
+from .common import Timer, report
+from .fakes import FakeGeminiModel
+
+SCENARIOS = {
+    "saudável": dict(latency=0.05),
+    "20% de falhas 503": dict(latency=0.05, failure_rate=0.2),
+    "cota (429 em 50%)": dict(latency=0.05, failure_rate=0.5, error_status=429),
+    "cauda lenta (5% a 1s)": dict(latency=0.05, slow_rate=0.05, slow_latency=1.0),
+    "travado (2s)": dict(latency=2.0),
+    "fora do ar": dict(latency=0.05, failure_rate=1.0),
+}
+
+
+def build_service(variant: str, model: FakeGeminiModel, seed: int):
+    from src.infrastructure.external.gemini_ai_service import GeminiAIService
+    from src.infrastructure.resilience.circuit_breaker import CircuitBreaker
+    from src.infrastructure.resilience.resilient_ai_service import ResilientAIService
+    
+    if variant == "sem resiliência":
+        return GeminiAIService("benchmark", model=model)
+    
+    return ResilientAIService(
+        GeminiAIService("benchmark", model=model, propagate_errors=True),
+        circuit_breaker=CircuitBreaker(failure_threshold=5, reset_timeout=1.0),
+        timeout_seconds=0.5,
+        deadline_seconds=1.5,
+        max_retries=2,
+        backoff_base=0.05,
+        backoff_max=0.4,
+        hedge_after=0.15 if variant == "resiliente + hedging" else None,
+        rng=random.Random(seed)
+    )
+
+
+async def run_scenario(variant: str, options: Dict, requests: int, concurrency: int, seed: int) -> Dict:
+    model = FakeGeminiModel(seed=seed, **options)
+    service = build_service(variant, model, seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def one(index: int):
+        nonlocal errors
+        text = f"Solicito atualização do chamado {index} aberto na semana passada."
+        async with semaphore:
+            with Timer() as timer:
+                result = await service.analyze_email(Email(content=text), ProcessedText(text, text))
+        latencies.append(timer.elapsed * 1000)
+        errors += result.error is not None
+    
+    with Timer() as total:
+        await asyncio.gather(*(one(index) for index in range(requests)))
+    
+    latencies.sort()
+    return {
+        "sucesso": f"{1 - errors / requests:.0%}",
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1),
+        "chamadas_upstream": model.calls,
+        "tempo_s": round(total.elapsed, 2),
+    }
+
+
+async def run(requests: int, concurrency: int, seed: int) -> List[Dict]:
+    rows = []
+    
+    for scenario, options in SCENARIOS.items():
+        for variant in ("sem resiliência", "resiliente", "resiliente + hedging"):
+            row = {"cenario": scenario, "variante": variant}
+            row.update(await run_scenario(variant, options, requests, concurrency, seed))
+            rows.append(row)
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("resiliência da IA", asyncio.run(run(args.requests, args.concurrency, args.seed)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Tempo até o primeiro byte (e até a categoria) de /processar e de
+/processar/stream com um modelo falso que gera a resposta em trechos.
+Chama o app ASGI diretamente: o ASGITransport do httpx só devolve a
+resposta depois de recebê-la por inteiro.
+
+    python -m benchmarks.bench_stream
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+from urllib.parse import urlencode
+
+from .common import build_client, report
+from .fakes import FakeGeminiModel
+
+
+async def timed_request(app, path: str, form: Dict[str, str]) -> Dict[str, float]:
+    """Envia um POST de formulário e registra quando cada parte da resposta foi enviada"""
+    body = urlencode(form).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000), "server": ("benchmark", 80),
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    received = False
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        elapsed = (time.perf_counter() - start) * 1000
+        chunk = message.get("body", b"")
+        if chunk and "primeiro_byte_ms" not in timings:
+            timings["primeiro_byte_ms"] = elapsed
+        if b'"categoria"' in chunk and "categoria_ms" not in timings:
+            timings["categoria_ms"] = elapsed
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            timings["total_ms"] = elapsed
+    
+    await app(scope, receive, send)
+    return timings
+
+
+async def run(latency: float, chunk_size: int, requests: int) -> List[Dict]:
+    from src.infrastructure.external.gemini_ai_service import GeminiAIService
+    import main
+    
+    build_client(GeminiAIService("benchmark", model=FakeGeminiModel(latency=latency, chunk_size=chunk_size)))
+    rows = []
+    
+    for path in ("/processar", "/processar/stream"):
+        samples: Dict[str, List[float]] = {}
+        for index in range(requests):
+            form = {"body": f"Preciso de uma atualização sobre o chamado {index} aberto na semana passada."}
+            for name, value in (await timed_request(main.app, path, form)).items():
+                samples.setdefault(name, []).append(value)
+        
+        row = {"endpoint": path}
+        row.update({name: round(statistics.median(values), 1) for name, values in samples.items()})
+        rows.append(row)
+    
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=2.0, help="Tempo total de geração do modelo (s)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Caracteres por trecho do streaming")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    report("streaming", asyncio.run(run(args.latency, args.chunk_size, args.requests)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Mede o pico de memória da etapa upload -> texto extraído para um arquivo de
+~10MB, comparando o fluxo antigo (três leituras completas) com o atual
+(leitura única / mmap do arquivo temporário).
+
+Cada variante roda em um processo separado e o pico de RSS é lido de
+/proc/self/status (VmHWM, zerado após a preparação; requer Linux). Também
+reporta o pico de alocações do heap Python (tracemalloc).
+
+    python -m benchmarks.bench_upload_memory --size-mb 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+
+from starlette.datastructures import Headers, UploadFile
+
+from src.domain.entities.file import FileInfo, UploadedFile
+from src.infrastructure.parsers.file_parser_factory import FileParserFactory
+from src.infrastructure.security.middleware import FileSecurityValidator
+
+from .common import report
+from .corpus import large_text
+
+
+def make_upload(source_path: str, filename: str) -> UploadFile:
+    """Cria um UploadFile como o parser multipart do Starlette (spool de 1MB, escrita em blocos)"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    size = 0
+    
+    with open(source_path, "rb") as source:
+        while True:
+            chunk = source.read(64 * 1024)
+            if not chunk:
+                break
+            spooled.write(chunk)
+            size += len(chunk)
+    
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename=filename, headers=Headers({"content-type": "text/plain"}))
+
+
+async def legacy_flow(upload: UploadFile, factory: FileParserFactory) -> str:
+    """Fluxo anterior: validação lê tudo, o caso de uso lê de novo e o parser decodifica"""
+    content = await upload.read()
+    await upload.seek(0)
+    content.decode("utf-8")  # Validação de assinatura de .txt decodificava uma cópia
+    FileSecurityValidator.validate_file(upload.filename, content)
+    del content
+    
+    file_content = await upload.read()
+    await upload.seek(0)
+    file_info = FileInfo(filename=upload.filename, content_type=upload.content_type, size=len(file_content))
+    return factory.parse_file(file_content, file_info)
+
+
+async def current_flow(upload: UploadFile, factory: FileParserFactory) -> str:
+    """Fluxo atual: uma leitura (ou mmap) compartilhada por validação e parse"""
+    content = await FileSecurityValidator.read_and_validate(upload)
+    uploaded_file = UploadedFile(filename=upload.filename, content_type=upload.content_type, content=content)
+    return factory.parse_file(uploaded_file.content, uploaded_file.get_info())
+
+
+def _status_kb(field: str) -> int:
+    """Lê um campo de memória (em kB) de /proc/self/status"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_rss() -> None:
+    """Zera o VmHWM para medir só o trecho seguinte"""
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def _run_variant(variant: str, source_path: str, queue) -> None:
+    factory = FileParserFactory()
+    upload = make_upload(source_path, "email.txt")
+    flow = legacy_flow if variant == "antes" else current_flow
+    
+    _reset_peak_rss()
+    baseline_rss = _status_kb("VmRSS")
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = asyncio.run(flow(upload, factory))
+    elapsed = time.perf_counter() - start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    queue.put({
+        "variante": variant,
+        "texto_chars": len(text),
+        "pico_rss_mb": (_status_kb("VmHWM") - baseline_rss) / 1024,
+        "pico_heap_mb": heap_peak / 1024 / 1024,
+        "tempo_s": elapsed,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=10, help="Tamanho do upload (MB)")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    # Um pouco abaixo do limite do validador
+    size = args.size_mb * 1024 * 1024 - 1024
+    source = tempfile.NamedTemporaryFile(suffix=".txt")
+    source.write(large_text(size).encode("utf-8")[:size])
+    source.flush()
+    
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    
+    for variant in ["antes", "depois"]:
+        queue = context.Queue()
+        process = context.Process(target=_run_variant, args=(variant, source.name, queue))
+        process.start()
+        rows.append(queue.get())
+        process.join()
+    
+    report("memória por upload", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.domain.services.interfaces import AIServiceInterface
+
+
+def build_client(ai_service: AIServiceInterface) -> httpx.AsyncClient:
+    """Cria um cliente HTTP que fala direto com o app ASGI usando o serviço de IA informado"""
+    # Todas as requisições vêm do mesmo cliente: o rate limit mediria só respostas 429
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # Sem workers de jobs nem banco em disco durante os benchmarks
+    os.environ.setdefault("JOBS_ENABLED", "false")
+    import main
+    from src.infrastructure.dependency_container import DependencyContainer
+    
+    container = DependencyContainer("benchmark", ai_service=ai_service)
+    main.email_controller = container.email_controller
+    
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://benchmark"
+    )
+
+
+class Timer:
+    """Cronômetro simples para usar com `with`"""
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(name: str, rows: List[Dict[str, Any]], output: Optional[str] = None) -> Dict[str, Any]:
+    """Imprime os resultados em tabela e, opcionalmente, salva em JSON"""
+    print(f"\n== {name} ==")
+    
+    if rows:
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        print("  ".join(f"{column:>20}" for column in columns))
+        for row in rows:
+            print("  ".join(f"{_format(row.get(column, '')):>20}" for column in columns))
+    
+    result = {"benchmark": name, "results": rows}
+    
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"Resultados salvos em {output}")
+    
+    return result
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
@@ -0,0 +1,89 @@
+"""
+Compara dois JSON de benchmarks.suite (base e candidato) e aponta as
+regressões acima do limite. Colunas `ms` ou terminadas em `_ms`/`_ns`
+são tempos (menor é melhor); em `_s` são taxas por segundo (maior é melhor).
+Sai com código 1 se houver regressão, para uso em CI.
+
+    python -m benchmarks.compare base.json candidato.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+def direction(column: str) -> Optional[int]:
+    """+1 se maior é melhor, -1 se menor é melhor, None se a coluna não é comparável"""
+    if column == "ms" or column.endswith(("_ms", "_ns")):
+        return -1
+    if column.endswith("_s"):
+        return 1
+    return None
+
+
+def index_rows(rows: List[Dict]) -> Dict[str, Dict]:
+    """Indexa as linhas pelo valor da primeira coluna (nome do caso)"""
+    return {str(next(iter(row.values()))): row for row in rows if row}
+
+
+def compare(base: Dict, candidate: Dict, threshold: float) -> Tuple[List[Dict], int]:
+    rows = []
+    regressions = 0
+    
+    for benchmark, candidate_rows in candidate["benchmarks"].items():
+        base_rows = index_rows(base["benchmarks"].get(benchmark, []))
+        
+        for case, row in index_rows(candidate_rows).items():
+            previous = base_rows.get(case)
+            if previous is None:
+                continue
+            
+            for column, value in row.items():
+                better = direction(column)
+                old = previous.get(column)
+                if better is None or not isinstance(value, (int, float)) or not old:
+                    continue
+                
+                change = (value - old) / old
+                regression = change * better < -threshold
+                regressions += regression
+                rows.append({
+                    "benchmark": benchmark,
+                    "caso": case,
+                    "metrica": column,
+                    "base": old,
+                    "candidato": value,
+                    "variacao": f"{change:+.1%}",
+                    "status": "REGRESSÃO" if regression else ("melhora" if change * better > threshold else "ok"),
+                })
+    
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Variação tolerada (0.10 = 10%%)")
+    args = parser.parse_args()
+    
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    
+    rows, regressions = compare(base, candidate, args.threshold)
+    
+    print(f"base: {base['ambiente'].get('commit', '')[:10]}  candidato: {candidate['ambiente'].get('commit', '')[:10]}")
+    for row in rows:
+        print(
+            f"{row['status']:>10}  {row['benchmark']:<10} {row['caso']:<40} {row['metrica']:<8}"
+            f" {row['base']:>12} -> {row['candidato']:<12} {row['variacao']}"
+        )
+    
+    print(f"\n{regressions} regressões acima de {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Gerador determinístico de corpus sintético de emails em português
+(texto puro, PDFs e mensagens EML multipart).
+
+Para gravar um corpus em disco:
+    python -m benchmarks.corpus --output corpus --pdf-pages 10
+"""
+import argparse
+import os
+import random
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+WORDS = [
+    "olá", "bom", "dia", "prezado", "prezada", "equipe", "solicitação", "pedido", "reembolso",
+    "atualização", "cadastral", "relatório", "mensal", "reunião", "contrato", "proposta",
+    "comercial", "pagamento", "fatura", "boleto", "vencimento", "transferência", "extrato",
+    "sistema", "acesso", "senha", "erro", "integração", "suporte", "técnico", "urgente",
+    "documentação", "análise", "aprovação", "agendamento", "confirmação", "cancelamento",
+    "obrigado", "obrigada", "agradeço", "parabéns", "feliz", "natal", "ano", "novo", "abraços",
+    "atenciosamente", "cordialmente", "semana", "amanhã", "hoje", "ontem", "necessário",
+    "possível", "disponível", "responsável", "rapidamente", "finalmente", "realizando",
+    "processando", "aguardando", "enviado", "recebido", "atualizada", "verificação",
+    "comunicação", "informação", "prioridade", "felicidade", "capitalismo", "especialista",
+    "cuidadoso", "cuidadosa", "a", "o", "de", "da", "do", "em", "para", "com", "não", "que",
+    "por", "uma", "um", "se", "mais", "já", "está", "são", "até", "após", "também",
+]
+
+PUNCTUATION = [",", ".", "!", "?", ";", ":", " -", "..."]
+
+EDGE_CASES = [
+    "",
+    "   \n\t  ",
+    "Olá, preciso de ajuda com o pedido 12345 que ainda não chegou!",
+    "Contato: joao.silva@empresa.com.br ou (11) 91234-5678 / 11 3456.7890",
+    "Acesse https://site.com.br/descadastrar?email=maria@mail.com&token=abc123 para sair",
+    "http://site/x@y.co|abc e http://a.b/c@d.com/resto",
+    "a@b.http://x.com/path continua aqui",
+    "Telefones: 21987654321, 021 98765 4321, 11-3456-7890",
+    "€߁߂߃߄߅߆߇߈߉߀€ dígitos NKo entre símbolos",
+    "AÇÃO ÍNDICE ÓTIMO Ônibus AVIÃO coração informação",
+    "İstanbul ǅemal ß straße ŒUVRE æther",
+    "palavra_com_underscore e snake_case_variavel __init__",
+    "aaaaaa ababab abcabc aaa aab abb zzzzzzzzzzz xy x",
+    "supercalifragilisticexpialidocious_e_mais_um_pouco_de_texto pneumoultramicroscopicossilicovulcanoconiose",
+    "linha1\nlinha2\r\nlinha3\ttab separador paragrafo\x1cctrl\x00nulo",
+    "emoji 😀 texto 中文 русский العربية 한국어",
+    "não até após já é são está têm há",
+    "realizando processando finalmente rapidamente felicidade capitalismo especialista",
+    "ab12 x9 cd345 a1b2c3 código ID-4455 protocolo#7788",
+    "UPPER lower MiXeD CaSe TeXtO",
+    "ñandú pingüino façade naïve résumé coöperate",
+    "=?utf-8?Q?Ol=C3=A1?= =C3=A7=C3=A3o quoted-printable residual",
+    "<p>Olá&nbsp;<b>mundo</b></p> &amp; entidades",
+]
+
+
+def generate_email_text(rng: random.Random, n_words: int) -> str:
+    """Gera um email sintético com pontuação, números, emails, URLs e telefones"""
+    parts = []
+    
+    for index in range(n_words):
+        roll = rng.random()
+        
+        if roll < 0.01:
+            parts.append(f"contato{rng.randint(1, 99)}@empresa{rng.randint(1, 9)}.com.br")
+        elif roll < 0.02:
+            parts.append(f"https://portal.empresa.com/pedido?id={rng.randint(1000, 9999)}&ref=email")
+        elif roll < 0.03:
+            parts.append(f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}")
+        elif roll < 0.06:
+            parts.append(str(rng.randint(1, 100000)))
+        else:
+            word = rng.choice(WORDS)
+            parts.append(word.capitalize() if rng.random() < 0.1 else word)
+        
+        if rng.random() < 0.08:
+            parts.append(rng.choice(PUNCTUATION))
+        
+        if index and index % rng.randint(12, 25) == 0:
+            parts.append("\n")
+    
+    return " ".join(parts)
+
+
+def preprocess_corpus(size: int = 300, seed: int = 42) -> List[str]:
+    """Casos de borda seguidos de emails sintéticos de tamanhos variados"""
+    rng = random.Random(seed)
+    corpus = list(EDGE_CASES)
+    
+    for _ in range(size):
+        corpus.append(generate_email_text(rng, rng.choice([5, 20, 80, 300, 1500])))
+    
+    return corpus
+
+
+# Modelos de email repetidos (categoria, texto): mudam só nome, data e número do chamado
+TEMPLATES = [
+    ("Produtivo", "Olá equipe de suporte, meu nome é {nome} e gostaria de saber o status do chamado {numero} "
+                  "aberto em {data}. O sistema continua apresentando erro ao gerar o boleto da fatura mensal "
+                  "e preciso de uma solução urgente. Atenciosamente, {nome}"),
+    ("Improdutivo", "Prezados, {nome} aqui. Feliz natal e um próspero ano novo para toda a equipe! "
+                    "Agradeço a parceria durante o ano de {data}. Abraços, {nome}"),
+    ("Produtivo", "Bom dia, solicito o cancelamento do contrato {numero} em nome de {nome}, conforme conversado "
+                  "na reunião de {data}. Favor confirmar o recebimento e enviar a documentação necessária."),
+    ("Produtivo", "Bom dia, {nome}. Segue em anexo o relatório mensal de {data} com os indicadores de vendas "
+                  "e o resumo das pendências do contrato {numero}. Aguardo a aprovação para seguir."),
+    ("Produtivo", "Olá, não consigo acessar o sistema desde {data}. Aparece a mensagem de senha inválida para "
+                  "o usuário {nome}. Já tentei redefinir a senha pelo portal mas o email de confirmação não "
+                  "chega. Protocolo {numero}."),
+    ("Improdutivo", "Olá {nome}, obrigado pelo convite para o evento de {data}! Infelizmente não poderei "
+                    "comparecer, mas desejo muito sucesso a todos. Um abraço."),
+]
+
+FIRST_NAMES = ["Maria", "João", "Ana", "Carlos", "Fernanda", "Ricardo", "Juliana", "Paulo", "Beatriz", "Lucas"]
+LAST_NAMES = ["Silva", "Pereira", "Souza", "Oliveira", "Lima", "Gomes", "Costa", "Ribeiro", "Almeida", "Carvalho"]
+
+
+def template_emails(count: int = 500, seed: int = 42) -> List[Tuple[int, str]]:
+    """(índice do modelo em TEMPLATES, texto) de emails gerados a partir dos modelos"""
+    rng = random.Random(seed)
+    emails = []
+    
+    for _ in range(count):
+        template = rng.randrange(len(TEMPLATES))
+        emails.append((template, TEMPLATES[template][1].format(
+            nome=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            numero=rng.randint(1000, 99999),
+            data=f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/{rng.randint(2020, 2025)}",
+        )))
+    
+    return emails
+
+
+def large_text(n_chars: int = 1_000_000, seed: int = 7) -> str:
+    """Gera um texto grande (por padrão no limite de MAX_CONTENT_LENGTH)"""
+    rng = random.Random(seed)
+    chunks = []
+    total = 0
+    
+    while total < n_chars:
+        chunk = generate_email_text(rng, 500)
+        chunks.append(chunk)
+        total += len(chunk) + 1
+    
+    return "\n".join(chunks)[:n_chars]
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Gera um PDF mínimo (uma página por texto) com fonte Helvetica"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, preenchido depois
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    
+    for text in pages:
+        lines = [text[start:start + 90] for start in range(0, len(text), 90)] or [""]
+        commands = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        for line in lines[:60]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({escaped}) '")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("cp1252", errors="replace")
+        
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+    
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    
+    return bytes(output)
+
+
+def make_eml(
+    body: str,
+    subject: str = "Solicitação de suporte",
+    html: Optional[str] = None,
+    attachments: Optional[List[bytes]] = None,
+    text_last: bool = False,
+    cte: str = "quoted-printable",
+    charset: str = "utf-8",
+) -> bytes:
+    """
+    Gera uma mensagem EML multipart. Com text_last=True os anexos vêm antes
+    do corpo, o pior caso para parsers que procuram o texto por varredura.
+    """
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = "Cliente <cliente@empresa.com.br>"
+    message["To"] = "suporte@autou.com.br"
+    
+    text_part = EmailMessage()
+    text_part.set_content(body, charset=charset, cte=cte)
+    if html is not None:
+        text_part.add_alternative(html, subtype="html", cte=cte)
+    
+    attachment_parts = []
+    for index, data in enumerate(attachments or []):
+        part = EmailMessage()
+        part.set_content(data, maintype="application", subtype="octet-stream", filename=f"anexo{index}.bin")
+        attachment_parts.append(part)
+    
+    if not attachment_parts:
+        message.set_content(body, charset=charset, cte=cte)
+        if html is not None:
+            message.add_alternative(html, subtype="html", cte=cte)
+        return message.as_bytes()
+    
+    message.make_mixed()
+    parts = attachment_parts + [text_part] if text_last else [text_part] + attachment_parts
+    for part in parts:
+        message.attach(part)
+    
+    return message.as_bytes()
+
+
+def pdf_document(pages: int, seed: int = 0, words_per_page: int = 400) -> bytes:
+    """PDF sintético com `pages` páginas de texto"""
+    rng = random.Random(seed)
+    return make_pdf([generate_email_text(rng, words_per_page) for _ in range(pages)])
+
+
+def eml_document(attachments: int = 2, attachment_kb: int = 256, seed: int = 0, text_last: bool = False) -> bytes:
+    """EML multipart com corpo em texto e HTML e `attachments` anexos binários"""
+    rng = random.Random(seed)
+    body = generate_email_text(rng, 200)
+    html = "<html><body>" + "".join(f"<p>{generate_email_text(rng, 30)}</p>" for _ in range(5)) + "</body></html>"
+    blobs = [rng.randbytes(attachment_kb * 1024) for _ in range(attachments)]
+    return make_eml(body, html=html, attachments=blobs, text_last=text_last)
+
+
+def write_corpus(
+    directory: str,
+    emails: int = 100,
+    pdfs: int = 10,
+    pdf_pages: int = 5,
+    emls: int = 20,
+    attachments: int = 2,
+    attachment_kb: int = 256,
+    seed: int = 42
+) -> Dict[str, int]:
+    """Grava emails .txt, PDFs e EMLs sintéticos em `directory` e retorna quantos de cada"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    files = {}
+    
+    for index in range(emails):
+        text = generate_email_text(rng, rng.choice([20, 80, 300, 1500]))
+        files[f"email_{index:05d}.txt"] = text.encode("utf-8")
+    
+    for index in range(pdfs):
+        files[f"documento_{index:05d}.pdf"] = pdf_document(pdf_pages, seed=seed + index)
+    
+    for index in range(emls):
+        files[f"mensagem_{index:05d}.eml"] = eml_document(attachments, attachment_kb, seed=seed + index)
+    
+    for name, content in files.items():
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(content)
+    
+    return {"txt": emails, "pdf": pdfs, "eml": emls}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava um corpus sintético de emails em disco")
+    parser.add_argument("--output", required=True, help="Diretório de saída")
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--pdfs", type=int, default=10)
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    parser.add_argument("--emls", type=int, default=20)
+    parser.add_argument("--attachments", type=int, default=2, help="Anexos por EML")
+    parser.add_argument("--attachment-kb", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    counts = write_corpus(
+        args.output, args.emails, args.pdfs, args.pdf_pages,
+        args.emls, args.attachments, args.attachment_kb, args.seed
+    )
+    print(f"Corpus gravado em {args.output}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from src.domain.entities.email import Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from src.domain.services.interfaces import AIServiceInterface
+
+
+@dataclass
+class FakeResponse:
+    """Resposta mínima compatível com a do SDK do Gemini"""
+    text: str
+
+
+class FakeStreamResponse:
+    """Resposta em streaming: o texto chega em trechos distribuídos ao longo da latência"""
+    
+    def __init__(self, text: str, latency: float, chunk_size: int):
+        self.text = text
+        self.latency = latency
+        self.chunk_size = max(1, chunk_size)
+    
+    async def __aiter__(self):
+        chunks = [self.text[i:i + self.chunk_size] for i in range(0, len(self.text), self.chunk_size)] or [""]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield FakeResponse(chunk)
+
+
+class FakeUpstreamError(Exception):
+    """Falha simulada com o status HTTP em `code`, como as exceções do google.api_core"""
+    
+    def __init__(self, code: int, message: str = "falha simulada do upstream"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeGeminiModel:
+    """
+    Modelo local que simula a latência do Gemini sem acessar a rede.
+    Opcionalmente injeta falhas (failure_rate, com o status error_status) e
+    respostas lentas (slow_rate, com latência slow_latency). Com stream=True,
+    a resposta chega em trechos de chunk_size caracteres.
+    """
+    
+    DEFAULT_RESPONSE = '{"categoria": "Produtivo", "resposta": "Recebemos sua mensagem e retornaremos em breve."}'
+    
+    def __init__(
+        self,
+        latency: float = 0.2,
+        response_text: str = DEFAULT_RESPONSE,
+        failure_rate: float = 0.0,
+        error_status: int = 503,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        chunk_size: int = 16,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.response_text = response_text
+        self.failure_rate = failure_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.chunk_size = chunk_size
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+    
+    def generate_content(self, prompt, **kwargs) -> FakeResponse:
+        """Versão síncrona (bloqueia a thread durante a latência)"""
+        self.calls += 1
+        latency, fail = self._draw()
+        time.sleep(latency)
+        return FakeResponse(self._answer(prompt, fail))
+    
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        """Versão assíncrona (libera o event loop durante a latência)"""
+        self.calls += 1
+        latency, fail = self._draw()
+        
+        if stream:
+            return FakeStreamResponse(self._answer(prompt, fail), latency, self.chunk_size)
+        
+        await asyncio.sleep(latency)
+        return FakeResponse(self._answer(prompt, fail))
+    
+    def _draw(self):
+        """Sorteia a latência e se a chamada vai falhar"""
+        latency = self.slow_latency if self._rng.random() < self.slow_rate else self.latency
+        return latency, self._rng.random() < self.failure_rate
+    
+    def _answer(self, prompt, fail: bool = False) -> str:
+        """Responde prompts em lote com um array JSON, um item por email"""
+        if fail:
+            self.failures += 1
+            raise FakeUpstreamError(self.error_status)
+        
+        batch_ids = re.findall(r'--- Email (\d+) ---', str(prompt))
+        
+        if not batch_ids:
+            return self.response_text
+        
+        answer = json.loads(self.response_text)
+        return json.dumps([dict(answer, id=int(index)) for index in batch_ids], ensure_ascii=False)
+
+
+class QuotaFakeGeminiModel(FakeGeminiModel):
+    """
+    Upstream com cota, como uma chave de API do Gemini: acima de
+    `requests_per_window` chamadas na janela deslizante de `window_seconds`
+    ou de `max_concurrent` chamadas simultâneas responde 429 na hora. A
+    latência cresce com as chamadas em andamento (`congestion` por chamada),
+    como um upstream sobrecarregado.
+    """
+    
+    def __init__(
+        self,
+        requests_per_window: int = 50,
+        window_seconds: float = 1.0,
+        max_concurrent: Optional[int] = None,
+        congestion: float = 0.0,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.requests_per_window = requests_per_window
+        self.window_seconds = window_seconds
+        self.max_concurrent = max_concurrent
+        self.congestion = congestion
+        self._window: deque = deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.rejected = 0
+    
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= self.window_seconds:
+            self._window.popleft()
+        
+        if len(self._window) >= self.requests_per_window or (
+            self.max_concurrent is not None and self.in_flight >= self.max_concurrent
+        ):
+            self.calls += 1
+            self.rejected += 1
+            await asyncio.sleep(0)
+            raise FakeUpstreamError(429, "cota excedida")
+        
+        self._window.append(now)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await super().generate_content_async(prompt, stream=stream, **kwargs)
+        finally:
+            self.in_flight -= 1
+    
+    def _draw(self):
+        latency, fail = super()._draw()
+        return latency * (1 + self.congestion * (self.in_flight - 1)), fail
+
+
+class FakeAIService(AIServiceInterface):
+    """
+    Serviço de IA falso, no lugar de todo o GeminiAIService: mede o pipeline
+    (upload, extração, pré-processamento) sem o SDK, com latência
+    configurável (latency ± jitter) por chamada.
+    """
+    
+    RESPONSE = "Recebemos sua mensagem e retornaremos em breve."
+    
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self.calls = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return self._result(processed_text)
+    
+    async def analyze_batch(self, items: List[Tuple[Email, ProcessedText]]) -> List[EmailAnalysisResult]:
+        """Um lote custa uma chamada, como no serviço real"""
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return [self._result(processed_text) for _, processed_text in items]
+    
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+    
+    def _result(self, processed_text: ProcessedText) -> EmailAnalysisResult:
+        # Categoria determinística pelo texto, para as respostas variarem sem sorteio
+        category = EmailCategory.PRODUCTIVE if len(processed_text.processed) % 3 else EmailCategory.UNPRODUCTIVE
+        return EmailAnalysisResult(category=category, response=self.RESPONSE)
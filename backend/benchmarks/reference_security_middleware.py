@@ -0,0 +1,75 @@
+"""
+Implementação de referência do SecurityMiddleware (BaseHTTPMiddleware).
+
+Usada pelo benchmark de middleware para medir a latência antes da versão
+ASGI pura.
+"""
+from typing import Iterable, Optional
+from fastapi import Request, HTTPException, status
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.infrastructure.security.middleware import rate_limit_exceeded_handler
+from src.infrastructure.security.rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
+
+
+class ReferenceSecurityMiddleware(BaseHTTPMiddleware):
+    """SecurityMiddleware original, baseado em BaseHTTPMiddleware"""
+    
+    def __init__(
+        self,
+        app,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        api_key_header: str = "X-API-Key",
+        trust_proxy_headers: bool = False,
+        exempt_paths: Iterable[str] = ("/",)
+    ):
+        super().__init__(app)
+        self.rate_limiter = rate_limiter
+        self.api_key_header = api_key_header
+        self.trust_proxy_headers = trust_proxy_headers
+        self.exempt_paths = frozenset(exempt_paths)
+    
+    async def dispatch(self, request: Request, call_next):
+        """Processa requisições aplicando verificações de segurança"""
+        
+        # 1. Verifica tamanho do corpo da requisição
+        if hasattr(request, 'content_length') and request.content_length:
+            if request.content_length > 50 * 1024 * 1024:  # 50MB
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Arquivo muito grande"
+                )
+        
+        # 2. Rate limiting por cliente
+        try:
+            await self._check_rate_limit(request)
+            response = await call_next(request)
+        except RateLimitExceeded as e:
+            response = rate_limit_exceeded_handler(request, e)
+        
+        # Adiciona headers de segurança
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Content-Security-Policy"] = "default-src 'self'"
+        
+        return response
+    
+    async def _check_rate_limit(self, request: Request) -> None:
+        """Consome um token do bucket do cliente (API key ou IP)"""
+        if self.rate_limiter is None or request.url.path in self.exempt_paths:
+            return
+        
+        key = self.rate_limiter.client_key(request.headers.get(self.api_key_header), self._client_ip(request))
+        await self.rate_limiter.check(key)
+    
+    def _client_ip(self, request: Request) -> Optional[str]:
+        """IP do cliente; atrás de proxy confiável (ex.: Vercel) usa o X-Forwarded-For"""
+        if self.trust_proxy_headers:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        
+        return request.client.host if request.client else None
@@ -0,0 +1,89 @@
+"""
+Executa a suíte de benchmarks reprodutível (microbenchmarks dos parsers e
+do pré-processamento, métricas, índice de quase duplicados, cold start,
+pool de clientes da IA com cota e carga ponta a ponta de /processar) e
+grava um único JSON com os metadados do ambiente e do commit, para
+comparar execuções com benchmarks.compare.
+
+    python -m benchmarks.suite --output resultados.json
+    python -m benchmarks.suite --quick --output resultados.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from . import bench_client_pool, bench_cold_start, bench_e2e, bench_metrics, bench_near_duplicate, bench_parsers
+from .common import report
+
+
+def environment() -> Dict[str, Any]:
+    """Commit, versão do Python e máquina em que a suíte rodou"""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True, timeout=10
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "alteracoes_locais": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="Menos repetições e requisições (ex.: CI)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência do serviço de IA falso (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+    
+    repeat = 2 if args.quick else 5
+    requests = 30 if args.quick else 200
+    pdf_pages = (1, 10) if args.quick else (1, 10, 50)
+    
+    benchmarks = {
+        "parsers": report("parsers e pré-processamento", bench_parsers.run(pdf_pages, repeat, args.seed)),
+        "metricas": report("métricas", bench_metrics.run(10_000 if args.quick else 100_000)),
+        "quase_duplicados": report(
+            "emails quase duplicados",
+            bench_near_duplicate.run(200 if args.quick else 500, index_entries=2000 if args.quick else 10000)
+        ),
+        "cold_start": report(
+            "cold start (import de main e primeiras respostas)",
+            bench_cold_start.run(repeat)
+        ),
+        "pool_ia": report(
+            "pool de clientes do Gemini com cota",
+            asyncio.run(bench_client_pool.run(100 if args.quick else 300, seed=args.seed))
+        ),
+        "e2e": report(
+            "/processar ponta a ponta",
+            bench_e2e.run(requests, (1, 16, 64), args.latency, seed=args.seed)
+        ),
+    }
+    result = {
+        "ambiente": environment(),
+        "parametros": {"quick": args.quick, "latency": args.latency, "seed": args.seed},
+        "benchmarks": {name: data["results"] for name, data in benchmarks.items()},
+    }
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Classificação em lote de caixas de email inteiras (mbox, Maildir ou um
+diretório de arquivos .eml/.pdf/.txt), sem passar pela API HTTP. Os
+resultados são gravados em JSONL à medida que ficam prontos; rodar de novo
+com o mesmo --output continua de onde parou.
+
+    python bulk.py caixa.mbox --output resultados.jsonl
+    python bulk.py ~/Maildir --output resultados.jsonl --workers 4 --ai-concurrency 32
+"""
+import argparse
+import asyncio
+import sys
+
+from src.infrastructure.bulk.bulk_classifier import BulkClassifier, BulkProgress, JsonlResultWriter
+from src.infrastructure.bulk.mail_sources import SOURCE_FORMATS, iter_mail_items
+from src.infrastructure.dependency_container import DependencyContainer
+from config import api, ai, resilience, cache, near_duplicate, local_classifier, pdf, processing
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Arquivo mbox, diretório Maildir ou diretório com arquivos")
+    parser.add_argument("--output", required=True, help="Arquivo JSONL de resultados (também é o checkpoint)")
+    parser.add_argument("--format", choices=SOURCE_FORMATS, default="auto", help="Formato da origem (auto detecta)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de extração/pré-processamento (padrão: CPUs)")
+    parser.add_argument("--ai-concurrency", type=int, default=ai.MAX_CONCURRENCY, help="Chamadas simultâneas à IA")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Mensagens por tarefa enviada ao pool")
+    parser.add_argument("--retry-errors", action="store_true", help="Processa de novo as mensagens gravadas com erro")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Segundos entre as linhas de progresso")
+    return parser.parse_args(argv)
+
+
+async def classify(args: argparse.Namespace, container: DependencyContainer) -> BulkProgress:
+    writer = JsonlResultWriter(args.output, retry_errors=args.retry_errors)
+    progress = BulkProgress(interval_seconds=args.progress_interval, skipped=len(writer.completed))
+    classifier = BulkClassifier(
+        container.ai_service,
+        workers=args.workers,
+        ai_concurrency=args.ai_concurrency,
+        chunk_size=args.chunk_size,
+        pdf_max_pages=pdf.MAX_PAGES,
+        pdf_max_chars=pdf.MAX_CHARS,
+        stem_cache_size=processing.STEM_CACHE_SIZE
+    )
+    
+    try:
+        await classifier.run(iter_mail_items(args.source, args.format, skip=writer.completed), writer, progress)
+    finally:
+        writer.close()
+    
+    return progress
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    
+    # As chaves de segurança da API (SECRET_KEY, JWT) não são usadas aqui
+    if not api.GEMINI_API_KEY:
+        print("❌ GEMINI_API_KEY não configurada", file=sys.stderr)
+        return 1
+    
+    # Sem API: nada de rate limit, fila de jobs, métricas ou pool de PDF do container
+    container = DependencyContainer(
+        api.GEMINI_API_KEY,
+        processing_config=processing,
+        ai_config=ai,
+        cache_config=cache,
+        near_duplicate_config=near_duplicate,
+        local_classifier_config=local_classifier,
+        resilience_config=resilience
+    )
+    
+    try:
+        asyncio.run(classify(args, container))
+    except KeyboardInterrupt:
+        print("Interrompido: rode o mesmo comando para continuar de onde parou", file=sys.stderr)
+        return 130
+    finally:
+        container.shutdown()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
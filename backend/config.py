@@ -20,6 +20,92 @@ class APIConfig:
     PORT: int = int(os.getenv("API_PORT", "8000"))
     RELOAD: bool = os.getenv("API_RELOAD", "True").lower() == "true"
 
+class AIConfig:
+    """Configurações do serviço de IA"""
+    MODEL_NAME: str = os.getenv("AI_MODEL_NAME", "gemini-1.5-flash")
+    MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "32"))  # Por cliente do pool
+    BATCH_TOKEN_BUDGET: int = int(os.getenv("AI_BATCH_TOKEN_BUDGET", "8000"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("AI_BATCH_MAX_ITEMS", "20"))
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "1500"))  # Tokens do conteúdo de cada email
+    COALESCE_REQUESTS: bool = os.getenv("AI_COALESCE_REQUESTS", "true").lower() == "true"  # Single-flight
+    STRUCTURED_OUTPUT: bool = os.getenv("AI_STRUCTURED_OUTPUT", "true").lower() == "true"  # Saída JSON com schema
+    # Pool de clientes: chave principal + GEMINI_API_KEYS, cada uma com AI_MODEL_NAME + AI_POOL_MODELS
+    API_KEYS: List[str] = [key.strip() for key in os.getenv("GEMINI_API_KEYS", "").split(",") if key.strip()]
+    POOL_MODELS: List[str] = [name.strip() for name in os.getenv("AI_POOL_MODELS", "").split(",") if name.strip()]
+    # Limite AIMD por cliente (até AI_MAX_CONCURRENCY), reduzido por 429 e por aumento de latência
+    ADAPTIVE_CONCURRENCY: bool = os.getenv("AI_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+    INITIAL_CONCURRENCY: int = int(os.getenv("AI_INITIAL_CONCURRENCY", "4"))
+    MIN_CONCURRENCY: int = int(os.getenv("AI_MIN_CONCURRENCY", "1"))
+    LATENCY_TOLERANCE: float = float(os.getenv("AI_LATENCY_TOLERANCE", "2.0"))  # Latência recente / de longo prazo
+    QUOTA_COOLDOWN_SECONDS: float = float(os.getenv("AI_QUOTA_COOLDOWN_SECONDS", "1"))  # Pausa após 429 (dobra a cada 429)
+    QUOTA_MAX_COOLDOWN_SECONDS: float = float(os.getenv("AI_QUOTA_MAX_COOLDOWN_SECONDS", "60"))
+
+class ResilienceConfig:
+    """Configurações de resiliência das chamadas à IA"""
+    ENABLED: bool = os.getenv("AI_RESILIENCE_ENABLED", "true").lower() == "true"
+    TIMEOUT_SECONDS: float = float(os.getenv("AI_TIMEOUT_SECONDS", "15"))  # Prazo de cada tentativa
+    DEADLINE_SECONDS: float = float(os.getenv("AI_DEADLINE_SECONDS", "30"))  # Prazo total, incluindo retries
+    MAX_RETRIES: int = int(os.getenv("AI_MAX_RETRIES", "2"))
+    BACKOFF_BASE_SECONDS: float = float(os.getenv("AI_BACKOFF_BASE_SECONDS", "0.5"))
+    BACKOFF_MAX_SECONDS: float = float(os.getenv("AI_BACKOFF_MAX_SECONDS", "8"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+    HEDGE_AFTER_SECONDS: Optional[float] = float(os.getenv("AI_HEDGE_AFTER_SECONDS") or 0) or None  # Desativado se vazio/0
+    LOCAL_FALLBACK: bool = os.getenv("AI_LOCAL_FALLBACK", "true").lower() == "true"  # Requer o classificador local
+
+class JobConfig:
+    """Configurações da fila de jobs assíncronos (/jobs)"""
+    # Desativada por padrão na Vercel: o disco é somente leitura e os workers não rodam após a resposta
+    ENABLED: bool = os.getenv("JOBS_ENABLED", "false" if os.getenv("VERCEL") else "true").lower() == "true"
+    DB_PATH: str = os.getenv("JOBS_DB_PATH", "jobs.sqlite3")
+    WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    MAX_PENDING: int = int(os.getenv("JOBS_MAX_PENDING", "100"))  # Acima disso, POST /jobs responde 503
+    TIMEOUT_SECONDS: float = float(os.getenv("JOBS_TIMEOUT_SECONDS", "300"))
+    RESULT_TTL_SECONDS: int = int(os.getenv("JOBS_RESULT_TTL_SECONDS", "86400"))
+    # Jobs em processamento há mais que isso (processo que morreu) voltam para a fila
+    LEASE_SECONDS: float = float(os.getenv("JOBS_LEASE_SECONDS") or 0) or TIMEOUT_SECONDS + 60
+
+class MetricsConfig:
+    """Configurações das métricas (/metrics)"""
+    ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+class ProfilingConfig:
+    """Configurações do profiling de requisições"""
+    SECRET: Optional[str] = os.getenv("PROFILING_SECRET") or None  # Assina os tokens do header; desativado se vazio
+    HEADER: str = os.getenv("PROFILING_HEADER", "X-Profile-Token")
+    QUERY_FLAG: bool = APIConfig.DEBUG  # ?profile=1 só em modo debug
+    SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # Fração perfilada continuamente (0 = nenhuma)
+    INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "10"))  # Guardados por tipo (pedidos e mais lentos)
+
+class CacheConfig:
+    """Configurações do cache de análises"""
+    ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+    TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+    DB_PATH: Optional[str] = os.getenv("AI_CACHE_DB_PATH") or None  # Desativa o cache em disco se vazio
+    DB_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_DB_MAX_ENTRIES", "100000"))
+    DB_TTL_SECONDS: int = int(os.getenv("AI_CACHE_DB_TTL_SECONDS", "604800"))
+
+class NearDuplicateConfig:
+    """Configurações do índice de emails quase duplicados (MinHash + LSH)"""
+    ENABLED: bool = os.getenv("NEAR_DUP_ENABLED", "false").lower() == "true"
+    SIMILARITY: float = float(os.getenv("NEAR_DUP_SIMILARITY", "0.8"))  # Jaccard estimada mínima para reaproveitar
+    REUSE_RESPONSE: bool = os.getenv("NEAR_DUP_REUSE_RESPONSE", "false").lower() == "true"  # Senão, resposta modelo
+    NUM_PERM: int = int(os.getenv("NEAR_DUP_NUM_PERM", "64"))
+    SHINGLE_SIZE: int = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", "1"))  # Tokens por shingle
+    MIN_SHINGLES: int = int(os.getenv("NEAR_DUP_MIN_SHINGLES", "5"))  # Textos menores nunca são reaproveitados
+    MAX_ENTRIES: int = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "10000"))
+    TTL_SECONDS: int = int(os.getenv("NEAR_DUP_TTL_SECONDS", "604800"))
+    DB_PATH: Optional[str] = os.getenv("NEAR_DUP_DB_PATH") or None  # Desativa a persistência se vazio
+
+class LocalClassifierConfig:
+    """Configurações do classificador local (atalho sem IA)"""
+    TRAINING_PATH: Optional[str] = os.getenv("LOCAL_CLASSIFIER_TRAINING_PATH") or None  # Desativado se vazio
+    # Vazio: limite ajustado no treino para atingir TARGET_PRECISION em validação cruzada
+    CONFIDENCE_THRESHOLD: Optional[float] = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD") or 0) or None
+    TARGET_PRECISION: float = float(os.getenv("LOCAL_CLASSIFIER_TARGET_PRECISION") or 0) or 0.98
+
 class CORSConfig:
     """Configurações de CORS"""
     ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -29,19 +115,47 @@ class CORSConfig:
 
 class RateLimitConfig:
     """Configurações de rate limiting"""
+    ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
     CALLS: int = int(os.getenv("RATE_LIMIT_CALLS", "60"))
     PERIOD: int = int(os.getenv("RATE_LIMIT_PERIOD", "60"))
+    BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite (compartilhado entre workers)
+    DB_PATH: str = os.getenv("RATE_LIMIT_DB_PATH", "rate_limit.sqlite3")
+    MAX_BUCKETS: int = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "10000"))
+    API_KEY_HEADER: str = os.getenv("RATE_LIMIT_API_KEY_HEADER", "X-API-Key")
+    # API keys com bucket próprio (separadas por vírgula); outras keys no header contam no bucket do IP
+    API_KEYS: List[str] = [key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()]
+    TRUST_PROXY_HEADERS: bool = os.getenv("RATE_LIMIT_TRUST_PROXY_HEADERS", "false").lower() == "true"
 
 class FileConfig:
     """Configurações de upload de arquivos"""
     MAX_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
+    MAX_REQUEST_SIZE: int = int(os.getenv("MAX_REQUEST_SIZE", "52428800"))  # 50MB (corpo inteiro, inclui lotes)
     ALLOWED_TYPES: List[str] = os.getenv("ALLOWED_FILE_TYPES", ".pdf,.eml,.txt,.text").split(",")
 
+class PDFConfig:
+    """Configurações de extração de PDF"""
+    POOL_WORKERS: int = int(os.getenv("PDF_POOL_WORKERS", "2"))  # 0 = extrai em thread, sem pool de processos
+    POOL_START_METHOD: str = os.getenv("PDF_POOL_START_METHOD", "spawn")
+    TIMEOUT_SECONDS: float = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+    # Extração em thread: uma thread que expira continua rodando; com todas ocupadas, o PDF é recusado
+    THREAD_WORKERS: int = int(os.getenv("PDF_THREAD_WORKERS", "2"))
+    MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "50"))
+    MAX_CHARS: int = int(os.getenv("PDF_MAX_CHARS", "100000"))
+
 class ProcessingConfig:
     """Configurações de processamento"""
     MIN_CONTENT_LENGTH: int = int(os.getenv("MIN_CONTENT_LENGTH", "10"))
     MIN_WORD_LENGTH: int = int(os.getenv("MIN_WORD_LENGTH", "2"))
     MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", "1000000"))
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "100"))
+    STEM_CACHE_SIZE: int = int(os.getenv("STEM_CACHE_SIZE", "50000"))
+    # Processos para pré-processar lotes grandes (0 = sempre no processo atual).
+    # O limiar padrão fica acima de MAX_BATCH_SIZE: o pool atende o treino do
+    # classificador local; lotes da API só o usam se MAX_BATCH_SIZE for aumentado
+    PREPROCESS_WORKERS: int = int(os.getenv("PREPROCESS_WORKERS", "0"))
+    PREPROCESS_PARALLEL_THRESHOLD: int = int(os.getenv("PREPROCESS_PARALLEL_THRESHOLD", "256"))
+    # Monta a IA (SDK do Gemini) só no primeiro uso; padrão ativo na Vercel para reduzir o cold start
+    LAZY_INIT: bool = os.getenv("LAZY_INIT", "true" if os.getenv("VERCEL") else "false").lower() == "true"
 
 # Validação de configurações críticas
 def validate_config():
@@ -63,7 +177,16 @@ def validate_config():
 # Configurações consolidadas
 security = SecurityConfig()
 api = APIConfig()
+ai = AIConfig()
+resilience = ResilienceConfig()
+jobs = JobConfig()
+metrics = MetricsConfig()
+profiling = ProfilingConfig()
+cache = CacheConfig()
+local_classifier = LocalClassifierConfig()
+near_duplicate = NearDuplicateConfig()
 cors = CORSConfig()
 rate_limit = RateLimitConfig()
 file_config = FileConfig()
+pdf = PDFConfig()
 processing = ProcessingConfig()
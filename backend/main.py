@@ -1,13 +1,21 @@
 from fastapi import FastAPI, Form, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import json
+import math
 import os
 
 # Importações da aplicação
 from src.infrastructure.dependency_container import DependencyContainer
 from src.infrastructure.security.middleware import SecurityMiddleware, FileSecurityValidator
-from config import api, cors, security, file_config, validate_config
+from src.infrastructure.observability.metrics import PipelineMetrics
+from src.infrastructure.observability.middleware import MetricsMiddleware, ProfilingMiddleware
+from src.presentation.models.responses import EmailRequest
+from src.domain.entities.file import UploadedFile
+from src.domain.exceptions import JobQueueFullError
+from config import api, ai, resilience, jobs, metrics, profiling, cache, near_duplicate, local_classifier, cors, security, file_config, pdf, processing, rate_limit, validate_config
 
 # Valida configurações de segurança
 try:
@@ -17,7 +25,30 @@ except ValueError as e:
     print("Configure adequadamente o arquivo .env antes de usar em produção!")
 
 # Inicializa o container de dependências
-container = DependencyContainer(api.GEMINI_API_KEY)
+container = DependencyContainer(
+    api.GEMINI_API_KEY,
+    processing_config=processing,
+    ai_config=ai,
+    cache_config=cache,
+    near_duplicate_config=near_duplicate,
+    local_classifier_config=local_classifier,
+    pdf_config=pdf,
+    rate_limit_config=rate_limit,
+    resilience_config=resilience,
+    job_config=jobs,
+    metrics_config=metrics,
+    profiling_config=profiling
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia os workers de jobs e libera os recursos do container ao encerrar a aplicação"""
+    if container.job_queue:
+        await container.job_queue.start()
+    yield
+    if container.job_queue:
+        await container.job_queue.stop()
+    container.shutdown()
 
 # Cria a aplicação FastAPI
 app = FastAPI(
@@ -26,10 +57,17 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs" if api.DEBUG else None,  # Desabilita docs em produção
     redoc_url="/redoc" if api.DEBUG else None,  # Desabilita redoc em produção
+    lifespan=lifespan,
 )
 
 # Adiciona middleware de segurança
-app.add_middleware(SecurityMiddleware)
+app.add_middleware(
+    SecurityMiddleware,
+    rate_limiter=container.rate_limiter,
+    api_key_header=rate_limit.API_KEY_HEADER,
+    trust_proxy_headers=rate_limit.TRUST_PROXY_HEADERS,
+    max_body_size=file_config.MAX_REQUEST_SIZE,
+)
 
 # Configura CORS de forma segura
 app.add_middleware(
@@ -40,8 +78,23 @@ app.add_middleware(
     allow_headers=cors.HEADERS,
 )
 
-# Injeta o controller
+# Perfila as requisições pedidas (header assinado ou ?profile=1 em debug) e uma amostra das demais
+if container.profiler:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=container.profiler,
+        store=container.profile_store,
+        authorize=container.profiling_authorizer,
+        sample_rate=profiling.SAMPLE_RATE,
+    )
+
+# Conta requisições e latência por rota (mais externo, inclui as recusadas pelo rate limit)
+if container.metrics:
+    app.add_middleware(MetricsMiddleware, metrics=container.metrics)
+
+# Injeta os controllers
 email_controller = container.email_controller
+job_controller = container.job_controller
 
 # Health check endpoint
 @app.get("/")
@@ -59,13 +112,78 @@ async def health():
         "debug": api.DEBUG
     }
 
-# Handler para validação de arquivos
-async def validate_uploaded_file(file: UploadFile):
-    """Valida arquivo antes do processamento"""
-    if file and file.filename:
-        content = await file.read()
-        await file.seek(0)  # Reset para leitura posterior
-        FileSecurityValidator.validate_file(file.filename, content)
+@app.get("/stats", summary="Estatísticas de processamento")
+async def stats():
+    """Contadores do stemmer, do cache, do classificador local e da fila de jobs"""
+    return container.stats()
+
+@app.get("/metrics", summary="Métricas no formato do Prometheus")
+async def metrics_endpoint():
+    """Requisições, duração por etapa, tamanhos de entrada, chamadas à IA e contadores de /stats"""
+    if container.metrics is None:
+        raise HTTPException(status_code=404, detail="Métricas desativadas")
+    
+    return PlainTextResponse(container.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def require_profiling_access(request: Request) -> None:
+    """Os perfis exigem o mesmo header assinado (ou flag de debug) que os produz"""
+    if container.profiling_authorizer is None or not container.profiling_authorizer(request.scope):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/debug/profiles", summary="Perfis guardados")
+async def list_profiles(request: Request):
+    """Perfis pedidos explicitamente e os mais lentos entre os amostrados"""
+    require_profiling_access(request)
+    return container.profile_store.list()
+
+@app.get("/debug/profiles/{profile_id}", summary="Perfil no formato de flamegraph")
+async def get_profile(profile_id: str, request: Request):
+    """Pilhas colapsadas (flamegraph.pl, speedscope, inferno)"""
+    require_profiling_access(request)
+    profile = container.profile_store.get(profile_id)
+    
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    
+    return PlainTextResponse(profile.folded())
+
+# Handler para leitura e validação de arquivos
+async def read_uploaded_file(file: Optional[UploadFile]) -> Optional[UploadedFile]:
+    """Lê o arquivo uma única vez e valida antes do processamento"""
+    if not file or not file.filename:
+        return None
+    
+    if container.metrics is None:
+        content = await FileSecurityValidator.read_and_validate(file)
+    else:
+        with container.metrics.stage(PipelineMetrics.STAGE_UPLOAD):
+            content = await FileSecurityValidator.read_and_validate(file)
+        container.metrics.observe_file(file.filename, len(content))
+    
+    return UploadedFile(filename=file.filename, content_type=file.content_type, content=content)
+
+
+async def read_required_file(file: UploadFile) -> UploadedFile:
+    """Lê um arquivo obrigatório"""
+    uploaded_file = await read_uploaded_file(file)
+    
+    if uploaded_file is None:
+        raise HTTPException(status_code=400, detail="Nenhum arquivo enviado")
+    
+    return uploaded_file
+
+def parse_batch_emails(emails: str) -> List[EmailRequest]:
+    """Converte o campo `emails` (array JSON de {body, subject}) em requisições"""
+    try:
+        items = json.loads(emails or "[]")
+        if not isinstance(items, list):
+            raise ValueError("esperado um array JSON")
+        return [EmailRequest(**item) for item in items]
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campo 'emails' inválido: {str(e)}"
+        )
 
 # === ENDPOINTS ===
 
@@ -79,11 +197,121 @@ async def process_email(
     Endpoint principal para processamento de emails.
     Aceita texto direto ou arquivos (.txt, .pdf, .eml).
     """
-    # Valida arquivo se fornecido
-    if file:
-        await validate_uploaded_file(file)
+    # Lê e valida o arquivo se fornecido
+    uploaded_file = await read_uploaded_file(file)
+    
+    return await email_controller.process_email(body, subject, uploaded_file)
+
+
+@app.post("/processar/stream", summary="Processa um email com a resposta em streaming (SSE)")
+async def process_email_stream(
+    body: str = Form(""),
+    subject: str = Form(""),
+    file: Optional[UploadFile] = File(None)
+):
+    """
+    Mesmo contrato de /processar, respondendo em Server-Sent Events:
+    `categoria` assim que decidida, `resposta` com cada trecho do texto e
+    `resultado` com a análise completa (o mesmo JSON de /processar).
+    """
+    uploaded_file = await read_uploaded_file(file)
+    
+    return StreamingResponse(
+        email_controller.process_email_stream(body, subject, uploaded_file),
+        media_type="text/event-stream",
+        # Sem cache nem buffering em proxies, para que cada evento chegue assim que gerado
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/processar/lote", summary="Processa e analisa vários emails")
+async def process_email_batch(
+    emails: str = Form("[]"),
+    files: Optional[List[UploadFile]] = File(None)
+):
+    """
+    Endpoint para processamento em lote.
+    Aceita um array JSON de emails ({"body", "subject"}) e/ou vários arquivos.
+    """
+    email_requests = parse_batch_emails(emails)
+    files = files or []
+    
+    if len(email_requests) + len(files) > processing.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote muito grande. Máximo: {processing.MAX_BATCH_SIZE} emails"
+        )
+    
+    uploaded_files = [await read_uploaded_file(file) for file in files]
+    
+    return await email_controller.process_email_batch(
+        email_requests,
+        [uploaded_file for uploaded_file in uploaded_files if uploaded_file]
+    )
+
+
+@app.post("/jobs", status_code=202, summary="Enfileira o processamento de emails")
+async def submit_job(
+    body: str = Form(""),
+    subject: str = Form(""),
+    emails: str = Form("[]"),
+    files: Optional[List[UploadFile]] = File(None)
+):
+    """
+    Processamento assíncrono: aceita body/subject, o array `emails` de
+    /processar/lote e arquivos, e responde 202 com o id do job. Um único item
+    gera o resultado de /processar; vários, o de /processar/lote. O resultado
+    é consultado em GET /jobs/{id}.
+    """
+    if job_controller is None:
+        raise HTTPException(status_code=404, detail="Fila de jobs desativada")
+    
+    email_requests = parse_batch_emails(emails)
+    if body or subject:
+        email_requests.insert(0, EmailRequest(body=body, subject=subject))
+    files = files or []
+    
+    if len(email_requests) + len(files) > processing.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote muito grande. Máximo: {processing.MAX_BATCH_SIZE} emails"
+        )
+    
+    uploaded_files = [await read_uploaded_file(file) for file in files]
+    uploaded_files = [uploaded_file for uploaded_file in uploaded_files if uploaded_file]
+    
+    if not email_requests and not uploaded_files:
+        raise HTTPException(status_code=400, detail="Nenhum email ou arquivo enviado")
+    
+    try:
+        job = await job_controller.submit(email_requests, uploaded_files)
+    except JobQueueFullError as e:
+        # Backpressure: recusa em vez de enfileirar sem limite
+        retry_after = max(1, math.ceil(e.retry_after))
+        return JSONResponse(
+            status_code=503,
+            content={
+                "error": "Fila de jobs cheia",
+                "detail": "Muitos jobs pendentes. Tente novamente mais tarde.",
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    return JSONResponse(status_code=202, content=job.model_dump(), headers={"Location": job.url})
+
+
+@app.get("/jobs/{job_id}", summary="Estado e resultado de um job")
+async def get_job(job_id: str):
+    """
+    Estado do job (na_fila, processando, concluido, falhou), tempos de fila
+    e de processamento e, quando concluído, o resultado.
+    """
+    job = await job_controller.get(job_id) if job_controller else None
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
     
-    return await email_controller.process_email(body, subject, file)
+    return job
 
 
 @app.post("/extract-text", summary="Extrai texto de arquivos")
@@ -91,8 +319,7 @@ async def extract_text(file: UploadFile = File(...)):
     """
     Endpoint para testar extração de texto de arquivos.
     """
-    await validate_uploaded_file(file)
-    return await email_controller.extract_text_from_file(file)
+    return await email_controller.extract_text_from_file(await read_required_file(file))
 
 
 @app.post("/preprocess", summary="Testa pré-processamento de texto")
@@ -125,8 +352,7 @@ if api.DEBUG:
         """
         Endpoint para debug específico de arquivos EML.
         """
-        await validate_uploaded_file(file)
-        return await email_controller.extract_text_from_file(file)
+        return await email_controller.extract_text_from_file(await read_required_file(file))
 
     @app.post("/test", summary="Teste simples da API")
     async def test_endpoint():
@@ -1,9 +1,14 @@
-from typing import Optional
-from fastapi import UploadFile
+import asyncio
+from contextlib import nullcontext
+from typing import AsyncIterator, List, Optional, Tuple
 
-from ...domain.entities.email import Email, EmailAnalysisResult, EmailCategory
-from ...domain.entities.file import FileInfo
+from ...domain.entities.email import (
+    AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText, StreamEventType
+)
+from ...domain.entities.file import UploadedFile
+from ...domain.exceptions import FileParsingError
 from ...domain.services.interfaces import TextProcessorInterface, AIServiceInterface
+from ...infrastructure.observability.metrics import PipelineMetrics
 from ...infrastructure.parsers.file_parser_factory import FileParserFactory
 
 
@@ -14,62 +19,175 @@ class ProcessEmailUseCase:
         self,
         text_processor: TextProcessorInterface,
         ai_service: AIServiceInterface,
-        file_parser_factory: FileParserFactory
+        file_parser_factory: FileParserFactory,
+        metrics: Optional[PipelineMetrics] = None
     ):
         self._text_processor = text_processor
         self._ai_service = ai_service
         self._file_parser_factory = file_parser_factory
+        self._metrics = metrics
     
     async def execute(
         self,
         body: str = "",
         subject: str = "",
-        file: Optional[UploadFile] = None
+        file: Optional[UploadedFile] = None
     ) -> EmailAnalysisResult:
         """Executa o processamento completo do email"""
         
         # 1. Extrai conteúdo do arquivo ou usa o body
-        content = await self._extract_content(file, body)
+        try:
+            content = await self._extract_content(file, body)
+        except FileParsingError as e:
+            return self.parsing_error_result(e)
         
         # 2. Cria a entidade Email
         email = Email(content=content, subject=subject if subject.strip() else None)
         
         # 3. Valida se o email tem conteúdo suficiente
         if not email.is_valid():
-            return EmailAnalysisResult(
-                category=EmailCategory.PRODUCTIVE,  # Default seguro
-                response="Nenhum conteúdo fornecido. Envie um texto ou arquivo com conteúdo válido.",
-                error="Conteúdo insuficiente"
-            )
+            return self.insufficient_content_result()
         
         # 4. Pré-processa o texto
-        processed_text = self._text_processor.preprocess_text(email.get_full_content())
+        processed_text = self._preprocess(email)
         
         # 5. Analisa com IA
-        result = await self._ai_service.analyze_email(email, processed_text)
+        with self._stage(PipelineMetrics.STAGE_AI):
+            result = await self._ai_service.analyze_email(email, processed_text)
         
         return result
     
-    async def _extract_content(self, file: Optional[UploadFile], body: str) -> str:
+    async def execute_stream(
+        self,
+        body: str = "",
+        subject: str = "",
+        file: Optional[UploadedFile] = None
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Como execute, mas emitindo a categoria e a resposta em trechos conforme a IA gera"""
+        try:
+            content = await self._extract_content(file, body)
+        except FileParsingError as e:
+            yield AnalysisStreamEvent(StreamEventType.RESULT, result=self.parsing_error_result(e))
+            return
+        
+        email = Email(content=content, subject=subject if subject.strip() else None)
+        
+        if not email.is_valid():
+            yield AnalysisStreamEvent(StreamEventType.RESULT, result=self.insufficient_content_result())
+            return
+        
+        processed_text = self._preprocess(email)
+        
+        with self._stage(PipelineMetrics.STAGE_AI):
+            async for event in self._ai_service.analyze_email_stream(email, processed_text):
+                yield event
+    
+    async def execute_batch(
+        self,
+        emails: List[Tuple[str, str]],
+        files: Optional[List[UploadedFile]] = None
+    ) -> List[EmailAnalysisResult]:
+        """Processa vários emails (pares corpo/assunto e arquivos) em uma única análise em lote"""
+        contents = [(body.strip(), subject) for body, subject in emails]
+        
+        for file in files or []:
+            try:
+                contents.append((await self._extract_content(file, ""), ""))
+            except FileParsingError as e:
+                contents.append((e, ""))
+        
+        results: List[Optional[EmailAnalysisResult]] = [None] * len(contents)
+        valid: List[Tuple[int, Email]] = []
+        
+        for index, (content, subject) in enumerate(contents):
+            if isinstance(content, FileParsingError):
+                results[index] = self.parsing_error_result(content)
+                continue
+            
+            email = Email(content=content, subject=subject if subject.strip() else None)
+            
+            if not email.is_valid():
+                results[index] = self.insufficient_content_result()
+                continue
+            
+            valid.append((index, email))
+        
+        # Pré-processamento de todos os emails válidos em uma única chamada ao processador
+        processed_texts = await self._preprocess_batch([email for _, email in valid])
+        pending = [(index, email, processed_text) for (index, email), processed_text in zip(valid, processed_texts)]
+        
+        if pending:
+            with self._stage(PipelineMetrics.STAGE_AI):
+                analyzed = await self._ai_service.analyze_batch(
+                    [(email, processed_text) for _, email, processed_text in pending]
+                )
+            for (index, _, _), result in zip(pending, analyzed):
+                results[index] = result
+        
+        return results
+    
+    def _preprocess(self, email: Email) -> ProcessedText:
+        """Pré-processa o conteúdo completo do email, registrando o comprimento do texto"""
+        content = email.get_full_content()
+        
+        if self._metrics:
+            self._metrics.observe_text(len(content))
+        
+        with self._stage(PipelineMetrics.STAGE_PREPROCESS):
+            return self._text_processor.preprocess_text(content)
+    
+    async def _preprocess_batch(self, emails: List[Email]) -> List[ProcessedText]:
+        """
+        Como _preprocess, para vários emails de uma vez (na ordem recebida).
+        Roda em uma thread: um lote de até MAX_BATCH_SIZE textos longos
+        bloquearia o event loop.
+        """
+        contents = [email.get_full_content() for email in emails]
+        
+        if self._metrics:
+            for content in contents:
+                self._metrics.observe_text(len(content))
+        
+        with self._stage(PipelineMetrics.STAGE_PREPROCESS):
+            return await asyncio.to_thread(self._text_processor.preprocess_batch, contents)
+    
+    def _stage(self, stage: str):
+        """Mede a duração da etapa quando as métricas estão configuradas"""
+        return self._metrics.stage(stage) if self._metrics else nullcontext()
+    
+    @staticmethod
+    def insufficient_content_result() -> EmailAnalysisResult:
+        """Resultado padrão para emails sem conteúdo suficiente"""
+        return EmailAnalysisResult(
+            category=EmailCategory.PRODUCTIVE,  # Default seguro
+            response="Nenhum conteúdo fornecido. Envie um texto ou arquivo com conteúdo válido.",
+            error="Conteúdo insuficiente"
+        )
+    
+    @staticmethod
+    def parsing_error_result(error: FileParsingError) -> EmailAnalysisResult:
+        """Resultado para arquivos cujo texto não pôde ser extraído"""
+        return EmailAnalysisResult(
+            category=EmailCategory.PRODUCTIVE,  # Default seguro
+            response="Não foi possível extrair o texto do arquivo. Verifique o arquivo e tente novamente.",
+            error=error.message,
+            error_code=error.code
+        )
+    
+    async def _extract_content(self, file: Optional[UploadedFile], body: str) -> str:
         """Extrai conteúdo do arquivo ou retorna o body"""
         if file and file.filename:
             return await self._extract_from_file(file)
         
         return body.strip()
     
-    async def _extract_from_file(self, file: UploadFile) -> str:
+    async def _extract_from_file(self, file: UploadedFile) -> str:
         """Extrai conteúdo de um arquivo"""
         try:
-            file_content = await file.read()
-            await file.seek(0)  # Reset file pointer
-            
-            file_info = FileInfo(
-                filename=file.filename or "",
-                content_type=file.content_type,
-                size=len(file_content)
-            )
-            
-            return self._file_parser_factory.parse_file(file_content, file_info)
-            
+            with self._stage(PipelineMetrics.STAGE_EXTRACTION):
+                return await self._file_parser_factory.parse_file_async(file.content, file.get_info())
+        
+        except FileParsingError:
+            raise
         except Exception as e:
             return f"Erro ao processar arquivo {file.filename}: {str(e)}"
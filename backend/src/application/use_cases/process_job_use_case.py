@@ -0,0 +1,23 @@
+from ...domain.entities.job import JobRequest
+from .process_email_use_case import ProcessEmailUseCase
+
+
+class ProcessJobUseCase:
+    """Caso de uso executado pelos workers: processa a entrada de um job"""
+    
+    def __init__(self, process_email_use_case: ProcessEmailUseCase):
+        self._process_email_use_case = process_email_use_case
+    
+    async def execute(self, request: JobRequest) -> dict:
+        """Um único item sai no formato de /processar; vários, no de /processar/lote"""
+        if request.is_single():
+            body, subject = request.emails[0] if request.emails else ("", "")
+            file = request.files[0] if request.files else None
+            result = await self._process_email_use_case.execute(body, subject, file)
+            return result.to_dict()
+        
+        results = await self._process_email_use_case.execute_batch(request.emails, request.files)
+        return {
+            "resultados": [result.to_dict() for result in results],
+            "total": len(results)
+        }
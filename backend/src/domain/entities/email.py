@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 
 class EmailCategory(Enum):
@@ -28,10 +28,10 @@ class Email:
         
         if self.sender:
             parts.append(f"De: {self.sender}")
-            
+        
         if parts:
             parts.append("")  # Linha em branco
-            
+        
         parts.append(self.content)
         
         return "\n".join(parts)
@@ -56,6 +56,8 @@ class EmailAnalysisResult:
     category: EmailCategory
     response: str
     error: Optional[str] = None
+    error_code: Optional[str] = None
+    prompt_tokens: Optional[int] = None  # Estimativa local; None se não houve chamada ao modelo
     
     def to_dict(self) -> dict:
         """Converte o resultado para dicionário"""
@@ -66,5 +68,37 @@ class EmailAnalysisResult:
         
         if self.error:
             result["erro"] = self.error
-            
+        
+        if self.error_code:
+            result["codigo_erro"] = self.error_code
+        
+        if self.prompt_tokens is not None:
+            result["tokens_prompt"] = self.prompt_tokens
+        
         return result
+
+
+class StreamEventType(Enum):
+    CATEGORY = "categoria"
+    DELTA = "resposta"
+    RESULT = "resultado"
+
+
+@dataclass
+class AnalysisStreamEvent:
+    """Evento da análise em streaming: categoria, trecho da resposta ou resultado final"""
+    type: StreamEventType
+    text: str = ""
+    result: Optional[EmailAnalysisResult] = None
+    
+    @classmethod
+    def from_result(cls, result: EmailAnalysisResult) -> List["AnalysisStreamEvent"]:
+        """Eventos equivalentes a um resultado já completo (erros vão direto ao resultado)"""
+        if result.error:
+            return [cls(StreamEventType.RESULT, result=result)]
+        
+        return [
+            cls(StreamEventType.CATEGORY, text=result.category.value),
+            cls(StreamEventType.DELTA, text=result.response),
+            cls(StreamEventType.RESULT, result=result),
+        ]
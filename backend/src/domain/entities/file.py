@@ -1,5 +1,9 @@
+import mmap
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
+
+# Conteúdo de arquivo: bytes em memória ou arquivo temporário mapeado (mmap)
+FileContent = Union[bytes, mmap.mmap]
 
 
 @dataclass
@@ -24,3 +28,19 @@ class FileInfo:
     def is_text(self) -> bool:
         """Verifica se é um arquivo de texto"""
         return self.get_extension() in ["txt", "text"]
+
+
+@dataclass
+class UploadedFile:
+    """Arquivo enviado, lido uma única vez (ou mapeado do arquivo temporário)"""
+    filename: str
+    content_type: Optional[str]
+    content: FileContent
+    
+    def get_info(self) -> FileInfo:
+        """Retorna as informações do arquivo"""
+        return FileInfo(
+            filename=self.filename,
+            content_type=self.content_type,
+            size=len(self.content)
+        )
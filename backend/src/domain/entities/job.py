@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional, Tuple
+
+from .file import UploadedFile
+
+
+class JobStatus(Enum):
+    QUEUED = "na_fila"
+    RUNNING = "processando"
+    DONE = "concluido"
+    FAILED = "falhou"
+
+
+@dataclass
+class JobRequest:
+    """Entrada de um job: emails (corpo, assunto) e arquivos a processar"""
+    emails: List[Tuple[str, str]] = field(default_factory=list)
+    files: List[UploadedFile] = field(default_factory=list)
+    
+    def is_single(self) -> bool:
+        """Um único email ou arquivo: processado como em /processar"""
+        return len(self.emails) + len(self.files) == 1
+    
+    def size(self) -> int:
+        """Bytes de entrada (textos e arquivos)"""
+        text_bytes = sum(len(body.encode("utf-8")) + len(subject.encode("utf-8")) for body, subject in self.emails)
+        return text_bytes + sum(len(file.content) for file in self.files)
+
+
+@dataclass
+class Job:
+    """Job assíncrono com estado, resultado e tempos de fila e de processamento"""
+    id: str
+    status: JobStatus
+    created_at: float
+    items: int = 0
+    input_bytes: int = 0
+    attempts: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    
+    def timings(self) -> dict:
+        """Tempos em milissegundos (apenas as etapas já alcançadas)"""
+        timings = {}
+        
+        if self.started_at is not None:
+            timings["fila_ms"] = round((self.started_at - self.created_at) * 1000, 1)
+        
+        if self.finished_at is not None and self.started_at is not None:
+            timings["processamento_ms"] = round((self.finished_at - self.started_at) * 1000, 1)
+            timings["total_ms"] = round((self.finished_at - self.created_at) * 1000, 1)
+        
+        return timings
+    
+    def to_dict(self) -> dict:
+        """Converte o job para dicionário"""
+        job = {
+            "id": self.id,
+            "status": self.status.value,
+            "criado_em": self.created_at,
+            "itens": self.items,
+            "bytes_entrada": self.input_bytes,
+            "tentativas": self.attempts,
+            "tempos": self.timings()
+        }
+        
+        if self.result is not None:
+            job["resultado"] = self.result
+        
+        if self.error:
+            job["erro"] = self.error
+        
+        return job
@@ -0,0 +1,41 @@
+from typing import Dict
+
+
+class FileParsingError(Exception):
+    """Erro estruturado na extração de texto de um arquivo"""
+    
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+    
+    def __reduce__(self):
+        # Permite que o erro atravesse a fronteira de processos (pool de extração)
+        return (self.__class__, (self.code, self.message))
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Converte o erro para dicionário"""
+        return {"codigo": self.code, "mensagem": self.message}
+
+
+class AIServiceError(Exception):
+    """Falha na chamada ao serviço de IA (timeout, cota, indisponibilidade)"""
+    
+    def __init__(self, code: str, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retryable = retryable
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Converte o erro para dicionário"""
+        return {"codigo": self.code, "mensagem": self.message}
+
+
+class JobQueueFullError(Exception):
+    """Fila de jobs cheia: o cliente deve tentar de novo mais tarde"""
+    
+    def __init__(self, pending: int, retry_after: float):
+        super().__init__(f"Fila de jobs cheia ({pending} pendentes)")
+        self.pending = pending
+        self.retry_after = retry_after
@@ -1,7 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import AsyncIterator, Iterable, List, Protocol, Tuple
 
-from ..entities.email import Email, EmailAnalysisResult, ProcessedText
+from ..entities.email import AnalysisStreamEvent, Email, EmailAnalysisResult, ProcessedText
+from ..entities.file import FileContent
 
 
 class TextProcessorInterface(ABC):
@@ -11,6 +13,10 @@ class TextProcessorInterface(ABC):
     def preprocess_text(self, text: str) -> ProcessedText:
         """Pré-processa o texto removendo stop words e aplicando stemming"""
         pass
+    
+    def preprocess_batch(self, texts: Iterable[str]) -> List[ProcessedText]:
+        """Pré-processa vários textos, preservando a ordem (padrão: um preprocess_text por texto)"""
+        return [self.preprocess_text(text) for text in texts]
 
 
 class AIServiceInterface(ABC):
@@ -20,6 +26,26 @@ class AIServiceInterface(ABC):
     async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
         """Analisa um email e gera uma resposta"""
         pass
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Analisa vários emails, preservando a ordem (padrão: um analyze_email por item)"""
+        results = await asyncio.gather(
+            *(self.analyze_email(email, processed_text) for email, processed_text in items)
+        )
+        return list(results)
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Analisa emitindo a categoria e a resposta em trechos (padrão: resultado completo de uma vez)"""
+        result = await self.analyze_email(email, processed_text)
+        for event in AnalysisStreamEvent.from_result(result):
+            yield event
 
 
 class FileParserInterface(Protocol):
@@ -29,6 +55,6 @@ class FileParserInterface(Protocol):
         """Verifica se pode fazer parse do arquivo"""
         ...
     
-    def parse(self, file_content: bytes) -> str:
+    def parse(self, file_content: FileContent) -> str:
         """Faz parse do conteúdo do arquivo"""
         ...
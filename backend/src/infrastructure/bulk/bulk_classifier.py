@@ -0,0 +1,253 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Set, TextIO
+
+from ...application.use_cases.process_email_use_case import ProcessEmailUseCase
+from ...domain.entities.email import Email, EmailAnalysisResult, ProcessedText
+from ...domain.entities.file import FileInfo
+from ...domain.exceptions import FileParsingError
+from ...domain.services.interfaces import AIServiceInterface
+from ..external.hybrid_processor import HybridTextProcessor
+from ..parsers.file_parser_factory import FileParserFactory
+from ..parsers.pdf_parser import PDFParser
+from .mail_sources import MailItem
+
+
+@dataclass
+class PreparedEmail:
+    """Mensagem já extraída e pré-processada no pool (sem email se o conteúdo for insuficiente)"""
+    item_id: str
+    email: Optional[Email] = None
+    processed_text: Optional[ProcessedText] = None
+    error: Optional[FileParsingError] = None
+
+
+# Parsers e processador de texto de cada processo do pool, criados uma única vez pelo initializer
+_worker_parsers: Optional[FileParserFactory] = None
+_worker_processor: Optional[HybridTextProcessor] = None
+
+
+def _init_worker(pdf_max_pages: Optional[int], pdf_max_chars: Optional[int], stem_cache_size: int) -> None:
+    """Executado uma vez em cada processo filho"""
+    global _worker_parsers, _worker_processor
+    _worker_parsers = FileParserFactory(pdf_parser=PDFParser(max_pages=pdf_max_pages, max_chars=pdf_max_chars))
+    _worker_processor = HybridTextProcessor(stem_cache_size=stem_cache_size)
+
+
+def _prepare_chunk(items: List[MailItem]) -> List[PreparedEmail]:
+    """Executado no processo filho: um lote de mensagens por tarefa reduz o custo de IPC"""
+    return [_prepare(item) for item in items]
+
+
+def _prepare(item: MailItem) -> PreparedEmail:
+    try:
+        content = item.read()
+        text = _worker_parsers.parse_file(content, FileInfo(filename=item.filename, content_type=None, size=len(content)))
+    except FileParsingError as e:
+        return PreparedEmail(item.item_id, error=e)
+    except OSError as e:
+        return PreparedEmail(item.item_id, error=FileParsingError("arquivo_ilegivel", f"Falha ao ler o arquivo: {e}"))
+    
+    email = Email(content=text.strip())
+    if not email.is_valid():
+        return PreparedEmail(item.item_id)
+    
+    return PreparedEmail(item.item_id, email=email, processed_text=_worker_processor.preprocess_text(email.get_full_content()))
+
+
+def _next_chunk(items: Iterator[MailItem], size: int) -> List[MailItem]:
+    return list(islice(items, size))
+
+
+class JsonlResultWriter:
+    """
+    Grava um resultado por linha ({"id", "categoria", "resposta"[, "erro",
+    "codigo_erro"]}) logo que fica pronto. O próprio arquivo é o checkpoint:
+    ao reabrir, os ids já gravados são pulados e uma última linha incompleta
+    (execução interrompida no meio da escrita) é descartada. Com
+    retry_errors, mensagens gravadas com erro são processadas de novo (vale
+    a última linha de cada id).
+    """
+    
+    def __init__(self, path: str, retry_errors: bool = False):
+        self._path = path
+        self.completed: Set[str] = self._load(retry_errors) if os.path.exists(path) else set()
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def write(self, item_id: str, result: EmailAnalysisResult) -> None:
+        """Acrescenta o resultado (flush a cada linha: uma interrupção perde no máximo a linha em curso)"""
+        self._file.write(json.dumps({"id": item_id, **result.to_dict()}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.completed.add(item_id)
+    
+    def close(self) -> None:
+        """Garante os resultados em disco e fecha o arquivo"""
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+    
+    def _load(self, retry_errors: bool) -> Set[str]:
+        """Ids já concluídos; trunca o arquivo na última linha válida"""
+        completed: Set[str] = set()
+        valid_size = 0
+        
+        with open(self._path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                
+                valid_size += len(line)
+                if retry_errors and "erro" in record:
+                    completed.discard(record["id"])
+                else:
+                    completed.add(record["id"])
+        
+        if valid_size < os.path.getsize(self._path):
+            os.truncate(self._path, valid_size)
+        
+        return completed
+
+
+class BulkProgress:
+    """Contadores da execução, impressos periodicamente com a vazão"""
+    
+    def __init__(self, stream: Optional[TextIO] = sys.stderr, interval_seconds: float = 5.0, skipped: int = 0):
+        self._stream = stream
+        self._interval_seconds = interval_seconds
+        self.skipped = skipped
+        self.processed = 0
+        self.errors = 0
+        self._started = time.perf_counter()
+        self._last_report = self._started
+    
+    def record(self, result: EmailAnalysisResult) -> None:
+        self.processed += 1
+        self.errors += bool(result.error or result.error_code)
+        
+        now = time.perf_counter()
+        if now - self._last_report >= self._interval_seconds:
+            self._last_report = now
+            self.report()
+    
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+    
+    @property
+    def throughput(self) -> float:
+        """Mensagens classificadas por segundo desde o início"""
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+    
+    def report(self) -> None:
+        if self._stream is not None:
+            print(
+                f"{self.processed} emails em {self.elapsed:.1f}s ({self.throughput:.1f} emails/s), "
+                f"{self.errors} com erro, {self.skipped} já processados",
+                file=self._stream,
+                flush=True
+            )
+
+
+class BulkClassifier:
+    """
+    Classifica caixas de email inteiras fora da API: a extração e o
+    pré-processamento rodam em um pool de processos (CPU) e as chamadas à IA
+    em um número limitado de tarefas assíncronas (I/O). As filas entre as
+    etapas são limitadas, então a memória não cresce com o tamanho da caixa.
+    """
+    
+    def __init__(
+        self,
+        ai_service: AIServiceInterface,
+        workers: Optional[int] = None,
+        ai_concurrency: int = 16,
+        chunk_size: int = 8,
+        pdf_max_pages: Optional[int] = None,
+        pdf_max_chars: Optional[int] = None,
+        stem_cache_size: int = 50000,
+        start_method: str = "spawn"
+    ):
+        self._ai_service = ai_service
+        self._workers = max(1, workers or os.cpu_count() or 1)
+        self._ai_concurrency = max(1, ai_concurrency)
+        self._chunk_size = max(1, chunk_size)
+        self._worker_args = (pdf_max_pages, pdf_max_chars, stem_cache_size)
+        self._start_method = start_method
+    
+    async def run(self, items: Iterable[MailItem], writer: JsonlResultWriter, progress: BulkProgress) -> None:
+        """Processa as mensagens e grava cada resultado assim que a IA responde"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._ai_concurrency * 2)
+        executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context(self._start_method),
+            initializer=_init_worker,
+            initargs=self._worker_args
+        )
+        tasks = [asyncio.create_task(self._produce(executor, iter(items), queue))]
+        tasks += [asyncio.create_task(self._consume(queue, writer, progress)) for _ in range(self._ai_concurrency)]
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            progress.report()
+    
+    async def _produce(self, executor: ProcessPoolExecutor, items: Iterator[MailItem], queue: asyncio.Queue) -> None:
+        """Envia lotes ao pool (no máximo dois por processo em andamento) e enfileira os resultados"""
+        loop = asyncio.get_running_loop()
+        pending = set()
+        
+        while True:
+            # Ler o mbox/Maildir é I/O bloqueante
+            chunk = await asyncio.to_thread(_next_chunk, items, self._chunk_size)
+            if not chunk:
+                break
+            
+            pending.add(loop.run_in_executor(executor, _prepare_chunk, chunk))
+            if len(pending) >= self._workers * 2:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                await self._enqueue(done, queue)
+        
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+            await self._enqueue(done, queue)
+        
+        for _ in range(self._ai_concurrency):
+            await queue.put(None)
+    
+    @staticmethod
+    async def _enqueue(done, queue: asyncio.Queue) -> None:
+        for future in done:
+            for prepared in future.result():
+                await queue.put(prepared)
+    
+    async def _consume(self, queue: asyncio.Queue, writer: JsonlResultWriter, progress: BulkProgress) -> None:
+        while (prepared := await queue.get()) is not None:
+            result = await self._analyze(prepared)
+            writer.write(prepared.item_id, result)
+            progress.record(result)
+    
+    async def _analyze(self, prepared: PreparedEmail) -> EmailAnalysisResult:
+        """Mesmos resultados do caso de uso para arquivos ilegíveis e conteúdo insuficiente"""
+        if prepared.error is not None:
+            return ProcessEmailUseCase.parsing_error_result(prepared.error)
+        
+        if prepared.email is None:
+            return ProcessEmailUseCase.insufficient_content_result()
+        
+        return await self._ai_service.analyze_email(prepared.email, prepared.processed_text)
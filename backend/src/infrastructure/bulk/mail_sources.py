@@ -0,0 +1,84 @@
+import mailbox
+import os
+from dataclasses import dataclass
+from typing import Collection, Iterator, Optional
+
+# Extensões lidas de um diretório (as mesmas que a API aceita)
+SUPPORTED_EXTENSIONS = (".eml", ".pdf", ".txt", ".text")
+
+SOURCE_FORMATS = ("auto", "mbox", "maildir", "dir")
+
+
+@dataclass
+class MailItem:
+    """
+    Mensagem de uma caixa de email a classificar. `item_id` é estável entre
+    execuções (é a chave do checkpoint). Mensagens de mbox/Maildir trazem o
+    conteúdo em bytes; arquivos de diretório são lidos pelo próprio worker.
+    """
+    item_id: str
+    filename: str
+    content: Optional[bytes] = None
+    path: Optional[str] = None
+    
+    def read(self) -> bytes:
+        """Conteúdo da mensagem (lê o arquivo se ainda não foi carregado)"""
+        if self.content is not None:
+            return self.content
+        
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def detect_format(path: str) -> str:
+    """Maildir se houver cur/new/tmp, diretório comum se for pasta, senão mbox"""
+    if os.path.isdir(path):
+        if all(os.path.isdir(os.path.join(path, sub)) for sub in ("cur", "new", "tmp")):
+            return "maildir"
+        return "dir"
+    
+    return "mbox"
+
+
+def iter_mail_items(path: str, source_format: str = "auto", skip: Collection[str] = ()) -> Iterator[MailItem]:
+    """Percorre as mensagens da origem, sem carregar as já processadas (ids em `skip`)"""
+    if source_format == "auto":
+        source_format = detect_format(path)
+    
+    if source_format == "mbox":
+        return _iter_mailbox(mailbox.mbox(path, create=False), "mbox", skip)
+    if source_format == "maildir":
+        return _iter_mailbox(mailbox.Maildir(path, factory=None, create=False), "maildir", skip)
+    if source_format == "dir":
+        return _iter_directory(path, skip)
+    
+    raise ValueError(f"Formato de origem inválido: {source_format}")
+
+
+def _iter_mailbox(box: mailbox.Mailbox, prefix: str, skip: Collection[str]) -> Iterator[MailItem]:
+    """
+    Mensagens de um mbox (chave = posição no arquivo) ou Maildir (chave =
+    nome único do arquivo), entregues como .eml para o EMLParser
+    """
+    try:
+        for key in box.iterkeys():
+            item_id = f"{prefix}:{key}"
+            if item_id in skip:
+                continue
+            yield MailItem(item_id=item_id, filename=f"{key}.eml", content=box.get_bytes(key))
+    finally:
+        box.close()
+
+
+def _iter_directory(root: str, skip: Collection[str]) -> Iterator[MailItem]:
+    """Arquivos .eml/.pdf/.txt do diretório (recursivo), em ordem estável"""
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            
+            path = os.path.join(directory, filename)
+            item_id = os.path.relpath(path, root).replace(os.sep, "/")
+            if item_id not in skip:
+                yield MailItem(item_id=item_id, filename=filename, path=path)
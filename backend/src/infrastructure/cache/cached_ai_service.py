@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import (
+    AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText, StreamEventType
+)
+from .result_cache import MemoryResultCache, SQLiteResultCache
+
+
+class CachedAIService(AIServiceInterface):
+    """Decorator que reaproveita análises de emails com o mesmo conteúdo pré-processado"""
+    
+    def __init__(
+        self,
+        ai_service: AIServiceInterface,
+        memory_cache: MemoryResultCache,
+        disk_cache: Optional[SQLiteResultCache] = None
+    ):
+        self._ai_service = ai_service
+        self._memory_cache = memory_cache
+        self._disk_cache = disk_cache
+        self.skipped_errors = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Retorna a análise em cache ou delega ao serviço de IA"""
+        key = self.cache_key(processed_text)
+        
+        if key is None:
+            return await self._ai_service.analyze_email(email, processed_text)
+        
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+        
+        result = await self._ai_service.analyze_email(email, processed_text)
+        
+        # Erros e respostas degradadas (fallback) nunca são armazenados
+        if result.error or result.error_code:
+            self.skipped_errors += 1
+            return result
+        
+        await self._store(key, result)
+        return result
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Acerto no cache sai de uma vez; caso contrário repassa o streaming e armazena o resultado final"""
+        key = self.cache_key(processed_text)
+        cached = await self._lookup(key) if key is not None else None
+        
+        if cached is not None:
+            for event in AnalysisStreamEvent.from_result(cached):
+                yield event
+            return
+        
+        async for event in self._ai_service.analyze_email_stream(email, processed_text):
+            if event.type is StreamEventType.RESULT and key is not None:
+                if event.result.error or event.result.error_code:
+                    self.skipped_errors += 1
+                else:
+                    await self._store(key, event.result)
+            yield event
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Resolve o que estiver em cache e envia apenas o restante ao serviço de IA"""
+        results: List[Optional[EmailAnalysisResult]] = [None] * len(items)
+        keys = [self.cache_key(processed_text) for _, processed_text in items]
+        missing = []
+        
+        for index, key in enumerate(keys):
+            cached = await self._lookup(key) if key is not None else None
+            if cached is not None:
+                results[index] = cached
+            else:
+                missing.append(index)
+        
+        if missing:
+            analyzed = await self._ai_service.analyze_batch([items[index] for index in missing])
+            
+            for index, result in zip(missing, analyzed):
+                results[index] = result
+                
+                if result.error or result.error_code:
+                    self.skipped_errors += 1
+                elif keys[index] is not None:
+                    await self._store(keys[index], result)
+        
+        return results
+    
+    @staticmethod
+    def cache_key(processed_text: ProcessedText) -> Optional[str]:
+        """Gera a chave do cache a partir do texto pré-processado"""
+        if not processed_text.processed:
+            return None
+        return hashlib.sha256(processed_text.processed.encode("utf-8")).hexdigest()
+    
+    def stats(self) -> Dict[str, object]:
+        """Retorna os contadores de cada camada do cache"""
+        stats: Dict[str, object] = {
+            "memory": self._memory_cache.stats(),
+            "skipped_errors": self.skipped_errors
+        }
+        
+        if self._disk_cache:
+            stats["disk"] = self._disk_cache.stats()
+        
+        return stats
+    
+    def close(self) -> None:
+        """Fecha o cache em disco (se configurado)"""
+        if self._disk_cache:
+            self._disk_cache.close()
+    
+    async def _lookup(self, key: str) -> Optional[EmailAnalysisResult]:
+        """Busca primeiro na memória e depois no disco"""
+        value = self._memory_cache.get(key)
+        
+        if value is None and self._disk_cache:
+            value = await asyncio.to_thread(self._disk_cache.get, key)
+            if value is not None:
+                # Promove para a camada em memória
+                self._memory_cache.set(key, value)
+        
+        if value is None:
+            return None
+        
+        return EmailAnalysisResult(
+            category=EmailCategory(value["categoria"]),
+            response=value["resposta"]
+        )
+    
+    async def _store(self, key: str, result: EmailAnalysisResult) -> None:
+        """Grava o resultado em todas as camadas"""
+        value = result.to_dict()
+        self._memory_cache.set(key, value)
+        
+        if self._disk_cache:
+            await asyncio.to_thread(self._disk_cache.set, key, value)
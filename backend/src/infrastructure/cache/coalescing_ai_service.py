@@ -0,0 +1,127 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import AnalysisStreamEvent, Email, EmailAnalysisResult, ProcessedText
+from .cached_ai_service import CachedAIService
+
+
+class CoalescingAIService(AIServiceInterface):
+    """
+    Decorator single-flight: requisições simultâneas com o mesmo conteúdo
+    pré-processado compartilham uma única chamada em andamento.
+    """
+    
+    def __init__(self, ai_service: AIServiceInterface):
+        self._ai_service = ai_service
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Junta-se à análise em andamento do mesmo conteúdo ou inicia uma nova"""
+        key = CachedAIService.cache_key(processed_text)
+        
+        if key is None:
+            return await self._ai_service.analyze_email(email, processed_text)
+        
+        future = self._in_flight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(self._ai_service.analyze_email(email, processed_text))
+            self._register(key, future)
+        else:
+            self.coalesced += 1
+        
+        # shield: cancelar este chamador não cancela a chamada compartilhada
+        return await asyncio.shield(future)
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """
+        Junta-se a uma análise em andamento se houver; senão transmite direto.
+        O streaming não é publicado para outros chamadores: se o cliente
+        desconectar no meio, quem estivesse esperando perderia o resultado.
+        """
+        key = CachedAIService.cache_key(processed_text)
+        future = self._in_flight.get(key) if key is not None else None
+        
+        if future is not None:
+            self.coalesced += 1
+            for event in AnalysisStreamEvent.from_result(await asyncio.shield(future)):
+                yield event
+            return
+        
+        self.calls += 1
+        async for event in self._ai_service.analyze_email_stream(email, processed_text):
+            yield event
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Reaproveita análises em andamento (e duplicatas do próprio lote) e envia o restante em lote"""
+        loop = asyncio.get_running_loop()
+        futures: List[asyncio.Future] = []
+        pending_items: List[Tuple[Email, ProcessedText]] = []
+        pending_futures: List[asyncio.Future] = []
+        
+        for item in items:
+            key = CachedAIService.cache_key(item[1])
+            future: Optional[asyncio.Future] = self._in_flight.get(key) if key is not None else None
+            
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = loop.create_future()
+                pending_items.append(item)
+                pending_futures.append(future)
+                if key is not None:
+                    self._register(key, future)
+            
+            futures.append(future)
+        
+        if pending_items:
+            self.calls += len(pending_items)
+            batch = asyncio.ensure_future(self._ai_service.analyze_batch(pending_items))
+            batch.add_done_callback(lambda task: self._resolve_batch(task, pending_futures))
+        
+        return list(await asyncio.shield(asyncio.gather(*futures)))
+    
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores de chamadas e de requisições coalescidas"""
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
+    
+    def _register(self, key: str, future: asyncio.Future) -> None:
+        """Publica a chamada em andamento até que ela termine"""
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+    
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        
+        # Evita o aviso de exceção não recuperada quando todos os chamadores desistiram
+        if not future.cancelled():
+            future.exception()
+    
+    @staticmethod
+    def _resolve_batch(task: asyncio.Future, futures: List[asyncio.Future]) -> None:
+        """Distribui o resultado da chamada em lote para os futures de cada item"""
+        for index, future in enumerate(futures):
+            if future.done():
+                continue
+            
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result()[index])
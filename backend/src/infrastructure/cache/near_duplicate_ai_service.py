@@ -0,0 +1,123 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import (
+    AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText, StreamEventType
+)
+from ..classification.fast_path_ai_service import FastPathAIService
+from .near_duplicate_index import MinHasher, NearDuplicateIndex
+
+
+class NearDuplicateAIService(AIServiceInterface):
+    """
+    Decorator que reaproveita a análise de um email quase idêntico a outro já
+    analisado (o mesmo modelo de email com outro nome, data ou número de
+    chamado), que o cache exato não encontra. Reaproveita a categoria e,
+    se configurado, a resposta; senão responde com o modelo da categoria.
+    """
+    
+    def __init__(
+        self,
+        ai_service: AIServiceInterface,
+        index: NearDuplicateIndex,
+        hasher: MinHasher,
+        reuse_response: bool = False
+    ):
+        self._ai_service = ai_service
+        self._index = index
+        self._hasher = hasher
+        self._reuse_response = reuse_response
+        self.skipped_short = 0
+        self.skipped_errors = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Retorna a análise do email parecido ou delega ao serviço de IA"""
+        signature = self._signature(processed_text)
+        match = self._lookup(signature)
+        if match is not None:
+            return match
+        
+        result = await self._ai_service.analyze_email(email, processed_text)
+        await self._store(signature, result)
+        return result
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Email parecido sai de uma vez; caso contrário repassa o streaming e indexa o resultado final"""
+        signature = self._signature(processed_text)
+        match = self._lookup(signature)
+        
+        if match is not None:
+            for event in AnalysisStreamEvent.from_result(match):
+                yield event
+            return
+        
+        async for event in self._ai_service.analyze_email_stream(email, processed_text):
+            if event.type is StreamEventType.RESULT:
+                await self._store(signature, event.result)
+            yield event
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Resolve os emails parecidos com os já analisados e envia o restante ao serviço de IA"""
+        signatures = [self._signature(processed_text) for _, processed_text in items]
+        results: List[Optional[EmailAnalysisResult]] = [self._lookup(signature) for signature in signatures]
+        missing = [index for index, result in enumerate(results) if result is None]
+        
+        if missing:
+            analyzed = await self._ai_service.analyze_batch([items[index] for index in missing])
+            for index, result in zip(missing, analyzed):
+                results[index] = result
+                await self._store(signatures[index], result)
+        
+        return results
+    
+    def stats(self) -> Dict[str, object]:
+        """Retorna os contadores do índice e os emails ignorados"""
+        stats: Dict[str, object] = self._index.stats()
+        stats["skipped_short"] = self.skipped_short
+        stats["skipped_errors"] = self.skipped_errors
+        return stats
+    
+    def close(self) -> None:
+        """Fecha o banco do índice (se configurado)"""
+        self._index.close()
+    
+    def _signature(self, processed_text: ProcessedText) -> Optional[bytes]:
+        """Assinatura MinHash dos tokens pré-processados (None se o texto for curto demais)"""
+        signature = self._hasher.signature(processed_text.processed.split())
+        if signature is None:
+            self.skipped_short += 1
+        return signature
+    
+    def _lookup(self, signature: Optional[bytes]) -> Optional[EmailAnalysisResult]:
+        """Resultado do email mais parecido acima do limite de similaridade"""
+        if signature is None:
+            return None
+        
+        match = self._index.query(signature)
+        if match is None:
+            return None
+        
+        _, value = match
+        category = EmailCategory(value["categoria"])
+        response = value["resposta"] if self._reuse_response else FastPathAIService.REPLY_TEMPLATES[category]
+        return EmailAnalysisResult(category=category, response=response)
+    
+    async def _store(self, signature: Optional[bytes], result: EmailAnalysisResult) -> None:
+        """Indexa o resultado (erros e respostas degradadas nunca são reaproveitados)"""
+        if signature is None:
+            return
+        
+        if result.error or result.error_code:
+            self.skipped_errors += 1
+            return
+        
+        # A gravação em disco (se configurada) não roda no event loop
+        await asyncio.to_thread(self._index.add, signature, result.to_dict())
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MASK64 = (1 << 64) - 1
+# Constantes do splitmix64, usadas para combinar e misturar os hashes dos tokens
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+# Bin ainda sem valor; os valores (hash // num_perm) e os dos bins densificados são menores
+_EMPTY = MASK64
+_VALUE_MASK = MASK64 >> 1
+
+
+def _mix(h: int) -> int:
+    """Finalizador do splitmix64: espalha os bits de um hash de 64 bits"""
+    h = (h ^ (h >> 30)) * _MIX1 & MASK64
+    h = (h ^ (h >> 27)) * _MIX2 & MASK64
+    return h ^ (h >> 31)
+
+
+def lane_masks(lanes: int) -> Tuple[int, int]:
+    """Máscaras dos 63 bits baixos e do bit alto de cada inteiro de 64 bits de uma assinatura"""
+    low = sum((MASK64 >> 1) << (64 * lane) for lane in range(lanes))
+    return low, low << 1 & ~low
+
+
+def matching_lanes(a: int, b: int, lanes: int, low: int, high: int) -> int:
+    """
+    Quantos inteiros de 64 bits são iguais entre duas assinaturas lidas como
+    um único inteiro, sem percorrê-las: o XOR zera as posições iguais e, em
+    cada posição, somar os 63 bits baixos ao máximo deles leva ao bit alto
+    qualquer bit ligado (a soma nunca passa para a posição vizinha).
+    """
+    x = a ^ b
+    return lanes - (((x & low) + low | x) & high).bit_count()
+
+
+def lsh_bands(num_perm: int, threshold: float, recall: float = 0.99) -> Tuple[int, int]:
+    """
+    Escolhe (bandas, linhas por banda) do LSH: o maior número de linhas
+    (menos candidatos a comparar) que ainda encontra um par com similaridade
+    `threshold` com probabilidade de pelo menos `recall`.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """
+    Assinatura MinHash dos shingles (sequências de tokens) de um texto por
+    one permutation hashing: cada shingle é hasheado uma única vez e cai em
+    um dos `num_perm` bins, que guardam o menor valor visto. Bins vazios
+    (textos curtos) copiam o próximo bin preenchido (densificação por
+    rotação), e a fração de bins iguais entre duas assinaturas continua
+    estimando a similaridade de Jaccard. Os hashes são estáveis entre
+    processos, então assinaturas gravadas em disco continuam válidas.
+    """
+    
+    def __init__(self, num_perm: int = 64, shingle_size: int = 1, min_shingles: int = 5, cache_size: int = 50000):
+        self.num_perm = num_perm
+        self._shingle_size = max(1, shingle_size)
+        self._min_shingles = max(1, min_shingles)
+        self._token_hash = lru_cache(maxsize=cache_size)(self._hash_token)
+        # Deslocamento dos bins densificados por distância (nunca resulta em _EMPTY)
+        self._offsets = [distance * _GOLDEN & _VALUE_MASK for distance in range(num_perm + 1)]
+    
+    def signature(self, tokens: Sequence[str]) -> Optional[bytes]:
+        """Assinatura em bytes (num_perm inteiros de 64 bits) ou None se o texto for curto demais"""
+        if len(tokens) - self._shingle_size + 1 < self._min_shingles:
+            return None
+        
+        # Hashes dos tokens já misturados; shingles maiores combinam os vizinhos e misturam de novo
+        hashes = [self._token_hash(token) for token in tokens]
+        for _ in range(1, self._shingle_size):
+            hashes = [_mix((h * _GOLDEN ^ n) & MASK64) for h, n in zip(hashes, hashes[1:])]
+        
+        num_perm = self.num_perm
+        mins = [_EMPTY] * num_perm
+        for h in set(hashes):
+            value, position = divmod(h, num_perm)
+            if value < mins[position]:
+                mins[position] = value
+        
+        if _EMPTY in mins:
+            self._densify(mins)
+        
+        return array("Q", mins).tobytes()
+    
+    def _densify(self, mins: List[int]) -> None:
+        """Cada bin vazio recebe o próximo bin preenchido (circular), combinado com a distância até ele"""
+        size = len(mins)
+        filled = [position for position, value in enumerate(mins) if value != _EMPTY]
+        
+        for previous, following in zip([filled[-1] - size] + filled[:-1], filled):
+            gap = following - previous - 1
+            if gap:
+                # Distâncias gap, ..., 1 até o bin preenchido
+                values = list(map(mins[following].__xor__, self._offsets[gap:0:-1]))
+                start = previous + 1
+                if start < 0:
+                    # A lacuna dá a volta: começa no fim da lista
+                    mins[start:] = values[:-start]
+                    mins[:following] = values[-start:]
+                else:
+                    mins[start:following] = values
+    
+    @staticmethod
+    def _hash_token(token: str) -> int:
+        return _mix(int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"))
+
+
+class NearDuplicateIndex:
+    """
+    Índice LSH (banding) das assinaturas MinHash dos emails já analisados:
+    cada banda é uma fatia da assinatura usada como chave de dicionário, e só
+    os emails que coincidem em alguma banda são comparados. A consulta é toda
+    em memória. Limitado a max_entries (LRU) e com TTL; com db_path, as
+    entradas também são gravadas em SQLite e recarregadas ao reiniciar (a
+    tabela é podada de tempos em tempos, podendo passar de max_entries em
+    até 10% até lá).
+    """
+    
+    PRUNE_EVERY = 1000  # Remove do banco as entradas expiradas a cada N escritas
+    
+    def __init__(
+        self,
+        num_perm: int = 64,
+        threshold: float = 0.9,
+        max_entries: int = 10000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        db_path: Optional[str] = None
+    ):
+        self._num_perm = num_perm
+        self._threshold = threshold
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._lane_masks = lane_masks(num_perm)
+        bands, rows = lsh_bands(num_perm, threshold)
+        # Fatias (em bytes) da assinatura de cada banda
+        self._band_slices = [slice(band * rows * 8, (band + 1) * rows * 8) for band in range(bands)]
+        # Assinatura -> (expira_em, resultado, assinatura como inteiro); a ordem é a de uso (LRU)
+        self._entries: "OrderedDict[bytes, Tuple[float, dict, int]]" = OrderedDict()
+        # Por banda: fatia da assinatura -> assinaturas com essa fatia
+        self._buckets: List[Dict[bytes, List[bytes]]] = [{} for _ in self._band_slices]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS near_duplicates (
+                    signature BLOB PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_near_duplicates_created ON near_duplicates (created_at)"
+            )
+            self._connection.commit()
+            # Estimativa das linhas gravadas (conta substituições como novas): dispara a poda por tamanho
+            self._db_rows = self._connection.execute("SELECT COUNT(*) FROM near_duplicates").fetchone()[0]
+            self._db_writes = 0
+            self._load()
+    
+    def query(self, signature: bytes) -> Optional[Tuple[float, dict]]:
+        """Retorna (similaridade estimada, resultado) do email mais parecido acima do limite"""
+        now = time.time()
+        
+        with self._lock:
+            candidates = set()
+            for band_slice, buckets in zip(self._band_slices, self._buckets):
+                bucket = buckets.get(signature[band_slice])
+                if bucket:
+                    candidates.update(bucket)
+            
+            best: Optional[Tuple[float, bytes, dict]] = None
+            if candidates:
+                query = int.from_bytes(signature, "little")
+                for candidate in candidates:
+                    expires_at, value, number = self._entries[candidate]
+                    if expires_at < now:
+                        self._remove(candidate)
+                        continue
+                    
+                    similarity = matching_lanes(query, number, self._num_perm, *self._lane_masks) / self._num_perm
+                    if similarity >= self._threshold and (best is None or similarity > best[0]):
+                        best = (similarity, candidate, value)
+            
+            if best is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best[1])
+            self.hits += 1
+            return best[0], best[2]
+    
+    def add(self, signature: bytes, value: dict) -> None:
+        """Indexa o resultado de um email (e grava em disco, se configurado)"""
+        now = time.time()
+        
+        with self._lock:
+            self._insert(signature, value, now + self._ttl_seconds)
+        
+        if self._connection is not None:
+            with self._db_lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO near_duplicates (signature, value, created_at) VALUES (?, ?, ?)",
+                    (signature, json.dumps(value, ensure_ascii=False), now)
+                )
+                self._db_rows += 1
+                self._db_writes += 1
+                if (
+                    self._db_writes % self.PRUNE_EVERY == 0
+                    or self._db_rows > self._max_entries + max(1, self._max_entries // 10)
+                ):
+                    self._prune_db(now)
+                self._connection.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores do índice"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+    
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        if self._connection is not None:
+            with self._db_lock:
+                self._connection.close()
+    
+    def _prune_db(self, now: float) -> None:
+        """Chamado com o _db_lock: remove as expiradas e, acima do limite, as mais antigas"""
+        self._connection.execute("DELETE FROM near_duplicates WHERE created_at < ?", (now - self._ttl_seconds,))
+        
+        rows = self._connection.execute("SELECT COUNT(*) FROM near_duplicates").fetchone()[0]
+        if rows > self._max_entries:
+            self._connection.execute(
+                """
+                DELETE FROM near_duplicates WHERE signature IN (
+                    SELECT signature FROM near_duplicates ORDER BY created_at LIMIT ?
+                )
+                """,
+                (rows - self._max_entries,)
+            )
+            rows = self._max_entries
+        
+        self._db_rows = rows
+    
+    def _load(self) -> None:
+        """Recarrega as entradas mais recentes e ainda válidas gravadas em disco"""
+        now = time.time()
+        with self._db_lock:
+            rows = self._connection.execute(
+                """
+                SELECT signature, value, created_at FROM near_duplicates
+                WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?
+                """,
+                (now - self._ttl_seconds, self._max_entries)
+            ).fetchall()
+        
+        with self._lock:
+            for signature, value, created_at in reversed(rows):
+                # Assinaturas de outra configuração (num_perm) não são comparáveis
+                if len(signature) == self._num_perm * 8:
+                    self._insert(bytes(signature), json.loads(value), created_at + self._ttl_seconds)
+    
+    def _insert(self, signature: bytes, value: dict, expires_at: float) -> None:
+        if signature in self._entries:
+            self._remove(signature)
+        
+        self._entries[signature] = (expires_at, value, int.from_bytes(signature, "little"))
+        for band_slice, buckets in zip(self._band_slices, self._buckets):
+            buckets.setdefault(signature[band_slice], []).append(signature)
+        
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _remove(self, signature: bytes) -> None:
+        del self._entries[signature]
+        for band_slice, buckets in zip(self._band_slices, self._buckets):
+            key = signature[band_slice]
+            bucket = buckets[key]
+            bucket.remove(signature)
+            if not bucket:
+                del buckets[key]
@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class MemoryResultCache:
+    """Cache LRU em memória com expiração por TTL"""
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[dict]:
+        """Retorna o valor armazenado ou None se ausente/expirado"""
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value: dict) -> None:
+        """Armazena um valor, removendo os menos usados se exceder o limite"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores do cache"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class SQLiteResultCache:
+    """
+    Cache persistente em SQLite que sobrevive a reinicializações. A limpeza
+    (TTL e tamanho) não roda a cada escrita: o cache pode passar de
+    max_entries em até 10% antes de voltar ao limite, e os horários de
+    acesso dos hits são gravados em lote (ordem do LRU aproximada).
+    """
+    
+    PRUNE_EVERY = 1000  # Remove as entradas expiradas a cada N escritas
+    ACCESS_FLUSH_EVERY = 100  # Grava os horários de acesso pendentes a cada N hits
+    
+    def __init__(self, db_path: str, max_entries: int = 100000, ttl_seconds: float = 7 * 24 * 3600):
+        self._max_entries = max(1, max_entries)
+        self._overflow_margin = max(1, self._max_entries // 10)
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS result_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_result_cache_accessed ON result_cache (accessed_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_result_cache_created ON result_cache (created_at)"
+        )
+        self._connection.commit()
+        # Estimativa de entradas (conta substituições como novas): dispara a limpeza por tamanho
+        self._approx_entries = self._connection.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        self._writes = 0
+        self._pending_access: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[dict]:
+        """Retorna o valor armazenado ou None se ausente/expirado"""
+        now = time.time()
+        
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            value, created_at = row
+            if created_at + self._ttl_seconds < now:
+                self._connection.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                self._connection.commit()
+                self._pending_access.pop(key, None)
+                self.misses += 1
+                return None
+            
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.ACCESS_FLUSH_EVERY:
+                self._flush_access()
+                self._connection.commit()
+            self.hits += 1
+            return json.loads(value)
+    
+    def set(self, key: str, value: dict) -> None:
+        """Armazena um valor e, de tempos em tempos, aplica as políticas de TTL e tamanho"""
+        now = time.time()
+        
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._pending_access.pop(key, None)
+            self._approx_entries += 1
+            self._writes += 1
+            
+            if (
+                self._writes % self.PRUNE_EVERY == 0
+                or self._approx_entries > self._max_entries + self._overflow_margin
+            ):
+                self._prune(now)
+            self._connection.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores do cache"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+    
+    def close(self) -> None:
+        """Grava os acessos pendentes e fecha a conexão com o banco"""
+        with self._lock:
+            self._flush_access()
+            self._connection.commit()
+            self._connection.close()
+    
+    def _prune(self, now: float) -> None:
+        """Chamado com o lock: remove as expiradas e, acima do limite, as menos usadas"""
+        # Os acessos pendentes entram antes, para a ordem do LRU refletir os hits recentes
+        self._flush_access()
+        self.evictions += self._connection.execute(
+            "DELETE FROM result_cache WHERE created_at < ?", (now - self._ttl_seconds,)
+        ).rowcount
+        
+        entries = self._connection.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        if entries > self._max_entries:
+            self.evictions += self._connection.execute(
+                """
+                DELETE FROM result_cache WHERE key IN (
+                    SELECT key FROM result_cache ORDER BY accessed_at LIMIT ?
+                )
+                """,
+                (entries - self._max_entries,)
+            ).rowcount
+            entries = self._max_entries
+        
+        self._approx_entries = entries
+    
+    def _flush_access(self) -> None:
+        """Chamado com o lock: grava os horários de acesso acumulados em uma única instrução"""
+        if not self._pending_access:
+            return
+        
+        self._connection.executemany(
+            "UPDATE result_cache SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._pending_access.clear()
@@ -0,0 +1,100 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from .naive_bayes_classifier import NaiveBayesClassifier
+
+
+class FastPathAIService(AIServiceInterface):
+    """Decorator que classifica localmente emails óbvios e só chama a IA nos demais"""
+    
+    REPLY_TEMPLATES = {
+        EmailCategory.PRODUCTIVE: (
+            "Olá! Recebemos sua mensagem e nossa equipe já está analisando a solicitação. "
+            "Se possível, envie mais detalhes que ajudem a agilizar o atendimento. Retornaremos em breve."
+        ),
+        EmailCategory.UNPRODUCTIVE: (
+            "Olá! Agradecemos a sua mensagem. "
+            "No momento não é necessária nenhuma ação da nossa parte. Tenha um ótimo dia!"
+        ),
+    }
+    
+    def __init__(
+        self,
+        ai_service: AIServiceInterface,
+        classifier: NaiveBayesClassifier,
+        confidence_threshold: Optional[float] = None
+    ):
+        self._ai_service = ai_service
+        self._classifier = classifier
+        # Sem limite explícito, usa o ajustado no treino do classificador
+        self._confidence_threshold = (
+            confidence_threshold if confidence_threshold is not None else classifier.confidence_threshold
+        )
+        self.local_count = 0
+        self.delegated_count = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Responde localmente quando a confiança for suficiente"""
+        result = self._classify_locally(processed_text)
+        
+        if result is not None:
+            return result
+        
+        self.delegated_count += 1
+        return await self._ai_service.analyze_email(email, processed_text)
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Resposta local sai de uma vez; as demais são transmitidas pela IA"""
+        result = self._classify_locally(processed_text)
+        
+        if result is not None:
+            for event in AnalysisStreamEvent.from_result(result):
+                yield event
+            return
+        
+        self.delegated_count += 1
+        async for event in self._ai_service.analyze_email_stream(email, processed_text):
+            yield event
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Classifica localmente o que puder e envia o restante em lote"""
+        results: List[Optional[EmailAnalysisResult]] = [
+            self._classify_locally(processed_text) for _, processed_text in items
+        ]
+        missing = [index for index, result in enumerate(results) if result is None]
+        
+        if missing:
+            self.delegated_count += len(missing)
+            analyzed = await self._ai_service.analyze_batch([items[index] for index in missing])
+            for index, result in zip(missing, analyzed):
+                results[index] = result
+        
+        return results
+    
+    def stats(self) -> Dict[str, float]:
+        """Retorna a proporção de requisições atendidas localmente"""
+        total = self.local_count + self.delegated_count
+        return {
+            "local": self.local_count,
+            "delegated": self.delegated_count,
+            "local_share": self.local_count / total if total else 0.0,
+            "threshold": self._confidence_threshold
+        }
+    
+    def _classify_locally(self, processed_text: ProcessedText) -> Optional[EmailAnalysisResult]:
+        """Retorna o resultado local ou None se a confiança estiver abaixo do limite"""
+        category, confidence = self._classifier.predict(processed_text.processed.split())
+        
+        if category is None or confidence < self._confidence_threshold:
+            return None
+        
+        self.local_count += 1
+        return EmailAnalysisResult(category=category, response=self.REPLY_TEMPLATES[category])
@@ -0,0 +1,32 @@
+from typing import Dict
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from .fast_path_ai_service import FastPathAIService
+from .naive_bayes_classifier import NaiveBayesClassifier
+
+
+class LocalFallbackAIService(AIServiceInterface):
+    """Responde só com o classificador local; usado quando a IA está indisponível"""
+    
+    # Marca a resposta como degradada (e impede que ela seja armazenada em cache)
+    ERROR_CODE = "ia_fallback_local"
+    
+    def __init__(self, classifier: NaiveBayesClassifier):
+        self._classifier = classifier
+        self.answered = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Classifica localmente qualquer que seja a confiança"""
+        category, _ = self._classifier.predict(processed_text.processed.split())
+        category = category or EmailCategory.PRODUCTIVE  # Default seguro
+        self.answered += 1
+        
+        return EmailAnalysisResult(
+            category=category,
+            response=FastPathAIService.REPLY_TEMPLATES[category],
+            error_code=self.ERROR_CODE
+        )
+    
+    def stats(self) -> Dict[str, int]:
+        return {"answered": self.answered}
@@ -1,33 +1,136 @@
+import functools
+from typing import Optional
+
 from .external.hybrid_processor import HybridTextProcessor
+from .external.preprocessing_pool import PreprocessingPool
 from .external.gemini_ai_service import GeminiAIService
+from .external.gemini_client_pool import GeminiClientPool
+from .external.lazy_ai_service import LazyAIService
+from .external.prompt_builder import PromptBuilder
 from .parsers.file_parser_factory import FileParserFactory
+from .parsers.pdf_parser import PDFParser
+from .parsers.pdf_extraction_pool import PDFExtractionPool
+from .security.rate_limiter import MemoryBucketStore, SQLiteBucketStore, TokenBucketRateLimiter
+from .cache.cached_ai_service import CachedAIService
+from .cache.coalescing_ai_service import CoalescingAIService
+from .cache.near_duplicate_ai_service import NearDuplicateAIService
+from .cache.near_duplicate_index import MinHasher, NearDuplicateIndex
+from .cache.result_cache import MemoryResultCache, SQLiteResultCache
+from .classification.fast_path_ai_service import FastPathAIService
+from .classification.local_fallback_ai_service import LocalFallbackAIService
+from .classification.naive_bayes_classifier import NaiveBayesClassifier
+from .resilience.adaptive_limiter import AdaptiveConcurrencyLimit
+from .resilience.circuit_breaker import CircuitBreaker
+from .resilience.resilient_ai_service import ResilientAIService
+from .observability.instrumented_ai_service import InstrumentedAIService
+from .observability.metrics import PipelineMetrics
+from .observability.profiler import ProfileStore, ProfileTokenSigner, ProfilingAuthorizer, SamplingProfiler
+from .jobs.job_queue import JobQueue
+from .jobs.job_store import SQLiteJobStore
 from ..application.use_cases.process_email_use_case import ProcessEmailUseCase
+from ..application.use_cases.process_job_use_case import ProcessJobUseCase
+from ..domain.services.interfaces import AIServiceInterface
 from ..presentation.controllers.email_controller import EmailController
+from ..presentation.controllers.job_controller import JobController
 
 
 class DependencyContainer:
     """Container de dependências para injeção de dependência"""
     
-    def __init__(self, gemini_api_key: str):
+    def __init__(
+        self,
+        gemini_api_key: str,
+        processing_config: Optional[object] = None,
+        ai_config: Optional[object] = None,
+        cache_config: Optional[object] = None,
+        near_duplicate_config: Optional[object] = None,
+        local_classifier_config: Optional[object] = None,
+        pdf_config: Optional[object] = None,
+        rate_limit_config: Optional[object] = None,
+        resilience_config: Optional[object] = None,
+        job_config: Optional[object] = None,
+        metrics_config: Optional[object] = None,
+        profiling_config: Optional[object] = None,
+        ai_service: Optional[AIServiceInterface] = None
+    ):
         try:
             # Infraestrutura
+            self._metrics: Optional[PipelineMetrics] = None
+            if metrics_config is not None and metrics_config.ENABLED:
+                self._metrics = PipelineMetrics()
+                # Contadores dos componentes (cache, rate limit, IA...) exportados a cada coleta
+                self._metrics.registry.add_collector(self.stats)
+            
+            self._profiler: Optional[SamplingProfiler] = None
+            self._profile_store: Optional[ProfileStore] = None
+            self._profiling_authorizer: Optional[ProfilingAuthorizer] = None
+            if profiling_config is not None and (
+                profiling_config.SECRET or profiling_config.QUERY_FLAG or profiling_config.SAMPLE_RATE > 0
+            ):
+                print("🔬 Configurando profiling...")
+                self._profiler = SamplingProfiler(interval=profiling_config.INTERVAL_MS / 1000)
+                self._profile_store = ProfileStore(max_profiles=profiling_config.MAX_PROFILES)
+                self._profiling_authorizer = ProfilingAuthorizer(
+                    ProfileTokenSigner(profiling_config.SECRET) if profiling_config.SECRET else None,
+                    header=profiling_config.HEADER,
+                    allow_query_flag=profiling_config.QUERY_FLAG
+                )
+            
             print("🔧 Inicializando processador de texto...")
-            self._text_processor = HybridTextProcessor()
+            self._text_processor = (
+                self._create_text_processor(processing_config)
+                if processing_config is not None
+                else HybridTextProcessor()
+            )
+            
+            self._classifier: Optional[NaiveBayesClassifier] = None
+            self._base_ai_service: Optional[AIServiceInterface] = None
+            self._client_pool: Optional[GeminiClientPool] = None
+            self._resilient_ai_service: Optional[ResilientAIService] = None
+            self._near_duplicate_ai_service: Optional[NearDuplicateAIService] = None
+            self._cached_ai_service: Optional[CachedAIService] = None
+            self._coalescing_ai_service: Optional[CoalescingAIService] = None
+            self._fast_path_ai_service: Optional[FastPathAIService] = None
+            create_ai_service = functools.partial(
+                self._create_ai_chain,
+                gemini_api_key,
+                ai_service,
+                ai_config,
+                cache_config,
+                near_duplicate_config,
+                local_classifier_config,
+                resilience_config
+            )
             
-            print("🤖 Inicializando serviço de IA...")
-            self._ai_service = GeminiAIService(gemini_api_key)
+            # Modo lazy (cold start serverless): a IA só é montada na primeira análise
+            if processing_config is not None and processing_config.LAZY_INIT:
+                print("💤 Serviço de IA será inicializado no primeiro uso")
+                self._ai_service = LazyAIService(create_ai_service)
+            else:
+                self._ai_service = create_ai_service()
+            
+            self._rate_limiter: Optional[TokenBucketRateLimiter] = None
+            if rate_limit_config is not None and rate_limit_config.ENABLED:
+                print("🚦 Configurando rate limiting...")
+                self._rate_limiter = self._create_rate_limiter(rate_limit_config)
             
             print("📁 Inicializando parser de arquivos...")
-            self._file_parser_factory = FileParserFactory()
+            self._file_parser_factory = self._create_file_parser_factory(pdf_config)
             
             # Casos de uso
             print("⚙️ Configurando casos de uso...")
             self._process_email_use_case = ProcessEmailUseCase(
                 text_processor=self._text_processor,
                 ai_service=self._ai_service,
-                file_parser_factory=self._file_parser_factory
+                file_parser_factory=self._file_parser_factory,
+                metrics=self._metrics
             )
             
+            self._job_queue: Optional[JobQueue] = None
+            if job_config is not None and job_config.ENABLED:
+                print("📬 Configurando fila de jobs...")
+                self._job_queue = self._create_job_queue(job_config)
+            
             # Controllers
             print("🎮 Configurando controllers...")
             self._email_controller = EmailController(
@@ -35,12 +138,346 @@ class DependencyContainer:
                 text_processor=self._text_processor,
                 file_parser_factory=self._file_parser_factory
             )
+            self._job_controller = JobController(self._job_queue) if self._job_queue else None
             print("✅ Container de dependências inicializado com sucesso!")
-            
+        
         except Exception as e:
             print(f"❌ Erro ao inicializar container: {e}")
             raise RuntimeError(f"Falha na inicialização do container: {e}")
     
+    def _create_ai_chain(
+        self,
+        gemini_api_key: str,
+        ai_service: Optional[AIServiceInterface],
+        ai_config: Optional[object],
+        cache_config: Optional[object],
+        near_duplicate_config: Optional[object],
+        local_classifier_config: Optional[object],
+        resilience_config: Optional[object]
+    ) -> AIServiceInterface:
+        """Monta o serviço de IA com os decorators configurados (e o classificador local, se houver)"""
+        if local_classifier_config is not None and local_classifier_config.TRAINING_PATH:
+            print("⚡ Treinando classificador local...")
+            self._classifier = NaiveBayesClassifier.from_jsonl(
+                local_classifier_config.TRAINING_PATH,
+                self._text_processor,
+                target_precision=local_classifier_config.TARGET_PRECISION
+            )
+            print(f"⚡ Limite de confiança ajustado: {self._classifier.confidence_threshold:.3f}")
+        
+        print("🤖 Inicializando serviço de IA...")
+        resilience_enabled = resilience_config is not None and resilience_config.ENABLED
+        service = ai_service or self._create_ai_service(
+            gemini_api_key, ai_config, propagate_errors=resilience_enabled
+        )
+        self._base_ai_service = service
+        
+        if self._metrics:
+            service = InstrumentedAIService(service, self._metrics)
+        
+        if resilience_enabled:
+            service = self._resilient_ai_service = self._create_resilient_service(service, resilience_config)
+        
+        # Dentro do cache exato: só os emails que ele não encontra procuram um parecido
+        if near_duplicate_config is not None and near_duplicate_config.ENABLED:
+            print("🧬 Configurando índice de emails quase duplicados...")
+            service = self._near_duplicate_ai_service = self._create_near_duplicate_service(
+                service, near_duplicate_config
+            )
+        
+        if cache_config is not None and cache_config.ENABLED:
+            print("🗄️ Configurando cache de análises...")
+            service = self._cached_ai_service = self._create_cached_service(service, cache_config)
+        
+        if ai_config is not None and ai_config.COALESCE_REQUESTS:
+            service = self._coalescing_ai_service = CoalescingAIService(service)
+        
+        if self._classifier is not None:
+            service = self._fast_path_ai_service = FastPathAIService(
+                service,
+                self._classifier,
+                confidence_threshold=local_classifier_config.CONFIDENCE_THRESHOLD
+            )
+        
+        return service
+    
+    def _create_ai_service(
+        self,
+        gemini_api_key: str,
+        ai_config: Optional[object],
+        propagate_errors: bool = False
+    ) -> GeminiAIService:
+        """Cria o serviço do Gemini a partir da configuração de IA"""
+        if ai_config is None:
+            return GeminiAIService(gemini_api_key, propagate_errors=propagate_errors)
+        
+        max_concurrency = ai_config.MAX_CONCURRENCY
+        if ai_config.ADAPTIVE_CONCURRENCY or ai_config.API_KEYS or ai_config.POOL_MODELS:
+            print("🔀 Configurando pool de clientes do Gemini...")
+            self._client_pool = self._create_client_pool(gemini_api_key, ai_config)
+            # Quem limita a concorrência é o limite de cada cliente do pool
+            max_concurrency *= self._client_pool.size
+        
+        return GeminiAIService(
+            gemini_api_key,
+            model_name=ai_config.MODEL_NAME,
+            max_concurrency=max_concurrency,
+            batch_token_budget=ai_config.BATCH_TOKEN_BUDGET,
+            batch_max_items=ai_config.BATCH_MAX_ITEMS,
+            prompt_builder=PromptBuilder(token_budget=ai_config.PROMPT_TOKEN_BUDGET),
+            structured_output=ai_config.STRUCTURED_OUTPUT,
+            propagate_errors=propagate_errors,
+            model=self._client_pool
+        )
+    
+    def _create_client_pool(self, gemini_api_key: str, ai_config: object) -> GeminiClientPool:
+        """Pool com um cliente por chave e modelo; sem concorrência adaptativa, o limite fica fixo"""
+        api_keys = list(dict.fromkeys(key for key in [gemini_api_key, *ai_config.API_KEYS] if key)) or [gemini_api_key]
+        model_names = list(dict.fromkeys([ai_config.MODEL_NAME, *ai_config.POOL_MODELS]))
+        
+        if ai_config.ADAPTIVE_CONCURRENCY:
+            initial_limit, min_limit = ai_config.INITIAL_CONCURRENCY, ai_config.MIN_CONCURRENCY
+        else:
+            initial_limit = min_limit = ai_config.MAX_CONCURRENCY
+        
+        def limit_factory() -> AdaptiveConcurrencyLimit:
+            return AdaptiveConcurrencyLimit(
+                initial_limit=initial_limit,
+                min_limit=min_limit,
+                max_limit=ai_config.MAX_CONCURRENCY,
+                latency_tolerance=ai_config.LATENCY_TOLERANCE,
+                cooldown_seconds=ai_config.QUOTA_COOLDOWN_SECONDS,
+                max_cooldown_seconds=ai_config.QUOTA_MAX_COOLDOWN_SECONDS
+            )
+        
+        try:
+            return GeminiClientPool.from_config(api_keys, model_names, limit_factory)
+        except AttributeError as e:
+            # Chaves extras dependem de internos do SDK; sem eles, segue só com a chave principal
+            print(f"⚠️  GEMINI_API_KEYS ignorada: {e}")
+            return GeminiClientPool.from_config(api_keys[:1], model_names, limit_factory)
+    
+    def _create_resilient_service(
+        self,
+        ai_service: AIServiceInterface,
+        resilience_config: object
+    ) -> ResilientAIService:
+        """Envolve o serviço de IA com prazos, retries e circuit breaker (fallback local se disponível)"""
+        fallback = None
+        if resilience_config.LOCAL_FALLBACK and self._classifier is not None:
+            fallback = LocalFallbackAIService(self._classifier)
+        
+        return ResilientAIService(
+            ai_service,
+            fallback=fallback,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=resilience_config.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=resilience_config.CIRCUIT_RESET_SECONDS
+            ),
+            timeout_seconds=resilience_config.TIMEOUT_SECONDS,
+            deadline_seconds=resilience_config.DEADLINE_SECONDS,
+            max_retries=resilience_config.MAX_RETRIES,
+            backoff_base=resilience_config.BACKOFF_BASE_SECONDS,
+            backoff_max=resilience_config.BACKOFF_MAX_SECONDS,
+            hedge_after=resilience_config.HEDGE_AFTER_SECONDS
+        )
+    
+    def _create_cached_service(self, ai_service: AIServiceInterface, cache_config: object) -> CachedAIService:
+        """Envolve o serviço de IA com o cache em memória e, opcionalmente, em disco"""
+        memory_cache = MemoryResultCache(
+            max_entries=cache_config.MAX_ENTRIES,
+            ttl_seconds=cache_config.TTL_SECONDS
+        )
+        disk_cache = None
+        
+        if cache_config.DB_PATH:
+            disk_cache = SQLiteResultCache(
+                cache_config.DB_PATH,
+                max_entries=cache_config.DB_MAX_ENTRIES,
+                ttl_seconds=cache_config.DB_TTL_SECONDS
+            )
+        
+        return CachedAIService(ai_service, memory_cache, disk_cache)
+    
+    def _create_near_duplicate_service(
+        self,
+        ai_service: AIServiceInterface,
+        near_duplicate_config: object
+    ) -> NearDuplicateAIService:
+        """Envolve o serviço de IA com o índice MinHash/LSH de emails já analisados"""
+        index = NearDuplicateIndex(
+            num_perm=near_duplicate_config.NUM_PERM,
+            threshold=near_duplicate_config.SIMILARITY,
+            max_entries=near_duplicate_config.MAX_ENTRIES,
+            ttl_seconds=near_duplicate_config.TTL_SECONDS,
+            db_path=near_duplicate_config.DB_PATH
+        )
+        hasher = MinHasher(
+            num_perm=near_duplicate_config.NUM_PERM,
+            shingle_size=near_duplicate_config.SHINGLE_SIZE,
+            min_shingles=near_duplicate_config.MIN_SHINGLES
+        )
+        return NearDuplicateAIService(
+            ai_service, index, hasher, reuse_response=near_duplicate_config.REUSE_RESPONSE
+        )
+    
+    def _create_rate_limiter(self, rate_limit_config: object) -> TokenBucketRateLimiter:
+        """Cria o rate limiter com o armazenamento de buckets configurado"""
+        if rate_limit_config.BACKEND == "sqlite":
+            store = SQLiteBucketStore(rate_limit_config.DB_PATH)
+        elif rate_limit_config.BACKEND == "memory":
+            store = MemoryBucketStore(max_buckets=rate_limit_config.MAX_BUCKETS)
+        else:
+            raise ValueError(f"RATE_LIMIT_BACKEND inválido: {rate_limit_config.BACKEND}")
+        
+        return TokenBucketRateLimiter(
+            store,
+            calls=rate_limit_config.CALLS,
+            period=rate_limit_config.PERIOD,
+            api_keys=rate_limit_config.API_KEYS
+        )
+    
+    def _create_job_queue(self, job_config: object) -> JobQueue:
+        """Cria a fila de jobs persistida em SQLite, processada pelo caso de uso de email"""
+        process_job_use_case = ProcessJobUseCase(self._process_email_use_case)
+        
+        return JobQueue(
+            SQLiteJobStore(
+                job_config.DB_PATH,
+                result_ttl_seconds=job_config.RESULT_TTL_SECONDS,
+                lease_seconds=job_config.LEASE_SECONDS
+            ),
+            handler=process_job_use_case.execute,
+            workers=job_config.WORKERS,
+            max_pending=job_config.MAX_PENDING,
+            timeout_seconds=job_config.TIMEOUT_SECONDS
+        )
+    
+    def _create_file_parser_factory(self, pdf_config: Optional[object]) -> FileParserFactory:
+        """Cria a factory de parsers, com o pool de extração de PDF se configurado"""
+        if pdf_config is None:
+            return FileParserFactory()
+        
+        pdf_parser = PDFParser(max_pages=pdf_config.MAX_PAGES, max_chars=pdf_config.MAX_CHARS)
+        pdf_extractor = PDFExtractionPool(
+            pdf_parser,
+            max_workers=pdf_config.POOL_WORKERS,
+            timeout_seconds=pdf_config.TIMEOUT_SECONDS,
+            start_method=pdf_config.POOL_START_METHOD,
+            thread_workers=pdf_config.THREAD_WORKERS
+        )
+        return FileParserFactory(pdf_parser=pdf_parser, pdf_extractor=pdf_extractor)
+    
+    @staticmethod
+    def _create_text_processor(processing_config) -> HybridTextProcessor:
+        """Processador de texto, com pool de processos para lotes grandes se PREPROCESS_WORKERS > 0"""
+        batch_pool = None
+        if processing_config.PREPROCESS_WORKERS > 0:
+            batch_pool = PreprocessingPool(
+                max_workers=processing_config.PREPROCESS_WORKERS,
+                stem_cache_size=processing_config.STEM_CACHE_SIZE
+            )
+        
+        return HybridTextProcessor(
+            stem_cache_size=processing_config.STEM_CACHE_SIZE,
+            batch_pool=batch_pool,
+            parallel_threshold=processing_config.PREPROCESS_PARALLEL_THRESHOLD
+        )
+    
+    def shutdown(self) -> None:
+        """Libera os recursos mantidos pelos componentes (pools de processos, bancos)"""
+        self._file_parser_factory.shutdown()
+        self._text_processor.shutdown()
+        
+        if self._rate_limiter:
+            self._rate_limiter.close()
+        
+        if self._job_queue:
+            self._job_queue.close()
+        
+        if self._near_duplicate_ai_service:
+            self._near_duplicate_ai_service.close()
+        
+        if self._cached_ai_service:
+            self._cached_ai_service.close()
+    
+    def stats(self) -> dict:
+        """Reúne as estatísticas dos componentes configurados"""
+        stats = self._text_processor.stats()
+        
+        pdf_stats = self._file_parser_factory.stats()
+        if pdf_stats:
+            stats["pdf"] = pdf_stats
+        
+        if hasattr(self._base_ai_service, "stats"):
+            stats["ai"] = self._base_ai_service.stats()
+        
+        if self._client_pool:
+            stats["ai_pool"] = self._client_pool.stats()
+        
+        if self._resilient_ai_service:
+            stats["resilience"] = self._resilient_ai_service.stats()
+        
+        if self._near_duplicate_ai_service:
+            stats["near_duplicate"] = self._near_duplicate_ai_service.stats()
+        
+        if self._cached_ai_service:
+            stats["cache"] = self._cached_ai_service.stats()
+        
+        if self._coalescing_ai_service:
+            stats["coalescing"] = self._coalescing_ai_service.stats()
+        
+        if self._fast_path_ai_service:
+            stats["local_classifier"] = self._fast_path_ai_service.stats()
+        
+        if self._rate_limiter:
+            stats["rate_limit"] = self._rate_limiter.stats()
+        
+        if self._job_queue:
+            stats["jobs"] = self._job_queue.stats()
+        
+        return stats
+    
+    @property
+    def ai_service(self) -> AIServiceInterface:
+        """Retorna o serviço de IA (com os decorators configurados)"""
+        return self._ai_service
+    
+    @property
+    def rate_limiter(self) -> Optional[TokenBucketRateLimiter]:
+        """Retorna o rate limiter (None se desativado)"""
+        return self._rate_limiter
+    
+    @property
+    def metrics(self) -> Optional[PipelineMetrics]:
+        """Retorna as métricas do pipeline (None se desativadas)"""
+        return self._metrics
+    
+    @property
+    def profiler(self) -> Optional[SamplingProfiler]:
+        """Retorna o profiler por amostragem (None se desativado)"""
+        return self._profiler
+    
+    @property
+    def profile_store(self) -> Optional[ProfileStore]:
+        """Retorna os perfis guardados (None se o profiling estiver desativado)"""
+        return self._profile_store
+    
+    @property
+    def profiling_authorizer(self) -> Optional[ProfilingAuthorizer]:
+        """Retorna a verificação dos pedidos de profiling (None se desativado)"""
+        return self._profiling_authorizer
+    
+    @property
+    def job_queue(self) -> Optional[JobQueue]:
+        """Retorna a fila de jobs (None se desativada)"""
+        return self._job_queue
+    
+    @property
+    def job_controller(self) -> Optional[JobController]:
+        """Retorna o controller de jobs (None se a fila estiver desativada)"""
+        return self._job_controller
+    
     @property
     def email_controller(self) -> EmailController:
         """Retorna o controller de email"""
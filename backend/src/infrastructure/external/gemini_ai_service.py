@@ -1,93 +1,313 @@
-import json
-import google.generativeai as genai
-from typing import Optional
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from ...domain.services.interfaces import AIServiceInterface
-from ...domain.entities.email import Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from ...domain.entities.email import (
+    AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText, StreamEventType
+)
+from ...domain.exceptions import AIServiceError
+from .prompt_builder import BuiltPrompt, CompactEmail, PromptBuilder
+from .response_parser import ANALYSIS_SCHEMA, BATCH_SCHEMA, ResponseParser, StreamingResponseParser
 
 
 class GeminiAIService(AIServiceInterface):
     """Serviço de IA usando Google Gemini"""
     
-    def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
-        genai.configure(api_key=api_key)
-        self._model = genai.GenerativeModel(model_name)
+    # Status HTTP do upstream que valem uma nova tentativa
+    RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-1.5-flash",
+        max_concurrency: int = 32,
+        batch_token_budget: int = 8000,
+        batch_max_items: int = 20,
+        prompt_builder: Optional[PromptBuilder] = None,
+        structured_output: bool = True,
+        propagate_errors: bool = False,
+        model: Optional[Any] = None
+    ):
+        if model is None:
+            # O SDK custa a maior parte do cold start: só é importado quando o modelo real é criado
+            import google.generativeai as genai
+            
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_name)
+        self._model = model
+        # Limita quantas chamadas ao Gemini ficam em andamento ao mesmo tempo
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._batch_token_budget = batch_token_budget
+        self._batch_max_items = max(1, batch_max_items)
+        self._prompt_builder = prompt_builder or PromptBuilder()
+        self._structured_output = structured_output
+        self._response_parser = ResponseParser()
+        # Com o wrapper de resiliência, falhas do upstream sobem como AIServiceError
+        self._propagate_errors = propagate_errors
+        # Contadores por chamada ao modelo (tokens estimados localmente)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.content_tokens = 0
+        self.original_tokens = 0
+        self.truncated_prompts = 0
+        self.latency_seconds = 0.0
     
     async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
         """Analisa um email e gera uma resposta apropriada"""
         try:
-            prompt = self._build_analysis_prompt(email, processed_text)
-            response = self._model.generate_content(prompt)
+            prompt = self._prompt_builder.build_single(email)
+            response_text = await self._complete(prompt, ANALYSIS_SCHEMA)
+            result = self._response_parser.parse_single(response_text)
+            
+            if result is None:
+                # Uma única tentativa de reparo, com prompt curto
+                repaired_text = await self._complete(self._repair_prompt(response_text, "object"), ANALYSIS_SCHEMA)
+                result = self._response_parser.parse_single(repaired_text, repair=True)
             
-            return self._parse_response(response.text)
+            if result is None:
+                return self._invalid_response_result()
             
+            result.prompt_tokens = prompt.tokens
+            return result
+        
+        except AIServiceError as e:
+            if self._propagate_errors:
+                raise
+            return self._error_result(e.message, e.code)
         except Exception as e:
-            return EmailAnalysisResult(
-                category=EmailCategory.PRODUCTIVE,  # Default seguro
-                response="Desculpe, ocorreu um erro interno. Tente novamente mais tarde.",
-                error=str(e)
-            )
-    
-    def _build_analysis_prompt(self, email: Email, processed_text: ProcessedText) -> str:
-        """Constrói o prompt para análise do email"""
-        return f"""
-        Analise o seguinte email e execute as seguintes tarefas:
-
-        1. Classifique como 'Produtivo' ou 'Improdutivo'
-        2. Gere uma resposta automática adequada à categoria:
-           - Se PRODUTIVO: resposta que facilita o diálogo e encoraja comunicação
-           - Se IMPRODUTIVO: resposta educada mas que desencoraja continuidade
-
-        Email (pré-processado): {processed_text.processed}
-        Email original (para contexto): {email.get_full_content()}
-
-        Responda OBRIGATORIAMENTE no seguinte formato JSON:
-        {{
-            "categoria": "Produtivo" ou "Improdutivo",
-            "resposta": "texto da resposta adequada à categoria"
-        }}
-
-        DIRETRIZES para respostas:
-        - PRODUTIVO: Seja receptivo, ofereça ajuda, peça mais detalhes se necessário
-        - IMPRODUTIVO: Seja educado mas firme, redirecione ou encerre gentilmente
-        - Todas as respostas devem ser profissionais
-        - Responda APENAS o JSON, sem texto adicional
-        """
-    
-    def _parse_response(self, response_text: str) -> EmailAnalysisResult:
-        """Faz parse da resposta da IA"""
+            return self._error_result(str(e))
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """Transmite a categoria assim que decidida e a resposta conforme o modelo a gera"""
+        stream_parser = StreamingResponseParser()
+        
         try:
-            cleaned_response = self._clean_response_text(response_text)
-            result = json.loads(cleaned_response)
+            prompt = self._prompt_builder.build_single(email)
+            
+            async for chunk in self._complete_stream(prompt, ANALYSIS_SCHEMA):
+                for event in stream_parser.feed(chunk):
+                    yield event
             
-            category = self._parse_category(result.get("categoria", ""))
-            response = result.get("resposta", "")
+            # O texto completo é validado como no caminho sem streaming
+            result = self._response_parser.parse_single(stream_parser.text)
+            
+            if result is None:
+                repaired_text = await self._complete(self._repair_prompt(stream_parser.text, "object"), ANALYSIS_SCHEMA)
+                result = self._response_parser.parse_single(repaired_text, repair=True)
+            
+            if result is None:
+                result = self._invalid_response_result()
+            else:
+                result.prompt_tokens = prompt.tokens
+        
+        except AIServiceError as e:
+            if self._propagate_errors:
+                raise
+            result = self._error_result(e.message, e.code)
+        except Exception as e:
+            result = self._error_result(str(e))
+        
+        yield AnalysisStreamEvent(StreamEventType.RESULT, result=result)
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """Analisa vários emails agrupando-os em prompts dentro do orçamento de tokens"""
+        compacts = [self._prompt_builder.compact(email) for email, _ in items]
+        chunks = self._split_into_chunks(list(zip(items, compacts)))
+        chunk_results = await asyncio.gather(*(self._analyze_chunk(chunk) for chunk in chunks))
+        
+        return [result for results in chunk_results for result in results]
+    
+    async def _analyze_chunk(
+        self,
+        chunk: List[Tuple[Tuple[Email, ProcessedText], CompactEmail]]
+    ) -> List[EmailAnalysisResult]:
+        """Analisa um grupo de emails em um único prompt, com fallback individual"""
+        if len(chunk) == 1:
+            return [await self.analyze_email(*chunk[0][0])]
+        
+        try:
+            prompt = self._prompt_builder.build_batch([compact for _, compact in chunk])
+            response_text = await self._complete(prompt, BATCH_SCHEMA)
+            parsed = self._response_parser.parse_batch(response_text, len(chunk))
             
-            return EmailAnalysisResult(category=category, response=response)
+            if parsed is None:
+                repaired_text = await self._complete(self._repair_prompt(response_text, "array"), BATCH_SCHEMA)
+                parsed = self._response_parser.parse_batch(repaired_text, len(chunk), repair=True) or {}
             
-        except json.JSONDecodeError as e:
-            return EmailAnalysisResult(
-                category=EmailCategory.PRODUCTIVE,
-                response="Desculpe, ocorreu um erro ao processar sua mensagem. Tente novamente mais tarde.",
-                error=f"Erro JSON: {str(e)}"
-            )
-    
-    def _clean_response_text(self, response_text: str) -> str:
-        """Remove markdown code blocks da resposta"""
-        cleaned = response_text.strip()
+            # Cada email recebe o próprio conteúdo mais uma parte igual das
+            # instruções, que o lote paga uma única vez
+            shared_tokens = (prompt.tokens - prompt.content_tokens) // len(chunk)
+            for index, result in parsed.items():
+                result.prompt_tokens = chunk[index][1].tokens + shared_tokens
+        except AIServiceError:
+            if self._propagate_errors:
+                raise
+            parsed = {}
+        except Exception:
+            parsed = {}
         
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        elif cleaned.startswith('```'):
-            cleaned = cleaned[3:]
+        # Itens que não vieram na resposta são analisados individualmente
+        missing = [index for index in range(len(chunk)) if index not in parsed]
+        fallback_results = await asyncio.gather(*(self.analyze_email(*chunk[index][0]) for index in missing))
+        parsed.update(zip(missing, fallback_results))
+        
+        return [parsed[index] for index in range(len(chunk))]
+    
+    def _split_into_chunks(
+        self,
+        items: List[Tuple[Tuple[Email, ProcessedText], CompactEmail]]
+    ) -> List[List[Tuple[Tuple[Email, ProcessedText], CompactEmail]]]:
+        """Divide os emails (já compactados) em grupos que respeitam o orçamento de tokens"""
+        chunks: List[List[Tuple[Tuple[Email, ProcessedText], CompactEmail]]] = []
+        current: List[Tuple[Tuple[Email, ProcessedText], CompactEmail]] = []
+        current_tokens = 0
+        
+        for item, compact in items:
+            tokens = compact.tokens
             
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
+            if current and (
+                current_tokens + tokens > self._batch_token_budget
+                or len(current) >= self._batch_max_items
+            ):
+                chunks.append(current)
+                current, current_tokens = [], 0
             
-        return cleaned.strip()
+            current.append((item, compact))
+            current_tokens += tokens
+        
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
+    def stats(self) -> Dict[str, object]:
+        """Tokens estimados e latência das chamadas ao modelo"""
+        calls = max(self.calls, 1)
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "avg_prompt_tokens": round(self.prompt_tokens / calls, 1),
+            "content_tokens_saved": self.original_tokens - self.content_tokens,
+            "truncated_prompts": self.truncated_prompts,
+            "avg_latency_ms": round(self.latency_seconds / calls * 1000, 1),
+            "parsing": self._response_parser.stats()
+        }
+    
+    @staticmethod
+    def _error_result(message: str, code: Optional[str] = None) -> EmailAnalysisResult:
+        return EmailAnalysisResult(
+            category=EmailCategory.PRODUCTIVE,  # Default seguro
+            response="Desculpe, ocorreu um erro interno. Tente novamente mais tarde.",
+            error=message,
+            error_code=code
+        )
+    
+    @staticmethod
+    def _invalid_response_result() -> EmailAnalysisResult:
+        return EmailAnalysisResult(
+            category=EmailCategory.PRODUCTIVE,
+            response="Desculpe, ocorreu um erro ao processar sua mensagem. Tente novamente mais tarde.",
+            error="Resposta da IA em formato inválido"
+        )
+    
+    def _repair_prompt(self, response_text: str, kind: str) -> BuiltPrompt:
+        """Prompt de reparo para uma resposta que não pôde ser interpretada"""
+        text = self._response_parser.repair_prompt(response_text, kind)
+        tokens = self._prompt_builder.estimate_tokens(text)
+        return BuiltPrompt(text=text, tokens=tokens, content_tokens=0, original_tokens=0)
+    
+    async def _complete(self, prompt: BuiltPrompt, schema: Optional[Dict[str, Any]] = None) -> str:
+        """Envia o prompt ao modelo registrando tokens estimados e latência"""
+        start = time.perf_counter()
+        try:
+            return await self._generate(prompt.text, self._generation_config(schema))
+        finally:
+            self._record_call(prompt, start)
     
-    def _parse_category(self, category_str: str) -> EmailCategory:
-        """Converte string de categoria para enum"""
-        if category_str.lower() in ["produtivo", "productive"]:
-            return EmailCategory.PRODUCTIVE
-        return EmailCategory.UNPRODUCTIVE
+    async def _complete_stream(
+        self,
+        prompt: BuiltPrompt,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Como _complete, mas repassando os trechos da resposta conforme chegam"""
+        start = time.perf_counter()
+        try:
+            async for chunk in self._generate_stream(prompt.text, self._generation_config(schema)):
+                yield chunk
+        finally:
+            self._record_call(prompt, start)
+    
+    def _generation_config(self, schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not self._structured_output or schema is None:
+            return None
+        # Saída restrita ao schema JSON (sem cercas de markdown nem texto extra)
+        return {"response_mime_type": "application/json", "response_schema": schema}
+    
+    def _record_call(self, prompt: BuiltPrompt, start: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt.tokens
+        self.content_tokens += prompt.content_tokens
+        self.original_tokens += prompt.original_tokens
+        self.truncated_prompts += prompt.truncated
+        self.latency_seconds += time.perf_counter() - start
+    
+    async def _generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """Chama o modelo sem bloquear o event loop"""
+        async with self._semaphore:
+            generate_async = getattr(self._model, "generate_content_async", None)
+            
+            try:
+                if generate_async is not None:
+                    response = await generate_async(prompt, generation_config=generation_config)
+                else:
+                    # Modelos sem cliente assíncrono rodam em thread separada
+                    response = await asyncio.to_thread(
+                        self._model.generate_content, prompt, generation_config=generation_config
+                    )
+                return response.text
+            except Exception as e:
+                raise self._upstream_error(e) from e
+    
+    async def _generate_stream(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Chama o modelo com stream=True, repassando o texto de cada trecho"""
+        if getattr(self._model, "generate_content_async", None) is None:
+            # Sem cliente assíncrono não há streaming: a resposta chega inteira
+            yield await self._generate(prompt, generation_config)
+            return
+        
+        async with self._semaphore:
+            try:
+                response = await self._model.generate_content_async(
+                    prompt, generation_config=generation_config, stream=True
+                )
+                async for chunk in response:
+                    yield chunk.text
+            except Exception as e:
+                raise self._upstream_error(e) from e
+    
+    @classmethod
+    def _upstream_error(cls, error: Exception) -> AIServiceError:
+        """Classifica a falha do SDK (exceções do google.api_core expõem o status HTTP em `code`)"""
+        status = getattr(error, "code", None)
+        message = str(error) or error.__class__.__name__
+        
+        if isinstance(error, TimeoutError) or status in (408, 504):
+            return AIServiceError("ia_timeout", message, retryable=True)
+        if status == 429:
+            return AIServiceError("ia_cota_excedida", message, retryable=True)
+        if isinstance(error, ConnectionError) or status in cls.RETRYABLE_STATUS:
+            return AIServiceError("ia_indisponivel", message, retryable=True)
+        
+        return AIServiceError("ia_erro", message)
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..resilience.adaptive_limiter import AdaptiveConcurrencyLimit
+
+# Status do upstream que indicam sobrecarga ou cota esgotada no cliente
+OVERLOAD_STATUS = {429, 503}
+
+
+def configured_model(api_key: str, model_name: str) -> Any:
+    """Modelo da chave principal, só pela API pública do SDK (`genai.configure` é global)"""
+    import google.generativeai as genai
+    
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+class KeyedGeminiModel:
+    """
+    Modelo do Gemini com a própria chave de API, usado só para as chaves
+    extras (GEMINI_API_KEYS). O `genai.configure` é global (uma chave por
+    processo), então cada chave ganha o seu gerenciador de clientes do SDK,
+    usado no lugar dos clientes padrão do modelo.
+    
+    Depende de internos do SDK (`client._ClientManager` e dos atributos
+    `_client`/`_async_client` do GenerativeModel), verificados pelos testes;
+    se faltarem, levanta AttributeError e o pool fica só com a chave principal.
+    """
+    
+    def __init__(self, api_key: str, model_name: str):
+        import google.generativeai as genai
+        from google.generativeai import client
+        
+        if not hasattr(client, "_ClientManager"):
+            raise AttributeError("google.generativeai.client._ClientManager não existe nesta versão do SDK")
+        
+        self._clients = client._ClientManager()
+        self._clients.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(model_name)
+        if not hasattr(self._model, "_client") or not hasattr(self._model, "_async_client"):
+            raise AttributeError("GenerativeModel sem _client/_async_client nesta versão do SDK")
+    
+    async def generate_content_async(self, prompt: Any, **kwargs) -> Any:
+        if self._model._async_client is None:
+            # Criado na primeira chamada: o cliente assíncrono (gRPC) fica preso ao event loop atual
+            self._model._async_client = self._clients.get_default_client("generative_async")
+        return await self._model.generate_content_async(prompt, **kwargs)
+    
+    def generate_content(self, prompt: Any, **kwargs) -> Any:
+        if self._model._client is None:
+            self._model._client = self._clients.get_default_client("generative")
+        return self._model.generate_content(prompt, **kwargs)
+
+
+@dataclass
+class PooledClient:
+    """Um modelo (chave de API + nome do modelo) do pool, com o seu limite adaptativo"""
+    name: str
+    model: Any
+    limit: AdaptiveConcurrencyLimit
+    calls: int = 0
+
+
+class _ReleasingStream:
+    """Resposta em streaming que só devolve a vaga do cliente quando termina"""
+    
+    def __init__(self, response: Any, on_done: Callable[[Optional[BaseException]], None]):
+        self._response = response
+        self._on_done = on_done
+    
+    async def __aiter__(self):
+        error: Optional[BaseException] = None
+        try:
+            async for chunk in self._response:
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._on_done(error)
+
+
+class GeminiClientPool:
+    """
+    Pool de modelos do Gemini (várias chaves de API e/ou modelos) com a mesma
+    interface de um modelo do SDK. Cada chamada vai para o cliente menos
+    carregado (chamadas em andamento / limite) entre os que têm vaga; sem
+    vaga em nenhum, espera a primeira liberada. Um 429 reduz o limite do
+    cliente, pausa-o e a chamada é repetida em outro cliente do pool.
+    """
+    
+    def __init__(self, clients: Sequence[PooledClient], clock: Callable[[], float] = time.monotonic):
+        if not clients:
+            raise ValueError("O pool precisa de pelo menos um cliente")
+        self._clients = list(clients)
+        self._clock = clock
+        # Chamadas esperando uma vaga em qualquer cliente
+        self._waiters: List[asyncio.Future] = []
+        self.failovers = 0
+        self.waits = 0
+    
+    @property
+    def size(self) -> int:
+        return len(self._clients)
+    
+    @classmethod
+    def from_config(
+        cls,
+        api_keys: Sequence[str],
+        model_names: Sequence[str],
+        limit_factory: Callable[[], AdaptiveConcurrencyLimit],
+        model_factory: Callable[[str, str], Any] = KeyedGeminiModel,
+        primary_model_factory: Callable[[str, str], Any] = configured_model
+    ) -> "GeminiClientPool":
+        """
+        Um cliente por combinação de chave e modelo. A primeira chave usa a API
+        pública do SDK; as demais, `model_factory`.
+        """
+        return cls([
+            PooledClient(
+                name=f"{model_name}_chave{index}",
+                model=(primary_model_factory if index == 0 else model_factory)(api_key, model_name),
+                limit=limit_factory()
+            )
+            for index, api_key in enumerate(api_keys)
+            for model_name in model_names
+        ])
+    
+    async def generate_content_async(self, prompt: Any, stream: bool = False, **kwargs) -> Any:
+        """Como o método do SDK; com stream=True a vaga fica ocupada até o fim da resposta"""
+        tried: List[PooledClient] = []
+        
+        while True:
+            client = await self._acquire(tried)
+            start = self._clock()
+            try:
+                response = await self._call(client, prompt, stream, **kwargs)
+            except asyncio.CancelledError:
+                self._release(client, None, None)
+                raise
+            except Exception as e:
+                overloaded = getattr(e, "code", None) in OVERLOAD_STATUS
+                self._release(client, None, e)
+                tried.append(client)
+                if overloaded and len(tried) < len(self._clients):
+                    self.failovers += 1
+                    continue
+                raise
+            
+            latency = self._clock() - start
+            if not stream:
+                self._release(client, latency, None)
+                return response
+            
+            # A latência do streaming é a do primeiro trecho; a vaga volta ao fim da resposta
+            return _ReleasingStream(response, lambda error: self._release(client, latency, error))
+    
+    def stats(self) -> Dict[str, object]:
+        """Limite e contadores de cada cliente do pool"""
+        return {
+            "failovers": self.failovers,
+            "waits": self.waits,
+            "clients": {client.name: dict(client.limit.stats(), calls=client.calls) for client in self._clients}
+        }
+    
+    async def _call(self, client: PooledClient, prompt: Any, stream: bool, **kwargs) -> Any:
+        client.calls += 1
+        generate_async = getattr(client.model, "generate_content_async", None)
+        
+        if generate_async is not None:
+            if stream:
+                return await generate_async(prompt, stream=True, **kwargs)
+            return await generate_async(prompt, **kwargs)
+        
+        # Modelos sem cliente assíncrono rodam em thread separada (e sem streaming)
+        return await asyncio.to_thread(client.model.generate_content, prompt, **kwargs)
+    
+    async def _acquire(self, tried: List[PooledClient]) -> PooledClient:
+        """Reserva uma vaga no cliente menos carregado (preferindo os ainda não tentados nesta chamada)"""
+        while True:
+            candidates = [client for client in self._clients if client.limit.available()]
+            fresh = [client for client in candidates if client not in tried]
+            if candidates:
+                client = min(fresh or candidates, key=lambda c: c.limit.load())
+                client.limit.acquire()
+                return client
+            
+            self.waits += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # Acorda quando uma vaga é liberada ou quando termina a pausa mais curta
+                await asyncio.wait_for(waiter, self._next_unpause())
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+    
+    def _next_unpause(self) -> Optional[float]:
+        """Segundos até o fim da pausa mais próxima (None se nenhum cliente está pausado)"""
+        now = self._clock()
+        pauses = [client.limit.paused_until - now for client in self._clients if client.limit.paused_until > now]
+        return max(min(pauses), 0.001) if pauses else None
+    
+    def _release(self, client: PooledClient, latency: Optional[float], error: Optional[BaseException]) -> None:
+        """Devolve a vaga e acorda as chamadas à espera (elas voltam a escolher o cliente)"""
+        self._record(client, latency, error)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    @staticmethod
+    def _record(client: PooledClient, latency: Optional[float], error: Optional[BaseException]) -> None:
+        """Devolve a vaga ao limite com o sinal da chamada (latência, 429 ou nenhum)"""
+        if error is not None and getattr(error, "code", None) in OVERLOAD_STATUS:
+            client.limit.on_overload()
+        elif error is None and latency is not None:
+            client.limit.on_success(latency)
+        else:
+            client.limit.release()
@@ -1,17 +1,30 @@
 import re
 from unidecode import unidecode
-from typing import List, Set
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
 from ...domain.services.interfaces import TextProcessorInterface
 from ...domain.entities.email import ProcessedText
+from ..observability.profiler import profiled
+from .suffix_stemmer import SuffixStemmer
+
+if TYPE_CHECKING:
+    from .preprocessing_pool import PreprocessingPool
 
 
 class HybridTextProcessor(TextProcessorInterface):
     """Processador híbrido que combina várias técnicas"""
     
-    def __init__(self):
-        self._setup_resources()
+    def __init__(
+        self,
+        stem_cache_size: int = 50000,
+        batch_pool: Optional["PreprocessingPool"] = None,
+        parallel_threshold: int = 256
+    ):
+        self._setup_resources(stem_cache_size)
+        # Lotes a partir deste tamanho vão para o pool de processos (se configurado)
+        self._batch_pool = batch_pool
+        self._parallel_threshold = max(1, parallel_threshold)
     
-    def _setup_resources(self):
+    def _setup_resources(self, stem_cache_size: int = 50000):
         """Configura recursos de processamento"""
         # Stop words expandidas
         self._stop_words = self._get_comprehensive_stopwords()
@@ -20,6 +33,7 @@ class HybridTextProcessor(TextProcessorInterface):
         self._email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
         self._url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
         self._phone_pattern = re.compile(r'\b\d{2,3}[-.\s]?\d{4,5}[-.\s]?\d{4}\b')
+        self._word_pattern = re.compile(r'[a-z]+')
         
         # Sufixos comuns em português para stemming simples
         self._suffix_rules = [
@@ -30,6 +44,12 @@ class HybridTextProcessor(TextProcessorInterface):
             ('ível', ''), ('oso', ''), ('osa', ''),
             ('ado', 'ar'), ('ida', 'ir'), ('ção', 'r')
         ]
+        
+        # Tabela de transliteração (caractere -> ASCII), preenchida sob demanda
+        self._transliteration_table: Dict[int, str] = {}
+        
+        # Stemmer com memo compartilhado entre requisições
+        self._stemmer = SuffixStemmer(self._suffix_rules, memo_size=stem_cache_size)
     
     def _get_comprehensive_stopwords(self) -> Set[str]:
         """Stop words abrangentes em português"""
@@ -71,117 +91,104 @@ class HybridTextProcessor(TextProcessorInterface):
             'acima', 'abaixo', 'bastante', 'demais', 'deveras', 'assaz'
         }
     
+    @profiled
     def preprocess_text(self, text: str) -> ProcessedText:
         """Processamento híbrido avançado"""
-        original_text = text
-        
+        return ProcessedText(original=text, processed=self._process(text))
+    
+    @profiled
+    def preprocess_batch(self, texts: Iterable[str]) -> List[ProcessedText]:
+        """Pré-processa vários textos, na ordem; lotes grandes são divididos entre os processos do pool"""
+        texts = list(texts)
+        
+        if self._batch_pool is not None and len(texts) >= self._parallel_threshold:
+            processed = self._batch_pool.map(texts)
+            if processed is not None:
+                return [ProcessedText(original=text, processed=result) for text, result in zip(texts, processed)]
+        
+        process = self._process
+        return [ProcessedText(original=text, processed=process(text)) for text in texts]
+    
+    def shutdown(self) -> None:
+        """Encerra o pool de processos dos lotes (se configurado)"""
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown()
+    
+    def _process(self, text: str) -> str:
+        """Texto processado, sem o wrapper de profiling (chamado uma vez por texto nos lotes)"""
         # 1. Limpeza inicial
         processed = self._clean_text(text)
         
         # 2. Normalização
         processed = self._normalize_text(processed)
         
-        # 3. Tokenização inteligente
-        words = self._smart_tokenize(processed)
-        
-        # 4. Filtragem avançada
-        words = self._filter_words(words)
-        
-        # 5. Stemming simples
-        words = self._simple_stem(words)
+        # 3. Tokenização, filtragem e stemming em uma única passada
+        words = self._tokenize_filter_stem(processed)
         
-        processed_text = ' '.join(words)
-        
-        return ProcessedText(original=original_text, processed=processed_text)
+        return ' '.join(words)
     
     def _clean_text(self, text: str) -> str:
         """Limpeza inicial do texto"""
-        # Remove emails, URLs e telefones
+        # Remove emails, URLs e telefones (nesta ordem, pois um email dentro
+        # de uma URL muda o que o padrão de URL remove)
         text = self._email_pattern.sub(' ', text)
         text = self._url_pattern.sub(' ', text)
         text = self._phone_pattern.sub(' ', text)
         
-        # Remove quebras de linha e tabs
-        text = re.sub(r'[\n\r\t]+', ' ', text)
-        
         return text
     
     def _normalize_text(self, text: str) -> str:
         """Normalização do texto"""
-        # Remove acentos
-        text = unidecode(text)
+        # Remove acentos (unidecode é caractere a caractere, então uma tabela
+        # de tradução dá o mesmo resultado em uma única passada)
+        if not text.isascii():
+            table = self._transliteration_table
+            for char in set(text):
+                code = ord(char)
+                if code > 127 and code not in table:
+                    table[code] = unidecode(char)
+            text = text.translate(table)
         
         # Converte para minúsculas
-        text = text.lower()
-        
-        # Remove pontuação e caracteres especiais
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Remove números
-        text = re.sub(r'\d+', ' ', text)
-        
-        # Remove underscores
-        text = re.sub(r'_+', ' ', text)
-        
-        # Normaliza espaços
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
-    
-    def _smart_tokenize(self, text: str) -> List[str]:
-        """Tokenização inteligente"""
-        # Split básico
-        words = text.split()
-        
-        # Remove palavras com caracteres repetitivos (spam)
-        filtered_words = []
-        for word in words:
-            # Remove palavras com muita repetição de caracteres
-            if len(set(word)) <= 2 and len(word) > 4:
-                continue
-            # Remove palavras muito curtas ou muito longas
-            if len(word) < 2 or len(word) > 30:
-                continue
-            filtered_words.append(word)
-        
-        return filtered_words
+        return text.lower()
     
-    def _filter_words(self, words: List[str]) -> List[str]:
-        """Filtragem avançada de palavras"""
-        filtered = []
-        
-        for word in words:
-            # Remove stop words
-            if word in self._stop_words:
-                continue
-            
-            # Remove palavras muito curtas
-            if len(word) < 3:
-                continue
+    def _tokenize_filter_stem(self, text: str) -> List[str]:
+        """Tokenização, filtragem e stemming combinados"""
+        # Após a normalização o texto é ASCII: pontuação, números, underscores
+        # e espaços são todos separadores, então os tokens são sequências [a-z]+
+        seen: Dict[str, Optional[str]] = {}
+        words = []
+        
+        for word in self._word_pattern.findall(text):
+            if word in seen:
+                result = seen[word]
+            else:
+                result = seen[word] = self._filter_and_stem(word)
             
-            # Remove palavras que são apenas repetições
-            if len(set(word)) == 1:
-                continue
-            
-            # Remove palavras que parecem códigos/IDs
-            if re.match(r'^[a-z]{1,2}\d+$', word):
-                continue
-            
-            filtered.append(word)
+            if result is not None:
+                words.append(result)
         
-        return filtered
+        return words
     
-    def _simple_stem(self, words: List[str]) -> List[str]:
-        """Stemming simples baseado em regras"""
-        stemmed = []
-        
-        for word in words:
-            # Aplica regras de stemming
-            for suffix, replacement in self._suffix_rules:
-                if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                    word = word[:-len(suffix)] + replacement
-                    break
-            
-            stemmed.append(word)
+    def _filter_and_stem(self, word: str) -> Optional[str]:
+        """Retorna o radical da palavra ou None se ela deve ser descartada"""
+        length = len(word)
         
-        return stemmed
+        # Remove palavras muito curtas/longas e stop words
+        if length < 3 or length > 30 or word in self._stop_words:
+            return None
+        
+        # Remove repetições e palavras com muita repetição de caracteres (spam)
+        distinct = len(set(word))
+        if distinct == 1 or (distinct <= 2 and length > 4):
+            return None
+        
+        # Stemming simples baseado em regras
+        return self._stemmer.stem(word)
+    
+    def stats(self) -> dict:
+        """Retorna as estatísticas do stemmer (e do pool de lotes, se configurado)"""
+        stats = {"stemmer": self._stemmer.stats()}
+        if self._batch_pool is not None:
+            stats["preprocess_pool"] = self._batch_pool.stats()
+        return stats
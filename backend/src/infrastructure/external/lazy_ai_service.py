@@ -0,0 +1,47 @@
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import AnalysisStreamEvent, Email, EmailAnalysisResult, ProcessedText
+
+
+class LazyAIService(AIServiceInterface):
+    """
+    Proxy que só cria o serviço de IA (SDK do Gemini, decorators e
+    classificador local) na primeira análise. Rotas que não chamam a IA,
+    como /health e /preprocess, nunca pagam esse custo no cold start.
+    """
+    
+    def __init__(self, factory: Callable[[], AIServiceInterface]):
+        self._factory = factory
+        self._service: Optional[AIServiceInterface] = None
+        self._lock = asyncio.Lock()
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        service = await self._get_service()
+        return await service.analyze_email(email, processed_text)
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        service = await self._get_service()
+        return await service.analyze_batch(items)
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        service = await self._get_service()
+        async for event in service.analyze_email_stream(email, processed_text):
+            yield event
+    
+    async def _get_service(self) -> AIServiceInterface:
+        """Cria o serviço uma única vez, mesmo com várias requisições chegando juntas"""
+        if self._service is None:
+            async with self._lock:
+                if self._service is None:
+                    # Imports e treino do classificador rodam em thread para não travar o event loop
+                    self._service = await asyncio.to_thread(self._factory)
+        return self._service
@@ -0,0 +1,97 @@
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from .hybrid_processor import HybridTextProcessor
+
+# Processador de cada processo do pool: stop words, regras de sufixo e memo do stemmer criados uma única vez
+_worker_processor: Optional[HybridTextProcessor] = None
+
+
+def _init_worker(stem_cache_size: int) -> None:
+    """Executado uma vez em cada processo filho"""
+    global _worker_processor
+    _worker_processor = HybridTextProcessor(stem_cache_size=stem_cache_size)
+
+
+def _preprocess_chunk(texts: List[str]) -> List[str]:
+    """Executado no processo filho: devolve só o texto processado (o original já está no processo pai)"""
+    return [processed.processed for processed in _worker_processor.preprocess_batch(texts)]
+
+
+class PreprocessingPool:
+    """
+    Pool de processos para pré-processar lotes grandes de textos em vários
+    núcleos. Cada lote é dividido em `chunks_per_worker` partes por processo
+    (menos IPC que um texto por tarefa, mas ainda equilibrando textos de
+    tamanhos diferentes) e a ordem dos resultados é preservada.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 2,
+        stem_cache_size: int = 50000,
+        start_method: str = "spawn",
+        chunks_per_worker: int = 4
+    ):
+        self._max_workers = max_workers
+        self._stem_cache_size = stem_cache_size
+        self._start_method = start_method
+        self._chunks_per_worker = max(1, chunks_per_worker)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # map é chamado de threads (asyncio.to_thread): o pool é criado uma única vez
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+    
+    def map(self, texts: List[str]) -> Optional[List[str]]:
+        """Textos processados na ordem de entrada, ou None se o pool estiver indisponível"""
+        executor = self._get_executor()
+        if executor is None:
+            return None
+        
+        size = math.ceil(len(texts) / (self._max_workers * self._chunks_per_worker))
+        chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+        
+        try:
+            processed = [text for chunk in executor.map(_preprocess_chunk, chunks) for text in chunk]
+        except BrokenProcessPool:
+            # Um worker morreu (ex.: falta de memória): o lote é refeito no processo atual
+            self.shutdown()
+            return None
+        
+        self.batches += 1
+        self.texts += len(texts)
+        return processed
+    
+    def stats(self) -> dict:
+        return {"workers": self._max_workers, "batches": self.batches, "texts": self.texts}
+    
+    def shutdown(self) -> None:
+        """Encerra o pool de processos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Cria o pool sob demanda (ou retorna None se desativado/indisponível)"""
+        if self._max_workers <= 0:
+            return None
+        
+        with self._lock:
+            if self._executor is None and self._max_workers > 0:
+                try:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self._max_workers,
+                        mp_context=multiprocessing.get_context(self._start_method),
+                        initializer=_init_worker,
+                        initargs=(self._stem_cache_size,)
+                    )
+                except (OSError, NotImplementedError, ValueError):
+                    # Ex.: sem /dev/shm em funções serverless
+                    self._max_workers = 0
+            
+            return self._executor
@@ -0,0 +1,217 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import List
+
+from ...domain.entities.email import Email
+
+
+# Bloco de instruções único, compartilhado pelos prompts individual e em lote
+INSTRUCTIONS = """Tarefas:
+1. Classifique como 'Produtivo' ou 'Improdutivo'
+2. Gere uma resposta automática adequada à categoria:
+   - Se PRODUTIVO: resposta que facilita o diálogo e encoraja comunicação
+   - Se IMPRODUTIVO: resposta educada mas que desencoraja continuidade"""
+
+GUIDELINES = """DIRETRIZES para respostas:
+- PRODUTIVO: Seja receptivo, ofereça ajuda, peça mais detalhes se necessário
+- IMPRODUTIVO: Seja educado mas firme, redirecione ou encerre gentilmente
+- Todas as respostas devem ser profissionais"""
+
+SINGLE_FORMAT = """Responda OBRIGATORIAMENTE no seguinte formato JSON, sem texto adicional:
+{"categoria": "Produtivo" ou "Improdutivo", "resposta": "texto da resposta adequada à categoria"}"""
+
+BATCH_FORMAT = """Responda OBRIGATORIAMENTE com um array JSON contendo um objeto por email, sem texto adicional:
+[{"id": número do email, "categoria": "Produtivo" ou "Improdutivo", "resposta": "texto da resposta adequada à categoria"}]"""
+
+TRUNCATION_MARKER = "\n[...]\n"
+
+
+@dataclass
+class CompactEmail:
+    """Conteúdo do email já compactado para o prompt"""
+    text: str
+    tokens: int
+    original_tokens: int
+    truncated: bool = False
+
+
+@dataclass
+class BuiltPrompt:
+    """Prompt pronto com a estimativa local de tokens"""
+    text: str
+    tokens: int
+    content_tokens: int  # Conteúdo dos emails após a compactação
+    original_tokens: int  # Conteúdo dos emails antes da compactação
+    truncated: bool = False
+
+
+class PromptBuilder:
+    """Monta prompts compactos: sem citações/assinaturas e dentro do orçamento de tokens"""
+    
+    # Pré-corte barato antes das regex, com folga sobre ~4 caracteres por token
+    MAX_CHARS_PER_TOKEN = 8
+    
+    _token_pattern = re.compile(r'\w+|[^\w\s]')
+    _quoted_line_pattern = re.compile(r'^[ \t]*>.*(?:\n|$)', re.MULTILINE)
+    _reply_header_pattern = re.compile(
+        r'^[ \t]*(?:Em|On)\b[^\n]*(?:\n[^\n]*)?\b(?:escreveu|wrote)[ \t]*:[ \t]*$'
+        r'|^[ \t]*-{2,}[ \t]*(?:Mensagem original|Original Message)[ \t]*-{2,}'
+        r'|^[ \t]*(?:De|From):[^\n]*\n[ \t]*(?:Enviad[ao]|Sent|Data|Date):',
+        re.MULTILINE | re.IGNORECASE
+    )
+    _signature_delimiter_pattern = re.compile(r'^-- ?$', re.MULTILINE)
+    _mobile_signature_pattern = re.compile(
+        r'^[ \t]*(?:Enviado d[eo] meu|Sent from my)\b.*$', re.MULTILINE | re.IGNORECASE
+    )
+    _sign_off_pattern = re.compile(
+        r'^[ \t]*(?:atenciosamente|att\.?|abraços?|abs\.?|cordialmente|saudações|grat[oa]'
+        r'|best regards|kind regards|regards)[ \t]*[,.!]?[ \t]*$',
+        re.MULTILINE | re.IGNORECASE
+    )
+    _blank_lines_pattern = re.compile(r'\n[ \t]*(?:\n[ \t]*)+')
+    
+    # Uma assinatura raramente passa de poucas linhas após a despedida
+    SIGNATURE_MAX_LINES = 6
+    # Não remove citações/assinaturas se quase nada sobrar
+    MIN_REMAINING_CHARS = 20
+    # Passos de corte cabeça/cauda antes do corte simples por caracteres
+    MAX_TRUNCATE_PASSES = 8
+    
+    def __init__(self, token_budget: int = 1500, head_ratio: float = 0.75):
+        self._token_budget = max(50, token_budget)
+        self._head_ratio = min(max(head_ratio, 0.0), 1.0)
+    
+    def estimate_tokens(self, text: str) -> int:
+        """
+        Estimativa local de tokens: uma unidade por palavra ou pontuação,
+        mais uma a cada 6 caracteres em palavras longas (que o tokenizer
+        divide em subpalavras).
+        """
+        return sum(1 + len(piece) // 6 for piece in self._token_pattern.findall(text))
+    
+    def compact(self, email: Email) -> CompactEmail:
+        """Remove citações e assinaturas e trunca o conteúdo no orçamento de tokens"""
+        text = email.get_full_content()
+        original_tokens = self._quick_estimate(text)
+        
+        text, truncated = self._pre_truncate(text)
+        text = self._strip_quoted_replies(text)
+        text = self._strip_signature(text)
+        text = self._blank_lines_pattern.sub('\n\n', text).strip()
+        
+        tokens = self.estimate_tokens(text)
+        if tokens > self._token_budget:
+            text, tokens = self._truncate_head_tail(text, tokens)
+            truncated = True
+        
+        return CompactEmail(text=text, tokens=tokens, original_tokens=original_tokens, truncated=truncated)
+    
+    def build_single(self, email: Email) -> BuiltPrompt:
+        """Prompt para um email"""
+        compact = self.compact(email)
+        text = f"Analise o email abaixo e execute as tarefas.\n\n{INSTRUCTIONS}\n\nEmail:\n{compact.text}\n\n{SINGLE_FORMAT}\n\n{GUIDELINES}"
+        
+        return BuiltPrompt(
+            text=text,
+            tokens=self.estimate_tokens(text),
+            content_tokens=compact.tokens,
+            original_tokens=compact.original_tokens,
+            truncated=compact.truncated
+        )
+    
+    def build_batch(self, compacts: List[CompactEmail]) -> BuiltPrompt:
+        """Prompt único para vários emails, com as instruções uma única vez"""
+        emails_block = "\n\n".join(
+            f"--- Email {index} ---\n{compact.text}" for index, compact in enumerate(compacts)
+        )
+        text = (
+            f"Analise CADA um dos {len(compacts)} emails abaixo e, para cada um, execute as tarefas.\n\n{INSTRUCTIONS}\n\n"
+            f"{emails_block}\n\n{BATCH_FORMAT}\n\n{GUIDELINES}"
+        )
+        
+        return BuiltPrompt(
+            text=text,
+            tokens=self.estimate_tokens(text),
+            content_tokens=sum(compact.tokens for compact in compacts),
+            original_tokens=sum(compact.original_tokens for compact in compacts),
+            truncated=any(compact.truncated for compact in compacts)
+        )
+    
+    def _quick_estimate(self, text: str) -> int:
+        """Estimativa sem varrer textos enormes (que seriam truncados de qualquer forma)"""
+        if len(text) > self._token_budget * self.MAX_CHARS_PER_TOKEN:
+            return math.ceil(len(text) / 4)
+        return self.estimate_tokens(text)
+    
+    def _pre_truncate(self, text: str):
+        """Corte grosseiro por caracteres para limitar o custo das etapas seguintes"""
+        max_chars = self._token_budget * self.MAX_CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text, False
+        return self._cut(text, max_chars), True
+    
+    def _strip_quoted_replies(self, text: str) -> str:
+        """Remove o histórico citado: linhas com '>' e tudo após o cabeçalho de resposta"""
+        match = self._reply_header_pattern.search(text)
+        if match and len(text[:match.start()].strip()) >= self.MIN_REMAINING_CHARS:
+            text = text[:match.start()]
+        
+        without_quotes = self._quoted_line_pattern.sub('', text)
+        if len(without_quotes.strip()) >= self.MIN_REMAINING_CHARS:
+            text = without_quotes
+        
+        return text
+    
+    def _strip_signature(self, text: str) -> str:
+        """Remove a assinatura: delimitador '-- ', 'Enviado do meu...' e despedidas no fim"""
+        text = self._mobile_signature_pattern.sub('', text)
+        
+        match = self._signature_delimiter_pattern.search(text)
+        if match and len(text[:match.start()].strip()) >= self.MIN_REMAINING_CHARS:
+            text = text[:match.start()]
+        
+        stripped = text.rstrip()
+        for match in self._sign_off_pattern.finditer(stripped):
+            trailing_lines = stripped.count('\n', match.end())
+            if (
+                trailing_lines <= self.SIGNATURE_MAX_LINES
+                and len(stripped[:match.start()].strip()) >= self.MIN_REMAINING_CHARS
+            ):
+                return stripped[:match.start()]
+        
+        return text
+    
+    def _truncate_head_tail(self, text: str, tokens: int):
+        """
+        Mantém o início e o fim do texto até caber no orçamento. Cada passo
+        corta o texto original com um limite estritamente menor; se ainda não
+        couber após MAX_TRUNCATE_PASSES, corta por caracteres (cada caractere
+        rende no máximo um token).
+        """
+        source = text
+        max_chars = len(source)
+        for _ in range(self.MAX_TRUNCATE_PASSES):
+            max_chars = max(0, min(int(max_chars * self._token_budget / tokens * 0.95), max_chars - 1))
+            text = self._cut(source, max_chars)
+            tokens = self.estimate_tokens(text)
+            if tokens <= self._token_budget:
+                return text, tokens
+        
+        text = source[:self._token_budget]
+        return text, self.estimate_tokens(text)
+    
+    def _cut(self, text: str, max_chars: int) -> str:
+        """Corta o meio do texto em limites de palavra, preservando início e fim"""
+        head_chars = int(max_chars * self._head_ratio)
+        tail_chars = max_chars - head_chars
+        
+        head = text[:head_chars]
+        if ' ' in head:
+            head = head[:head.rfind(' ')]
+        
+        tail = text[len(text) - tail_chars:] if tail_chars > 0 else ''
+        if ' ' in tail:
+            tail = tail[tail.find(' ') + 1:]
+        
+        return head.rstrip() + TRUNCATION_MARKER + tail.lstrip()
@@ -0,0 +1,264 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from ...domain.entities.email import AnalysisStreamEvent, EmailAnalysisResult, EmailCategory, StreamEventType
+
+
+_CATEGORY_VALUES = ["Produtivo", "Improdutivo"]
+
+# Schemas de saída estruturada (subconjunto OpenAPI aceito pelo Gemini)
+ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "categoria": {"type": "string", "enum": _CATEGORY_VALUES},
+        "resposta": {"type": "string"},
+    },
+    "required": ["categoria", "resposta"],
+}
+
+BATCH_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "categoria": {"type": "string", "enum": _CATEGORY_VALUES},
+            "resposta": {"type": "string"},
+        },
+        "required": ["id", "categoria", "resposta"],
+    },
+}
+
+# Prompt curto de reparo: reaproveita a resposta em vez de reanalisar o email
+REPAIR_PROMPT = """A resposta abaixo deveria ser {expected}, mas não pôde ser interpretada.
+Corrija-a e devolva APENAS o JSON válido, sem texto adicional, mantendo o conteúdo.
+
+Resposta:
+{response}"""
+
+REPAIR_EXPECTED = {
+    "object": 'um objeto JSON {"categoria": "Produtivo" ou "Improdutivo", "resposta": "texto"}',
+    "array": 'um array JSON [{"id": número, "categoria": "Produtivo" ou "Improdutivo", "resposta": "texto"}]',
+}
+
+
+class ResponseParser:
+    """Extrai e valida o JSON das respostas do modelo, contando falhas de parse"""
+    
+    # Limite do trecho da resposta reenviado no prompt de reparo
+    REPAIR_MAX_CHARS = 4000
+    
+    _trailing_comma_pattern = re.compile(r',\s*([}\]])')
+    
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self.responses = 0
+        self.parse_failures = 0
+        self.repairs = 0
+        self.repairs_succeeded = 0
+    
+    def extract_json(self, text: str, kind: str = "object") -> Optional[Any]:
+        """
+        Encontra o primeiro valor JSON válido do tipo pedido ("object" ou
+        "array") no texto, ignorando cercas de markdown e texto ao redor.
+        Cada candidato é decodificado com raw_decode a partir do seu início,
+        sem recortar a string.
+        """
+        value = self._scan(text, kind)
+        
+        if value is None and ',' in text:
+            # Vírgulas sobrando antes de } ou ] são o erro mais comum
+            value = self._scan(self._trailing_comma_pattern.sub(r'\1', text), kind)
+        
+        return value
+    
+    def parse_single(self, text: str, repair: bool = False) -> Optional[EmailAnalysisResult]:
+        """Converte a resposta de um email; None se inválida"""
+        result = self._to_result(self.extract_json(text, "object"))
+        self._record(result is not None, repair)
+        return result
+    
+    def parse_batch(
+        self,
+        text: str,
+        expected: int,
+        repair: bool = False
+    ) -> Optional[Dict[int, EmailAnalysisResult]]:
+        """Converte a resposta em lote (itens inválidos são ignorados); None se não houver array"""
+        items = self.extract_json(text, "array")
+        self._record(items is not None, repair)
+        
+        if items is None:
+            return None
+        
+        parsed: Dict[int, EmailAnalysisResult] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            
+            index = item.get("id")
+            result = self._to_result(item)
+            if isinstance(index, int) and not isinstance(index, bool) and 0 <= index < expected and result:
+                parsed[index] = result
+        
+        return parsed
+    
+    def repair_prompt(self, text: str, kind: str = "object") -> str:
+        """Prompt curto pedindo ao modelo que corrija a própria resposta"""
+        self.repairs += 1
+        return REPAIR_PROMPT.format(expected=REPAIR_EXPECTED[kind], response=text[:self.REPAIR_MAX_CHARS])
+    
+    def stats(self) -> Dict[str, object]:
+        """Contadores e taxas de falha de parse e de reparo"""
+        return {
+            "responses": self.responses,
+            "parse_failures": self.parse_failures,
+            "parse_failure_rate": round(self.parse_failures / self.responses, 4) if self.responses else 0.0,
+            "repairs": self.repairs,
+            "repairs_succeeded": self.repairs_succeeded,
+            "repair_success_rate": round(self.repairs_succeeded / self.repairs, 4) if self.repairs else 0.0
+        }
+    
+    def _record(self, succeeded: bool, repair: bool) -> None:
+        """Respostas de reparo contam apenas para a taxa de reparo"""
+        if repair:
+            self.repairs_succeeded += succeeded
+        else:
+            self.responses += 1
+            self.parse_failures += not succeeded
+    
+    def _scan(self, text: str, kind: str) -> Optional[Any]:
+        opener, expected_type = ('{', dict) if kind == "object" else ('[', list)
+        position = text.find(opener)
+        
+        while position != -1:
+            try:
+                value, _ = self._decoder.raw_decode(text, position)
+                if isinstance(value, expected_type):
+                    return value
+            except json.JSONDecodeError:
+                pass
+            position = text.find(opener, position + 1)
+        
+        return None
+    
+    def _to_result(self, value: Any) -> Optional[EmailAnalysisResult]:
+        """Valida categoria e resposta"""
+        if not isinstance(value, dict):
+            return None
+        
+        category = value.get("categoria")
+        response = value.get("resposta")
+        
+        if not isinstance(category, str) or not isinstance(response, str) or not response.strip():
+            return None
+        
+        category = parse_category(category)
+        if category is None:
+            return None
+        
+        return EmailAnalysisResult(category=category, response=response)
+
+
+def parse_category(value: str) -> Optional[EmailCategory]:
+    """Converte o valor de "categoria" (aceita também os nomes em inglês)"""
+    value = value.strip().lower()
+    if value in ("produtivo", "productive"):
+        return EmailCategory.PRODUCTIVE
+    if value in ("improdutivo", "unproductive"):
+        return EmailCategory.UNPRODUCTIVE
+    return None
+
+
+class StreamingResponseParser:
+    """
+    Lê o objeto {"categoria": ..., "resposta": ...} à medida que os trechos
+    chegam: emite a categoria assim que o valor fecha e a resposta em
+    pedaços já decodificados (escapes incompletos aguardam o próximo trecho).
+    O texto acumulado é validado ao final pelo ResponseParser.
+    """
+    
+    _category_pattern = re.compile(r'"categoria"\s*:\s*"([^"\\]*)"')
+    _reply_start_pattern = re.compile(r'"resposta"\s*:\s*"')
+    # Primeira metade de um par substituto (\ud800-\udbff), que precisa da segunda para decodificar
+    _high_surrogate_prefixes = ("d8", "d9", "da", "db")
+    
+    def __init__(self):
+        self._decoder = json.JSONDecoder(strict=False)
+        self._buffer = ""
+        self._category_sent = False
+        self._reply_position: Optional[int] = None
+        self._reply_done = False
+    
+    @property
+    def text(self) -> str:
+        """Resposta completa recebida até agora"""
+        return self._buffer
+    
+    def feed(self, chunk: str) -> List[AnalysisStreamEvent]:
+        """Processa um trecho e retorna os eventos que ele completou"""
+        self._buffer += chunk
+        events: List[AnalysisStreamEvent] = []
+        
+        if self._reply_done:
+            return events
+        
+        if not self._category_sent:
+            match = self._category_pattern.search(self._buffer)
+            category = parse_category(match.group(1)) if match else None
+            if category is not None:
+                self._category_sent = True
+                events.append(AnalysisStreamEvent(StreamEventType.CATEGORY, text=category.value))
+        
+        if self._reply_position is None:
+            match = self._reply_start_pattern.search(self._buffer)
+            if match:
+                self._reply_position = match.end()
+        
+        if self._reply_position is not None:
+            delta = self._decode_reply()
+            if delta:
+                events.append(AnalysisStreamEvent(StreamEventType.DELTA, text=delta))
+        
+        return events
+    
+    def _decode_reply(self) -> str:
+        """Decodifica o trecho da resposta disponível até o último escape completo"""
+        text, start = self._buffer, self._reply_position
+        position, length = start, len(text)
+        
+        while position < length:
+            char = text[position]
+            
+            if char == '"':
+                self._reply_done = True
+                break
+            
+            if char != '\\':
+                position += 1
+                continue
+            
+            if position + 1 >= length:
+                break
+            
+            end = position + 2
+            if text[position + 1] == 'u':
+                end = position + 6
+                if text[position + 2:position + 4].lower() in self._high_surrogate_prefixes:
+                    end += 6
+            
+            if end > length:
+                break
+            position = end
+        
+        self._reply_position = position
+        segment = text[start:position]
+        
+        if not segment:
+            return ""
+        
+        try:
+            return self._decoder.decode(f'"{segment}"')
+        except json.JSONDecodeError:
+            return segment
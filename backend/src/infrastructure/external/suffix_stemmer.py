@@ -0,0 +1,61 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+class SuffixStemmer:
+    """Stemmer por regras de sufixo com trie de sufixos invertidos e memo LRU"""
+    
+    def __init__(self, suffix_rules: List[Tuple[str, str]], memo_size: int = 50000):
+        # Cada nó: {caractere: nó}; a regra que termina no nó fica na chave None
+        # como (prioridade, sufixo, substituição, comprimento mínimo da palavra)
+        self._trie: Dict = {}
+        
+        for priority, (suffix, replacement) in enumerate(suffix_rules):
+            node = self._trie
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            
+            # Regras duplicadas: vale a primeira, como na varredura linear
+            if None not in node:
+                node[None] = (priority, suffix, replacement, len(suffix) + 2)
+        
+        self._memoized_stem = lru_cache(maxsize=memo_size)(self._stem)
+    
+    def stem(self, word: str) -> str:
+        """Retorna o radical da palavra (memoizado)"""
+        return self._memoized_stem(word)
+    
+    def stats(self) -> Dict[str, float]:
+        """Retorna as estatísticas do memo"""
+        info = self._memoized_stem.cache_info()
+        total = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hit_rate": info.hits / total if total else 0.0
+        }
+    
+    def _stem(self, word: str) -> str:
+        """
+        Aplica a regra de menor prioridade (ordem da lista original) entre os
+        sufixos que casam, exigindo len(palavra) > len(sufixo) + 2
+        """
+        length = len(word)
+        node = self._trie
+        best: Optional[Tuple[int, str, str, int]] = None
+        
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                break
+            
+            rule = node.get(None)
+            if rule is not None and length > rule[3] and (best is None or rule[0] < best[0]):
+                best = rule
+        
+        if best is None:
+            return word
+        
+        return word[:-len(best[1])] + best[2]
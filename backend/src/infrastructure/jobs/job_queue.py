@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ...domain.entities.job import Job, JobRequest
+from ...domain.exceptions import JobQueueFullError
+from .job_store import SQLiteJobStore
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Fila de jobs com um pool local de workers no event loop da aplicação.
+    A fila é limitada (max_pending entre na fila e em processamento): quando
+    cheia, submit recusa o job em vez de acumular memória e latência. A cada
+    `recover_interval` segundos, jobs cuja concessão expirou (processo que
+    morreu no meio) voltam para a fila.
+    """
+    
+    def __init__(
+        self,
+        store: SQLiteJobStore,
+        handler: Callable[[JobRequest], Awaitable[dict]],
+        workers: int = 2,
+        max_pending: int = 100,
+        timeout_seconds: float = 300.0,
+        recover_interval: float = 60.0
+    ):
+        self._store = store
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._max_pending = max(1, max_pending)
+        self._timeout_seconds = timeout_seconds
+        self._recover_interval = recover_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs com concessão deste processo, liberados em stop
+        self._running: Set[str] = set()
+        self._pending = 0
+        self._completed = 0
+        self._run_seconds = 0.0
+        self.rejected = 0
+    
+    async def start(self) -> None:
+        """Inicia os workers e retoma os jobs pendentes no banco (idempotente)"""
+        if self._queue is not None:
+            return
+        
+        self._queue = asyncio.Queue()
+        self._enqueue(await asyncio.to_thread(self._store.recover))
+        
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        self._tasks.append(asyncio.create_task(self._recover_expired()))
+    
+    async def stop(self) -> None:
+        """
+        Interrompe os workers. Os jobs em andamento têm a concessão liberada e
+        voltam à fila (sem contar a tentativa); como os que ainda esperavam,
+        são retomados na próxima inicialização.
+        """
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending = 0
+        
+        if interrupted:
+            try:
+                await asyncio.to_thread(self._store.release, interrupted)
+            except Exception:
+                logger.exception("Não foi possível liberar os jobs interrompidos %s", interrupted)
+    
+    async def submit(self, request: JobRequest) -> Job:
+        """Persiste e enfileira o job; JobQueueFullError se a fila estiver cheia"""
+        await self.start()
+        
+        if self._pending >= self._max_pending:
+            self.rejected += 1
+            raise JobQueueFullError(self._pending, retry_after=self._retry_after())
+        
+        self._pending += 1
+        try:
+            job = await asyncio.to_thread(self._store.create, request)
+        except Exception:
+            self._pending -= 1
+            raise
+        
+        self._queue.put_nowait(job.id)
+        return job
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Estado atual do job"""
+        return await asyncio.to_thread(self._store.get, job_id)
+    
+    def stats(self) -> Dict[str, object]:
+        """Ocupação da fila e contadores persistidos"""
+        stats: Dict[str, object] = {
+            "pending": self._pending,
+            "max_pending": self._max_pending,
+            "workers": self._workers,
+            "rejected": self.rejected
+        }
+        stats.update(self._store.stats())
+        return stats
+    
+    def close(self) -> None:
+        """Fecha o armazenamento dos jobs"""
+        self._store.close()
+    
+    def _enqueue(self, job_ids: List[str]) -> None:
+        for job_id in job_ids:
+            self._pending += 1
+            self._queue.put_nowait(job_id)
+    
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Falha do armazenamento (ex.: "database is locked"): o worker continua atendendo a fila
+                logger.exception("Erro ao executar o job %s", job_id)
+                await self._mark_failed(job_id, e)
+            finally:
+                self._pending -= 1
+                self._queue.task_done()
+    
+    async def _mark_failed(self, job_id: str, error: Exception) -> None:
+        """Tenta gravar a falha; se nem isso for possível, o job volta à fila quando a concessão expirar"""
+        try:
+            await asyncio.to_thread(self._store.fail, job_id, f"Erro interno da fila de jobs: {error}")
+        except Exception:
+            logger.exception("Não foi possível registrar a falha do job %s", job_id)
+    
+    async def _recover_expired(self) -> None:
+        """Devolve periodicamente à fila os jobs abandonados por processos que morreram"""
+        while True:
+            await asyncio.sleep(self._recover_interval)
+            try:
+                self._enqueue(await asyncio.to_thread(self._store.requeue_expired))
+            except Exception:
+                logger.exception("Erro ao recuperar jobs expirados")
+    
+    async def _run(self, job_id: str) -> None:
+        """Executa um job e grava o resultado (ou a falha) com os tempos"""
+        request = await asyncio.to_thread(self._store.claim, job_id)
+        if request is None:
+            return
+        
+        self._running.add(job_id)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._handler(request), self._timeout_seconds)
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(
+                self._store.fail, job_id, f"Tempo limite de {self._timeout_seconds:.0f}s excedido"
+            )
+        except Exception as e:
+            await asyncio.to_thread(self._store.fail, job_id, str(e))
+        else:
+            await asyncio.to_thread(self._store.complete, job_id, result)
+        finally:
+            self._completed += 1
+            self._run_seconds += time.perf_counter() - start
+            self._running.discard(job_id)
+    
+    def _retry_after(self) -> float:
+        """Estimativa de quando um worker libera uma vaga: tempo médio por job dividido pelos workers"""
+        if not self._completed:
+            return 1.0
+        return max(1.0, self._run_seconds / self._completed / self._workers)
@@ -0,0 +1,240 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from ...domain.entities.file import UploadedFile
+from ...domain.entities.job import Job, JobRequest, JobStatus
+
+
+class SQLiteJobStore:
+    """
+    Jobs persistidos em SQLite (entrada, estado, resultado e tempos), de modo
+    que sobrevivam a reinicializações. Os arquivos ficam em uma tabela à parte
+    e são apagados quando o job termina. Um job em processamento tem uma
+    concessão (lease) de `lease_seconds`: só depois dela expirar outro
+    processo que compartilha o banco pode devolvê-lo à fila.
+    """
+    
+    def __init__(self, db_path: str, result_ttl_seconds: float = 24 * 3600, lease_seconds: float = 360.0):
+        self._result_ttl_seconds = result_ttl_seconds
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                emails TEXT NOT NULL,
+                items INTEGER NOT NULL,
+                input_bytes INTEGER NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT,
+                lease_until REAL
+            )
+            """
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+        if "lease_until" not in columns:
+            # Bancos criados antes da concessão dos jobs em processamento
+            self._connection.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_files (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                content_type TEXT,
+                content BLOB NOT NULL,
+                PRIMARY KEY (job_id, position)
+            )
+            """
+        )
+        self._connection.commit()
+    
+    def create(self, request: JobRequest) -> Job:
+        """Grava um novo job na fila com a entrada completa"""
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            created_at=time.time(),
+            items=len(request.emails) + len(request.files),
+            input_bytes=request.size()
+        )
+        
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO jobs (id, status, emails, items, input_bytes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (job.id, job.status.value, json.dumps(request.emails, ensure_ascii=False),
+                 job.items, job.input_bytes, job.created_at)
+            )
+            for position, file in enumerate(request.files):
+                # memoryview evita copiar arquivos mapeados (mmap) para o heap
+                with memoryview(file.content) as content:
+                    self._connection.execute(
+                        "INSERT INTO job_files (job_id, position, filename, content_type, content) VALUES (?, ?, ?, ?, ?)",
+                        (job.id, position, file.filename, file.content_type, content)
+                    )
+            self._connection.commit()
+        
+        return job
+    
+    def claim(self, job_id: str) -> Optional[JobRequest]:
+        """Marca o job como em processamento e devolve a entrada (None se outro worker já o pegou)"""
+        with self._lock:
+            now = time.time()
+            claimed = self._connection.execute(
+                """
+                UPDATE jobs SET status = ?, started_at = ?, lease_until = ?, attempts = attempts + 1
+                WHERE id = ? AND status = ?
+                """,
+                (JobStatus.RUNNING.value, now, now + self._lease_seconds, job_id, JobStatus.QUEUED.value)
+            ).rowcount
+            self._connection.commit()
+            
+            if not claimed:
+                return None
+            
+            emails = self._connection.execute("SELECT emails FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            files = self._connection.execute(
+                "SELECT filename, content_type, content FROM job_files WHERE job_id = ? ORDER BY position",
+                (job_id,)
+            ).fetchall()
+        
+        return JobRequest(
+            emails=[(body, subject) for body, subject in json.loads(emails)],
+            files=[UploadedFile(filename=name, content_type=content_type, content=content)
+                   for name, content_type, content in files]
+        )
+    
+    def complete(self, job_id: str, result: dict) -> None:
+        """Grava o resultado do job"""
+        self._finish(job_id, JobStatus.DONE, result=json.dumps(result, ensure_ascii=False))
+    
+    def fail(self, job_id: str, error: str) -> None:
+        """Grava a falha do job"""
+        self._finish(job_id, JobStatus.FAILED, error=error)
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retorna o job ou None se não existir (ou já tiver expirado)"""
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT id, status, created_at, items, input_bytes, attempts, started_at, finished_at, result, error
+                FROM jobs WHERE id = ?
+                """,
+                (job_id,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        return Job(
+            id=row[0],
+            status=JobStatus(row[1]),
+            created_at=row[2],
+            items=row[3],
+            input_bytes=row[4],
+            attempts=row[5],
+            started_at=row[6],
+            finished_at=row[7],
+            result=json.loads(row[8]) if row[8] is not None else None,
+            error=row[9]
+        )
+    
+    def recover(self) -> List[str]:
+        """
+        Devolve à fila os jobs interrompidos (concessão expirada) e retorna
+        os ids pendentes, do mais antigo ao mais novo. Jobs que outro processo
+        ainda executa (concessão válida) não são repetidos.
+        """
+        with self._lock:
+            self._requeue_expired()
+            rows = self._connection.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.QUEUED.value,)
+            ).fetchall()
+        
+        return [row[0] for row in rows]
+    
+    def release(self, job_ids: List[str]) -> None:
+        """Devolve à fila jobs interrompidos por um desligamento limpo, sem contar a tentativa"""
+        with self._lock:
+            self._connection.executemany(
+                """
+                UPDATE jobs SET status = ?, started_at = NULL, lease_until = NULL, attempts = MAX(attempts - 1, 0)
+                WHERE id = ? AND status = ?
+                """,
+                [(JobStatus.QUEUED.value, job_id, JobStatus.RUNNING.value) for job_id in job_ids]
+            )
+            self._connection.commit()
+    
+    def requeue_expired(self) -> List[str]:
+        """Devolve à fila os jobs com a concessão expirada e retorna os seus ids"""
+        with self._lock:
+            return self._requeue_expired()
+    
+    def _requeue_expired(self) -> List[str]:
+        """Chamado com o lock: processo que morreu (ou travou) no meio do job"""
+        rows = self._connection.execute(
+            "SELECT id FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?) ORDER BY created_at",
+            (JobStatus.RUNNING.value, time.time())
+        ).fetchall()
+        # Só os ids devolvidos por esta chamada (outro processo pode ter devolvido o mesmo job)
+        job_ids = [
+            job_id for (job_id,) in rows
+            if self._connection.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, lease_until = NULL WHERE id = ? AND status = ?",
+                (JobStatus.QUEUED.value, job_id, JobStatus.RUNNING.value)
+            ).rowcount
+        ]
+        self._connection.commit()
+        return job_ids
+    
+    def stats(self) -> Dict[str, object]:
+        """Jobs por estado e tempos médios de fila e de processamento dos concluídos"""
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            queue_ms, run_ms = self._connection.execute(
+                """
+                SELECT AVG(started_at - created_at) * 1000, AVG(finished_at - started_at) * 1000
+                FROM jobs WHERE status = ?
+                """,
+                (JobStatus.DONE.value,)
+            ).fetchone()
+        
+        stats: Dict[str, object] = {status.value: counts.get(status.value, 0) for status in JobStatus}
+        stats["avg_queue_ms"] = round(queue_ms or 0.0, 1)
+        stats["avg_run_ms"] = round(run_ms or 0.0, 1)
+        return stats
+    
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._connection.close()
+    
+    def _finish(self, job_id: str, status: JobStatus, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Encerra o job, libera os arquivos e remove jobs terminados há mais que o TTL"""
+        now = time.time()
+        
+        with self._lock:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, lease_until = NULL WHERE id = ?",
+                (status.value, now, result, error, job_id)
+            )
+            self._connection.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+            self._connection.execute(
+                "DELETE FROM jobs WHERE finished_at < ?", (now - self._result_ttl_seconds,)
+            )
+            self._connection.commit()
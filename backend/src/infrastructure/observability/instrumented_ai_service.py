@@ -0,0 +1,79 @@
+import time
+from typing import AsyncIterator, List, Tuple
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import AnalysisStreamEvent, Email, EmailAnalysisResult, ProcessedText, StreamEventType
+from ...domain.exceptions import AIServiceError
+from .metrics import PipelineMetrics
+
+
+class InstrumentedAIService(AIServiceInterface):
+    """
+    Decorator que mede a duração de cada chamada ao serviço de IA e conta os
+    resultados por código de erro. Envolve o serviço base, antes de cache e
+    resiliência, para medir o upstream e não os acertos de cache.
+    """
+    
+    OK = "ok"
+    
+    def __init__(self, ai_service: AIServiceInterface, metrics: PipelineMetrics):
+        self._ai_service = ai_service
+        self._metrics = metrics
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        start = time.perf_counter()
+        try:
+            result = await self._ai_service.analyze_email(email, processed_text)
+        except AIServiceError as e:
+            self._record_codes("analise", start, [e.code])
+            raise
+        
+        self._record("analise", start, [result])
+        return result
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        start = time.perf_counter()
+        try:
+            results = await self._ai_service.analyze_batch(items)
+        except AIServiceError as e:
+            self._record_codes("lote", start, [e.code] * len(items))
+            raise
+        
+        self._record("lote", start, results)
+        return results
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        start = time.perf_counter()
+        try:
+            async for event in self._ai_service.analyze_email_stream(email, processed_text):
+                if event.type is StreamEventType.RESULT:
+                    self._record("stream", start, [event.result])
+                yield event
+        except AIServiceError as e:
+            self._record_codes("stream", start, [e.code])
+            raise
+    
+    def _record(self, operation: str, start: float, results: List[EmailAnalysisResult]) -> None:
+        """Registra a chamada e os tokens estimados de cada email que chegou ao modelo"""
+        self._record_codes(operation, start, [self._code(result) for result in results])
+        for result in results:
+            if result.prompt_tokens is not None:
+                self._metrics.prompt_tokens.observe(result.prompt_tokens, operation)
+    
+    def _record_codes(self, operation: str, start: float, codes: List[str]) -> None:
+        """Uma observação de duração por chamada e uma contagem por resultado"""
+        self._metrics.ai_duration.observe(time.perf_counter() - start, operation)
+        for code in codes:
+            self._metrics.ai_results.inc(operation, code)
+    
+    def _code(self, result: EmailAnalysisResult) -> str:
+        if result.error_code:
+            return result.error_code
+        return "erro" if result.error else self.OK
@@ -0,0 +1,248 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Limites dos buckets (segundos) para latências: de 1ms a 60s
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Limites para tamanhos de arquivo (bytes): de 1KB a 50MB
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 50 * 1024 ** 2)
+# Limites para comprimento de texto (caracteres)
+LENGTH_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+# Tokens estimados do prompt atribuídos a cada email
+TOKEN_BUCKETS = (50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotônico com labels"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Incrementa a série dos labels informados (na ordem de labelnames)"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def value(self, *labels: str) -> float:
+        """Valor atual da série"""
+        return self._values.get(labels, 0.0)
+    
+    def render(self) -> List[str]:
+        """Linhas no formato de texto do Prometheus"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Histograma com buckets fixos: observe faz uma busca binária e incrementa
+    um bucket; os valores cumulativos só são calculados na exportação.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._bounds = tuple(sorted(buckets))
+        # Por conjunto de labels: [contagem por bucket (+Inf no fim), soma]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels: str) -> None:
+        """Registra uma observação na série dos labels informados"""
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self._bounds) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+    
+    def time(self, *labels: str) -> "_HistogramTimer":
+        """Context manager que mede a duração do bloco em segundos"""
+        return _HistogramTimer(self, labels)
+    
+    def count(self, *labels: str) -> int:
+        """Número de observações da série"""
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+    
+    def render(self) -> List[str]:
+        """Linhas no formato de texto do Prometheus (buckets cumulativos, soma e contagem)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._series.items())
+        
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self._bounds + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class _HistogramTimer:
+    """Cronômetro de Histogram.time (mais barato que um @contextmanager)"""
+    
+    __slots__ = ("_histogram", "_labels", "_start")
+    
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self._histogram = histogram
+        self._labels = labels
+    
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+    
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, *self._labels)
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas no formato de texto do Prometheus. Além dos
+    contadores e histogramas registrados, exporta como gauges os valores
+    numéricos dos coletores (ex.: DependencyContainer.stats), lidos só
+    quando /metrics é consultado.
+    """
+    
+    def __init__(self, prefix: str = "email_processor"):
+        self._prefix = prefix
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], Dict[str, object]]] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Cria e registra um contador"""
+        counter = Counter(f"{self._prefix}_{name}", documentation, labelnames)
+        self._metrics.append(counter)
+        return counter
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Cria e registra um histograma"""
+        histogram = Histogram(f"{self._prefix}_{name}", documentation, labelnames, buckets)
+        self._metrics.append(histogram)
+        return histogram
+    
+    def add_collector(self, collector: Callable[[], Dict[str, object]]) -> None:
+        """Registra uma função cujo dicionário (aninhado) vira gauges a cada exportação"""
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        
+        for collector in self._collectors:
+            for name, value in self._flatten(collector()):
+                lines.append(f"# TYPE {self._prefix}_{name} gauge")
+                lines.append(f"{self._prefix}_{name} {_format_value(value)}")
+        
+        return "\n".join(lines) + "\n"
+    
+    @classmethod
+    def _flatten(cls, stats: Dict[str, object], prefix: str = "") -> Iterator[Tuple[str, float]]:
+        """Achata dicionários aninhados em nomes com '_', ignorando valores não numéricos"""
+        for key, value in stats.items():
+            name = f"{prefix}{key}".replace(".", "_").replace("-", "_")
+            if isinstance(value, dict):
+                yield from cls._flatten(value, f"{name}_")
+            elif isinstance(value, (bool, int, float)):
+                yield name, float(value)
+
+
+class PipelineMetrics:
+    """Métricas do pipeline: requisições, etapas, tamanhos de entrada e chamadas à IA"""
+    
+    # Extensões aceitas; outras entram como "outro" para não criar séries sem limite
+    FILE_EXTENSIONS = frozenset({"pdf", "eml", "txt", "text"})
+    
+    # Etapas do processamento de um email
+    STAGE_UPLOAD = "leitura_upload"
+    STAGE_EXTRACTION = "extracao"
+    STAGE_PREPROCESS = "preprocessamento"
+    STAGE_AI = "ia"
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.requests = self.registry.counter(
+            "http_requests_total", "Requisições por método, rota e status", ("method", "path", "status")
+        )
+        self.request_duration = self.registry.histogram(
+            "http_request_duration_seconds", "Duração das requisições por rota", ("method", "path")
+        )
+        self.stage_duration = self.registry.histogram(
+            "stage_duration_seconds", "Duração de cada etapa do pipeline", ("stage",)
+        )
+        self.file_size = self.registry.histogram(
+            "file_size_bytes", "Tamanho dos arquivos recebidos", ("extension",), SIZE_BUCKETS
+        )
+        self.text_length = self.registry.histogram(
+            "text_length_chars", "Comprimento do texto extraído, antes do pré-processamento", (), LENGTH_BUCKETS
+        )
+        self.ai_duration = self.registry.histogram(
+            "ai_call_duration_seconds", "Duração das chamadas ao serviço de IA", ("operation",)
+        )
+        self.prompt_tokens = self.registry.histogram(
+            "ai_prompt_tokens", "Tokens estimados do prompt por email analisado pelo modelo", ("operation",), TOKEN_BUCKETS
+        )
+        self.ai_results = self.registry.counter(
+            "ai_results_total", "Resultados da IA por código de erro (ok quando sem erro)", ("operation", "code")
+        )
+    
+    def stage(self, stage: str):
+        """Context manager que mede a duração de uma etapa"""
+        return self.stage_duration.time(stage)
+    
+    def observe_file(self, filename: str, size: int) -> None:
+        """Registra o tamanho de um arquivo recebido, por extensão"""
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        self.file_size.observe(size, extension if extension in self.FILE_EXTENSIONS else "outro")
+    
+    def observe_text(self, length: int) -> None:
+        """Registra o comprimento do texto de um email"""
+        self.text_length.observe(length)
+    
+    def render(self) -> str:
+        """Exporta as métricas do pipeline e dos coletores registrados"""
+        return self.registry.render()
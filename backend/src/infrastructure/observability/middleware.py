@@ -0,0 +1,106 @@
+import random
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import PipelineMetrics
+from .profiler import ProfileStore, ProfilingAuthorizer, SamplingProfiler
+
+
+class MetricsMiddleware:
+    """
+    Conta as requisições por método, rota e status e mede a duração (ASGI
+    puro, sem envolver a resposta). Usa o template da rota (/jobs/{job_id})
+    para que ids não criem uma série por requisição.
+    """
+    
+    # Requisições que não chegaram a uma rota (404, recusadas antes do roteamento)
+    UNMATCHED_PATH = "sem_rota"
+    
+    def __init__(self, app: ASGIApp, metrics: PipelineMetrics):
+        self.app = app
+        self.metrics = metrics
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # O roteador grava a rota encontrada no próprio scope
+            route = scope.get("route")
+            path = getattr(route, "path", None) or self.UNMATCHED_PATH
+            method = scope["method"]
+            self.metrics.requests.inc(method, path, str(status_code))
+            self.metrics.request_duration.observe(time.perf_counter() - start, method, path)
+
+
+class ProfilingMiddleware:
+    """
+    Executa requisições sob o profiler por amostragem (ASGI puro). Perfila
+    quando pedido por um header assinado (ou ?profile=1 em modo debug),
+    devolvendo o id no header X-Profile-Id, e também uma fração
+    `sample_rate` das demais, guardando só as mais lentas.
+    """
+    
+    PROFILE_ID_HEADER = b"x-profile-id"
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        profiler: SamplingProfiler,
+        store: ProfileStore,
+        authorize: ProfilingAuthorizer,
+        sample_rate: float = 0.0,
+        exempt_prefix: str = "/debug/profiles",
+        rng: Optional[random.Random] = None
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.store = store
+        self.authorize = authorize
+        self.sample_rate = sample_rate
+        self.exempt_prefix = exempt_prefix
+        self.rng = rng or random.Random()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # A consulta dos perfis não gera perfis
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefix):
+            await self.app(scope, receive, send)
+            return
+        
+        requested = self.authorize(scope)
+        if not requested and not (self.sample_rate > 0 and self.rng.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+        
+        profile = self.profiler.start(f"{scope['method']} {scope['path']}")
+        
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [
+                    (self.PROFILE_ID_HEADER, profile.id.encode("latin-1"))
+                ]
+            await send(message)
+        
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id if requested else send)
+        finally:
+            self.profiler.stop(profile, time.perf_counter() - start)
+            if requested:
+                self.store.add_requested(profile)
+            else:
+                self.store.offer_sampled(profile)
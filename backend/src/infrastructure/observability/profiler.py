@@ -0,0 +1,303 @@
+import asyncio
+import functools
+import hashlib
+import heapq
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+# Perfil da requisição em andamento (propagado para tasks filhas e asyncio.to_thread)
+_current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+
+def current_profile() -> Optional["Profile"]:
+    """Perfil ativo no contexto atual (None fora de uma requisição perfilada)"""
+    return _current_profile.get()
+
+
+def profiled(func: F) -> F:
+    """
+    Marca uma etapa síncrona do pipeline: com um perfil ativo, a thread que a
+    executa (event loop ou executor) é amostrada enquanto ela roda, mesmo
+    fora da task da requisição. Sem perfil ativo, o custo é uma leitura de
+    ContextVar.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        
+        thread_id = threading.get_ident()
+        profile.track_thread(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.untrack_thread(thread_id)
+    
+    return wrapper
+
+
+class Profile:
+    """
+    Amostras de uma requisição, agregadas no formato "folded" (uma pilha por
+    linha, quadros separados por ';' e a contagem no fim), aceito por
+    flamegraph.pl, speedscope e inferno.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread_id: int,
+        task: Optional[asyncio.Task] = None
+    ):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self._loop = loop
+        self._loop_thread_id = loop_thread_id
+        self._task = task
+        self._context_token = None
+        # Atualizados pelas threads do executor e pela thread do profiler
+        self._lock = threading.Lock()
+        self._threads: Counter = Counter()
+        self._stacks: Counter = Counter()
+    
+    def track_thread(self, thread_id: int) -> None:
+        """Passa a amostrar uma thread enquanto ela executa uma etapa desta requisição"""
+        with self._lock:
+            self._threads[thread_id] += 1
+    
+    def untrack_thread(self, thread_id: int) -> None:
+        """Deixa de amostrar a thread quando a etapa síncrona termina"""
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+    
+    def sample(self, frames: Dict[int, object], max_depth: int) -> None:
+        """Registra as pilhas das threads que estão trabalhando para esta requisição"""
+        with self._lock:
+            thread_ids = set(self._threads)
+        
+        # No event loop, fora das etapas marcadas, só conta se a task em execução é desta requisição
+        if self._loop_thread_id not in thread_ids and self._owns(asyncio.current_task(self._loop)):
+            thread_ids.add(self._loop_thread_id)
+        
+        for thread_id in thread_ids:
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self._record(frame, max_depth)
+    
+    def folded(self) -> str:
+        """Perfil no formato de pilhas colapsadas (flamegraph)"""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+    
+    def summary(self) -> Dict[str, object]:
+        """Identificação e duração do perfil, sem as pilhas"""
+        return {
+            "id": self.id,
+            "requisicao": self.name,
+            "inicio": self.started_at,
+            "duracao_ms": round(self.duration * 1000, 1),
+            "amostras": self.samples
+        }
+    
+    def _owns(self, task: Optional[asyncio.Task]) -> bool:
+        if task is None:
+            return False
+        
+        if task is self._task:
+            return True
+        
+        # Tasks filhas (ex.: corpo de StreamingResponse) herdam o contexto da requisição (Python 3.12+)
+        context = task.get_context() if hasattr(task, "get_context") else None
+        return context is not None and context.get(_current_profile) is self
+    
+    def _record(self, frame, max_depth: int) -> None:
+        stack = []
+        while frame is not None and len(stack) < max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        
+        with self._lock:
+            self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem: uma thread daemon lê sys._current_frames() a
+    cada `interval` segundos enquanto houver perfis ativos, sem instrumentar
+    cada chamada como o cProfile. Parada, espera sem consumir CPU.
+    """
+    
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self._interval = interval
+        self._max_depth = max_depth
+        self._active: Dict[str, Profile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, name: str) -> Profile:
+        """Inicia e ativa no contexto atual o perfil da requisição (deve ser chamado no event loop)"""
+        profile = Profile(name, asyncio.get_running_loop(), threading.get_ident(), asyncio.current_task())
+        profile._context_token = _current_profile.set(profile)
+        
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        
+        self._wakeup.set()
+        return profile
+    
+    def stop(self, profile: Profile, duration: float) -> Profile:
+        """Encerra o perfil (no mesmo contexto de start) e registra a duração da requisição"""
+        with self._lock:
+            self._active.pop(profile.id, None)
+        
+        if profile._context_token is not None:
+            _current_profile.reset(profile._context_token)
+            profile._context_token = None
+        
+        profile.duration = duration
+        return profile
+    
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wakeup.clear()
+            
+            if not active:
+                self._wakeup.wait()
+                continue
+            
+            frames = sys._current_frames()
+            for profile in active:
+                profile.sample(frames, self._max_depth)
+            del frames
+            
+            time.sleep(self._interval)
+
+
+class ProfileStore:
+    """
+    Perfis guardados em memória com tamanho limitado: os pedidos explícitos
+    em um buffer circular e, entre os amostrados, só os N mais lentos.
+    """
+    
+    def __init__(self, max_profiles: int = 10):
+        self._max_profiles = max(1, max_profiles)
+        self._requested: deque = deque(maxlen=self._max_profiles)
+        self._slowest: List = []  # heap (duração, seq, perfil): o mais rápido sai primeiro
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+    
+    def add_requested(self, profile: Profile) -> None:
+        """Guarda um perfil pedido explicitamente (header assinado ou flag de debug)"""
+        with self._lock:
+            self._requested.append(profile)
+    
+    def offer_sampled(self, profile: Profile) -> bool:
+        """Guarda o perfil amostrado se estiver entre os N mais lentos"""
+        entry = (profile.duration, next(self._sequence), profile)
+        
+        with self._lock:
+            if len(self._slowest) < self._max_profiles:
+                heapq.heappush(self._slowest, entry)
+                return True
+            
+            if profile.duration <= self._slowest[0][0]:
+                return False
+            
+            heapq.heapreplace(self._slowest, entry)
+            return True
+    
+    def get(self, profile_id: str) -> Optional[Profile]:
+        """Busca um perfil guardado pelo id"""
+        with self._lock:
+            for profile in itertools.chain(self._requested, (entry[2] for entry in self._slowest)):
+                if profile.id == profile_id:
+                    return profile
+        return None
+    
+    def list(self) -> Dict[str, List[Dict[str, object]]]:
+        """Resumos dos perfis guardados (os amostrados do mais lento ao mais rápido)"""
+        with self._lock:
+            requested = [profile.summary() for profile in reversed(self._requested)]
+            slowest = [entry[2].summary() for entry in sorted(self._slowest, reverse=True)]
+        return {"solicitados": requested, "mais_lentos": slowest}
+
+
+class ProfileTokenSigner:
+    """
+    Tokens do header de profiling: "<expira_em>.<HMAC-SHA256 de expira_em>".
+    Não carregam dados da requisição, só autorizam o profiling até expirar.
+    """
+    
+    def __init__(self, secret: str):
+        self._secret = secret.encode("utf-8")
+    
+    def sign(self, ttl_seconds: float = 3600, now: Optional[float] = None) -> str:
+        """Gera um token válido por ttl_seconds"""
+        expires = str(int((now if now is not None else time.time()) + ttl_seconds))
+        return f"{expires}.{self._digest(expires)}"
+    
+    def verify(self, token: str, now: Optional[float] = None) -> bool:
+        """Confere a assinatura (em tempo constante) e a expiração"""
+        expires, _, signature = token.partition(".")
+        if not expires.isdigit() or not hmac.compare_digest(signature, self._digest(expires)):
+            return False
+        return int(expires) >= (now if now is not None else time.time())
+    
+    def _digest(self, message: str) -> str:
+        return hmac.new(self._secret, message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class ProfilingAuthorizer:
+    """
+    Decide se a requisição pediu profiling: header com token assinado
+    (ProfileTokenSigner) ou, só em modo debug, o parâmetro ?profile=1.
+    """
+    
+    def __init__(
+        self,
+        signer: Optional[ProfileTokenSigner] = None,
+        header: str = "X-Profile-Token",
+        allow_query_flag: bool = False
+    ):
+        self._signer = signer
+        self._header = header.lower().encode("latin-1")
+        self._allow_query_flag = allow_query_flag
+    
+    def __call__(self, scope: Dict[str, object]) -> bool:
+        if self._allow_query_flag and b"profile=1" in scope.get("query_string", b"").split(b"&"):
+            return True
+        
+        if self._signer is None:
+            return False
+        
+        for name, value in scope.get("headers", ()):
+            if name == self._header:
+                return self._signer.verify(value.decode("latin-1"))
+        return False
@@ -1,98 +1,139 @@
+import html
 import re
+from email import policy as email_policy
+from email.message import EmailMessage
+from email.parser import BytesFeedParser
+from typing import Optional
+
+from ...domain.entities.file import FileContent
+from ..observability.profiler import profiled
+
+
+class _PartScanner:
+    """Acompanha as partes MIME à medida que o feed parser as conclui"""
+    
+    def __init__(self):
+        self.plain_part: Optional[EmailMessage] = None
+        self.html_part: Optional[EmailMessage] = None
+    
+    def create_message(self, policy=email_policy.default) -> "_ScannedMessage":
+        """Factory de mensagens usada pelo BytesFeedParser"""
+        return _ScannedMessage(self, policy=policy)
+    
+    def part_completed(self, part: "_ScannedMessage") -> bool:
+        """
+        Registra uma parte folha recém-concluída. Retorna False se a parte
+        for um anexo, cujo payload deve ser descartado sem decodificar.
+        """
+        maintype = part.get_content_maintype()
+        if maintype in ('multipart', 'message'):
+            return True
+        
+        if maintype != 'text' or part.is_attachment():
+            return False
+        
+        content_type = part.get_content_type()
+        if content_type == 'text/plain' and self.plain_part is None:
+            self.plain_part = part
+        elif content_type == 'text/html' and self.html_part is None:
+            self.html_part = part
+        
+        return True
+
+
+class _ScannedMessage(EmailMessage):
+    """EmailMessage que avisa o scanner quando o parser define seu payload"""
+    
+    def __init__(self, scanner: _PartScanner, policy=email_policy.default):
+        super().__init__(policy=policy)
+        self._scanner = scanner
+    
+    def set_payload(self, payload, charset=None):
+        if isinstance(payload, str) and not self._scanner.part_completed(self):
+            payload = ''
+        super().set_payload(payload, charset)
 
 
 class EMLParser:
-    """Parser para arquivos EML (email)"""
+    """Parser para arquivos EML (email), baseado no feed parser da biblioteca padrão"""
+    
+    FEED_CHUNK_SIZE = 64 * 1024
     
     def can_parse(self, filename: str) -> bool:
         """Verifica se pode fazer parse de arquivos EML"""
         return filename.lower().endswith('.eml')
     
-    def parse(self, file_content: bytes) -> str:
+    @profiled
+    def parse(self, file_content: FileContent) -> str:
         """Extrai texto de um arquivo EML"""
         try:
-            content_str = self._decode_content(file_content)
+            message, scanner = self._scan_message(file_content)
             
-            subject = self._extract_subject(content_str)
-            sender = self._extract_sender(content_str)
-            body = self._extract_body(content_str)
+            subject = self._extract_header(message, 'Subject') or 'Sem assunto'
+            sender = self._extract_header(message, 'From') or 'Remetente desconhecido'
+            body = self._extract_body(scanner)
             
             return self._format_email_content(subject, sender, body)
-            
+        
         except Exception as e:
             return self._fallback_extraction(file_content, e)
     
-    def _decode_content(self, file_content: bytes) -> str:
-        """Decodifica o conteúdo do arquivo"""
-        if isinstance(file_content, bytes):
-            return file_content.decode('utf-8', errors='ignore')
-        return str(file_content)
-    
-    def _extract_subject(self, content: str) -> str:
-        """Extrai o assunto do email"""
-        match = re.search(r'Subject:\s*([^\r\n]+)', content, re.IGNORECASE)
-        return match.group(1).strip() if match else 'Sem assunto'
-    
-    def _extract_sender(self, content: str) -> str:
-        """Extrai o remetente do email"""
-        match = re.search(r'From:\s*([^\r\n]+)', content, re.IGNORECASE)
-        return match.group(1).strip() if match else 'Remetente desconhecido'
-    
-    def _extract_body(self, content: str) -> str:
-        """Extrai o corpo do email"""
-        # Tenta extrair text/plain primeiro
-        body = self._extract_plain_text(content)
+    def _scan_message(self, file_content: FileContent):
+        """
+        Alimenta o parser em blocos e para assim que a primeira parte
+        text/plain estiver completa; o restante da mensagem não é lido.
+        """
+        if isinstance(file_content, str):
+            file_content = file_content.encode('utf-8', 'surrogateescape')
         
-        if not body:
-            # Se não encontrar, tenta HTML
-            body = self._extract_html_text(content)
+        scanner = _PartScanner()
+        parser = BytesFeedParser(_factory=scanner.create_message, policy=email_policy.default)
         
-        if not body:
-            # Fallback: pega tudo após headers
-            body = self._extract_fallback_body(content)
+        for start in range(0, len(file_content), self.FEED_CHUNK_SIZE):
+            parser.feed(file_content[start:start + self.FEED_CHUNK_SIZE])
+            if scanner.plain_part is not None:
+                break
         
-        return self._clean_body_text(body)
+        return parser.close(), scanner
     
-    def _extract_plain_text(self, content: str) -> str:
-        """Extrai texto plano do email"""
-        pattern = r'Content-Type:\s*text/plain.*?\n\n(.*?)(?=--\w+|$)'
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else ""
+    def _extract_header(self, message: EmailMessage, name: str) -> str:
+        """Extrai um header já decodificado (RFC 2047)"""
+        value = message.get(name)
+        return ' '.join(str(value).split()) if value else ''
     
-    def _extract_html_text(self, content: str) -> str:
-        """Extrai e limpa texto HTML"""
-        pattern = r'Content-Type:\s*text/html.*?\n\n(.*?)(?=--\w+|$)'
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        if match:
-            html_body = match.group(1).strip()
-            # Remove tags HTML
-            text = re.sub(r'<[^>]+>', '', html_body)
-            text = re.sub(r'&nbsp;', ' ', text)
-            text = re.sub(r'&[a-zA-Z0-9]+;', '', text)
-            return text
+    def _extract_body(self, scanner: _PartScanner) -> str:
+        """Extrai o corpo do email: text/plain, depois HTML"""
+        if scanner.plain_part is not None:
+            body = self._decode_part(scanner.plain_part)
+        elif scanner.html_part is not None:
+            body = self._html_to_text(self._decode_part(scanner.html_part))
+        else:
+            return "Não foi possível extrair o corpo do email"
         
-        return ""
-    
-    def _extract_fallback_body(self, content: str) -> str:
-        """Extração de fallback quando não encontra content-type específico"""
-        header_end = content.find('\n\n')
-        if header_end != -1:
-            body = content[header_end + 2:].strip()
-            # Remove boundaries
-            body = re.sub(r'--\w+.*', '', body, flags=re.DOTALL)
-            return body
-        
-        return "Não foi possível extrair o corpo do email"
+        return self._clean_body_text(body)
+    
+    def _decode_part(self, part: EmailMessage) -> str:
+        """Decodifica base64/quoted-printable e o charset da parte"""
+        try:
+            return part.get_content()
+        except (LookupError, UnicodeError, AssertionError):
+            # Charset desconhecido ou inválido
+            payload = part.get_payload(decode=True) or b''
+            return str(payload, 'utf-8', 'replace')
+    
+    def _html_to_text(self, html_body: str) -> str:
+        """Remove tags HTML e converte entidades"""
+        text = re.sub(r'<(script|style)\b.*?</\1\s*>', ' ', html_body, flags=re.DOTALL | re.IGNORECASE)
+        text = re.sub(r'<br\s*/?>|</p\s*>|</div\s*>', '\n', text, flags=re.IGNORECASE)
+        text = re.sub(r'<[^>]+>', '', text)
+        return html.unescape(text).replace('\xa0', ' ')
     
     def _clean_body_text(self, body: str) -> str:
         """Limpa o texto do corpo do email"""
         if not body:
             return ""
         
-        # Limpa quoted-printable encoding
-        body = re.sub(r'=\r?\n', '', body)
-        body = re.sub(r'=([0-9A-F]{2})', lambda m: chr(int(m.group(1), 16)), body)
+        body = body.replace('\r\n', '\n')
         
         # Limpa espaços extras
         body = re.sub(r'\n\s*\n', '\n\n', body)
@@ -102,7 +143,13 @@ class EMLParser:
         """Formata o conteúdo completo do email"""
         return f"Assunto: {subject}\nDe: {sender}\n\n{body}"
     
-    def _fallback_extraction(self, file_content: bytes, original_error: Exception) -> str:
+    def _decode_content(self, file_content: FileContent) -> str:
+        """Decodifica o conteúdo do arquivo"""
+        if isinstance(file_content, str):
+            return file_content
+        return str(file_content, 'utf-8', 'ignore')
+    
+    def _fallback_extraction(self, file_content: FileContent, original_error: Exception) -> str:
         """Extração de fallback em caso de erro"""
         try:
             content_str = self._decode_content(file_content)
@@ -114,6 +161,6 @@ class EMLParser:
             content_str = re.sub(r'--\w+.*?\n', '', content_str)
             
             return f"Email extraído (método simplificado):\n{content_str.strip()}"
-            
+        
         except Exception:
             return f"Conteúdo do arquivo EML (erro na extração: {str(original_error)})"
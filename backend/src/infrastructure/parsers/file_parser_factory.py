@@ -1,6 +1,7 @@
 from typing import List, Optional
-from ...domain.entities.file import FileInfo
+from ...domain.entities.file import FileContent, FileInfo
 from .pdf_parser import PDFParser
+from .pdf_extraction_pool import PDFExtractionPool
 from .eml_parser import EMLParser
 from .text_parser import TextParser
 
@@ -8,9 +9,14 @@ from .text_parser import TextParser
 class FileParserFactory:
     """Factory para criação de parsers de arquivo"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        pdf_parser: Optional[PDFParser] = None,
+        pdf_extractor: Optional[PDFExtractionPool] = None
+    ):
+        self._pdf_extractor = pdf_extractor
         self._parsers = [
-            PDFParser(),
+            pdf_parser or PDFParser(),
             EMLParser(),
             TextParser()
         ]
@@ -23,7 +29,23 @@ class FileParserFactory:
         
         return None
     
-    def parse_file(self, file_content: bytes, file_info: FileInfo) -> str:
+    async def parse_file_async(self, file_content: FileContent, file_info: FileInfo) -> str:
+        """Faz parse do arquivo sem bloquear o event loop nos formatos pesados (PDF)"""
+        if self._pdf_extractor and isinstance(self.get_parser(file_info), PDFParser):
+            return await self._pdf_extractor.extract(file_content)
+        
+        return self.parse_file(file_content, file_info)
+    
+    def stats(self) -> dict:
+        """Estatísticas da extração de PDF (vazio sem o pool)"""
+        return self._pdf_extractor.stats() if self._pdf_extractor else {}
+    
+    def shutdown(self) -> None:
+        """Libera os recursos dos parsers (pool de processos de PDF)"""
+        if self._pdf_extractor:
+            self._pdf_extractor.shutdown()
+    
+    def parse_file(self, file_content: FileContent, file_info: FileInfo) -> str:
         """Faz parse do arquivo usando o parser apropriado"""
         parser = self.get_parser(file_info)
         
@@ -32,9 +54,9 @@ class FileParserFactory:
         
         # Fallback: tenta decodificar como texto
         try:
-            return file_content.decode('utf-8')
+            return str(file_content, 'utf-8')
         except UnicodeDecodeError:
             try:
-                return file_content.decode('latin-1', errors='ignore')
+                return str(file_content, 'latin-1', 'ignore')
             except Exception as e:
                 return f"Erro: Tipo de arquivo não suportado ou corrompido. Arquivo: {file_info.filename}, Erro: {str(e)}"
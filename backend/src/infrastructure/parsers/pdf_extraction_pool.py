@@ -0,0 +1,155 @@
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from ...domain.entities.file import FileContent
+from ...domain.exceptions import FileParsingError
+from ..observability.profiler import current_profile
+from .pdf_parser import PDFParser
+
+
+def _parse_in_worker(parser: PDFParser, file_content: bytes) -> str:
+    """Executado no processo filho"""
+    return parser.parse(file_content)
+
+
+class PDFExtractionPool:
+    """
+    Executa a extração de PDFs fora do event loop, em um pool de processos com
+    timeout. Sem processos (PDF_POOL_WORKERS=0, ambiente serverless ou
+    requisição perfilada) usa um pool próprio de poucas threads: uma thread
+    não pode ser interrompida no timeout, então as extrações expiradas
+    continuam ocupando a sua vaga e, com todas ocupadas, novos PDFs são
+    recusados (pdf_extracao_saturada) em vez de acumular threads.
+    """
+    
+    def __init__(
+        self,
+        parser: PDFParser,
+        max_workers: int = 2,
+        timeout_seconds: float = 30.0,
+        start_method: str = "spawn",
+        thread_workers: int = 2
+    ):
+        self._parser = parser
+        self._max_workers = max_workers
+        self._timeout_seconds = timeout_seconds
+        self._start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._thread_workers = max(1, thread_workers)
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        # Extrações em thread ainda rodando, inclusive as que já expiraram
+        self._threads_busy = 0
+        self._threads_lock = threading.Lock()
+        self.timeouts = 0
+        self.saturated = 0
+    
+    async def extract(self, file_content: FileContent) -> str:
+        """Extrai o texto do PDF respeitando o timeout por documento"""
+        loop = asyncio.get_running_loop()
+        # Requisições perfiladas extraem em thread: o profiler não enxerga os processos filhos
+        executor = self._get_executor() if current_profile() is None else None
+        
+        if executor is None:
+            future = self._submit_to_thread(file_content)
+        else:
+            # mmap não é serializável: o processo filho recebe uma cópia em bytes
+            future = loop.run_in_executor(executor, _parse_in_worker, self._parser, bytes(file_content))
+        
+        try:
+            return await asyncio.wait_for(future, self._timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if executor is not None:
+                self._recycle(executor)
+            raise FileParsingError(
+                "pdf_timeout",
+                f"Tempo limite de {self._timeout_seconds:g}s excedido ao extrair texto do PDF"
+            )
+        except BrokenProcessPool:
+            self._recycle(executor)
+            raise FileParsingError("pdf_pool_indisponivel", "Falha no processo de extração de PDF")
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "process_workers": self._max_workers,
+            "thread_workers": self._thread_workers,
+            "threads_busy": self._threads_busy,
+            "timeouts": self.timeouts,
+            "saturated": self.saturated
+        }
+    
+    def shutdown(self) -> None:
+        """Encerra os pools de processos e de threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=False, cancel_futures=True)
+            self._thread_executor = None
+    
+    def _submit_to_thread(self, file_content: FileContent) -> asyncio.Future:
+        """Extrai em uma thread do pool próprio; FileParsingError se todas estiverem ocupadas"""
+        with self._threads_lock:
+            if self._threads_busy >= self._thread_workers:
+                self.saturated += 1
+                raise FileParsingError(
+                    "pdf_extracao_saturada",
+                    "Muitas extrações de PDF em andamento. Tente novamente em instantes"
+                )
+            self._threads_busy += 1
+        
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(max_workers=self._thread_workers, thread_name_prefix="pdf")
+        
+        # Como asyncio.to_thread, propaga o contexto (perfil ativo) para a thread
+        context = contextvars.copy_context()
+        future = self._thread_executor.submit(context.run, self._parser.parse, file_content)
+        # A vaga só é liberada quando a thread termina de fato, mesmo após o timeout
+        future.add_done_callback(self._release_thread)
+        return asyncio.wrap_future(future)
+    
+    def _release_thread(self, future: Future) -> None:
+        with self._threads_lock:
+            self._threads_busy -= 1
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Cria o pool sob demanda (ou retorna None se desativado/indisponível)"""
+        if self._max_workers <= 0:
+            return None
+        
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context(self._start_method)
+                )
+            except (OSError, NotImplementedError, ValueError):
+                # Ex.: sem /dev/shm em funções serverless
+                self._max_workers = 0
+                return None
+        
+        return self._executor
+    
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Substitui o pool após um timeout. O pool antigo é encerrado depois de
+        mais um período de timeout, quando as demais extrações nele já
+        terminaram ou expiraram, matando o worker travado.
+        """
+        if self._executor is executor:
+            self._executor = None
+        
+        asyncio.get_running_loop().call_later(self._timeout_seconds, self._terminate, executor)
+    
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor) -> None:
+        """Mata os processos de um pool descartado"""
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,31 +1,59 @@
 import io
-from PyPDF2 import PdfReader
+import mmap
+from typing import Optional
+
+from ...domain.entities.file import FileContent
+from ...domain.exceptions import FileParsingError
+from ..observability.profiler import profiled
 
 
 class PDFParser:
     """Parser para arquivos PDF"""
     
+    def __init__(self, max_pages: Optional[int] = None, max_chars: Optional[int] = None):
+        # Limites para PDFs grandes: para de extrair ao atingir qualquer um deles
+        self._max_pages = max_pages
+        self._max_chars = max_chars
+    
     def can_parse(self, filename: str) -> bool:
         """Verifica se pode fazer parse de arquivos PDF"""
         return filename.lower().endswith('.pdf')
     
-    def parse(self, file_content: bytes) -> str:
+    @profiled
+    def parse(self, file_content: FileContent) -> str:
         """Extrai texto de um arquivo PDF"""
         try:
-            pdf_reader = PdfReader(io.BytesIO(file_content))
+            # Importado no primeiro PDF: rotas sem arquivos não pagam o import do PyPDF2
+            from PyPDF2 import PdfReader
+            
+            # mmap já é um stream (read/seek/tell); bytes precisam de BytesIO
+            stream = file_content if isinstance(file_content, mmap.mmap) else io.BytesIO(file_content)
+            pdf_reader = PdfReader(stream)
             text_parts = []
+            total_chars = 0
             
-            for page in pdf_reader.pages:
+            for page_number, page in enumerate(pdf_reader.pages):
+                if self._max_pages is not None and page_number >= self._max_pages:
+                    break
+                
                 page_text = page.extract_text()
                 if page_text:
                     text_parts.append(page_text)
+                    total_chars += len(page_text)
+                
+                # Parada antecipada: já há texto suficiente para classificar
+                if self._max_chars is not None and total_chars >= self._max_chars:
+                    break
             
             text = "\n".join(text_parts).strip()
             
+            if self._max_chars is not None:
+                text = text[:self._max_chars]
+            
             if len(text) < 10:
                 return f"PDF processado mas pouco texto encontrado: '{text[:50]}...'"
             
             return text
             
         except Exception as e:
-            return f"Erro ao extrair texto do PDF: {str(e)}"
+            raise FileParsingError("pdf_invalido", f"Erro ao extrair texto do PDF: {str(e)}")
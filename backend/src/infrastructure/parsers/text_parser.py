@@ -1,3 +1,6 @@
+from ...domain.entities.file import FileContent
+
+
 class TextParser:
     """Parser para arquivos de texto"""
     
@@ -5,12 +8,13 @@ class TextParser:
         """Verifica se pode fazer parse de arquivos de texto"""
         return filename.lower().endswith(('.txt', '.text'))
     
-    def parse(self, file_content: bytes) -> str:
+    def parse(self, file_content: FileContent) -> str:
         """Extrai texto de um arquivo de texto"""
+        # str(buffer, encoding) decodifica direto do buffer (bytes ou mmap), sem cópia intermediária
         try:
-            return file_content.decode('utf-8')
+            return str(file_content, 'utf-8')
         except UnicodeDecodeError:
             try:
-                return file_content.decode('latin-1', errors='ignore')
+                return str(file_content, 'latin-1', 'ignore')
             except Exception as e:
                 return f"Erro ao decodificar arquivo de texto: {str(e)}"
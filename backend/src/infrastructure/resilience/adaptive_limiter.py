@@ -0,0 +1,131 @@
+import time
+from typing import Callable, Dict, Optional
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Limite de chamadas simultâneas ajustado por AIMD, como o controle de
+    congestionamento do TCP: cresce enquanto o upstream responde bem (um a
+    cada resposta até o primeiro sinal de sobrecarga, depois cerca de um por
+    janela de `limit` respostas) e cai multiplicativamente quando ele
+    responde 429 ou quando a latência recente passa de `latency_tolerance`
+    vezes a latência de longo prazo. Após um 429 o cliente fica pausado por
+    um tempo que dobra a cada 429 seguido (cota esgotada).
+    """
+    
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.5,
+        latency_backoff_ratio: float = 0.9,
+        cooldown_seconds: float = 1.0,
+        max_cooldown_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._min_limit = max(1.0, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = min(max(float(initial_limit), self._min_limit), self._max_limit)
+        self._latency_tolerance = latency_tolerance
+        self._backoff_ratio = backoff_ratio
+        self._latency_backoff_ratio = latency_backoff_ratio
+        self._cooldown_seconds = cooldown_seconds
+        self._max_cooldown_seconds = max_cooldown_seconds
+        self._clock = clock
+        # Crescimento rápido (slow start do TCP) até o primeiro sinal de sobrecarga
+        self._slow_start = True
+        # Médias móveis da latência: recente e de longo prazo (referência sem sobrecarga)
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._paused_until = float("-inf")
+        self._consecutive_overloads = 0
+        self.in_flight = 0
+        self.successes = 0
+        self.overloads = 0
+        self.decreases = 0
+    
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+    
+    @property
+    def paused_until(self) -> float:
+        return self._paused_until
+    
+    def available(self) -> bool:
+        """Há vaga abaixo do limite e o cliente não está pausado por cota"""
+        return self.in_flight < self.limit and self._clock() >= self._paused_until
+    
+    def load(self) -> float:
+        """Fração do limite em uso (critério do despacho para o menos carregado)"""
+        return self.in_flight / self._limit
+    
+    def acquire(self) -> None:
+        self.in_flight += 1
+    
+    def release(self) -> None:
+        """Libera a vaga sem ajustar o limite (ex.: chamada cancelada ou erro sem relação com carga)"""
+        self.in_flight -= 1
+    
+    def on_success(self, latency: float) -> None:
+        """Libera a vaga e ajusta o limite pela latência observada"""
+        self.in_flight -= 1
+        self.successes += 1
+        self._consecutive_overloads = 0
+        
+        if self._long_latency is None:
+            self._short_latency = self._long_latency = latency
+        else:
+            self._short_latency += 0.5 * (latency - self._short_latency)
+            self._long_latency += 0.02 * (latency - self._long_latency)
+        
+        if self._short_latency > self._latency_tolerance * self._long_latency:
+            self._decrease(self._latency_backoff_ratio)
+        elif self._slow_start:
+            self._limit = min(self._limit + 1, self._max_limit)
+        else:
+            self._limit = min(self._limit + 1 / self._limit, self._max_limit)
+    
+    def on_overload(self) -> None:
+        """Libera a vaga após um 429: reduz o limite e pausa o cliente"""
+        self.in_flight -= 1
+        self.overloads += 1
+        self._decrease(self._backoff_ratio)
+        
+        now = self._clock()
+        if now < self._paused_until:
+            # Respostas de chamadas enviadas antes da pausa: a pausa já cobre essa rajada
+            return
+        
+        self._consecutive_overloads += 1
+        cooldown = min(
+            self._cooldown_seconds * 2 ** (self._consecutive_overloads - 1),
+            self._max_cooldown_seconds
+        )
+        self._paused_until = now + cooldown
+    
+    def _decrease(self, ratio: float) -> None:
+        """Redução multiplicativa, no máximo uma por latência recente (as respostas já em voo não contam de novo)"""
+        self._slow_start = False
+        now = self._clock()
+        if now - self._last_decrease < (self._short_latency or 0.0):
+            return
+        
+        self._last_decrease = now
+        self._limit = max(self._limit * ratio, self._min_limit)
+        self.decreases += 1
+    
+    def stats(self) -> Dict[str, object]:
+        """Limite atual, chamadas em andamento e contadores"""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+            "paused": self._clock() < self._paused_until,
+            "latency_ms": round((self._short_latency or 0.0) * 1000, 1)
+        }
@@ -0,0 +1,81 @@
+import time
+from typing import Callable, Dict
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por falhas consecutivas: fechado → aberto (falha rápida
+    durante reset_timeout) → meio-aberto (uma chamada de teste) → fechado.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened_count = 0
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """Estado atual (o aberto vira meio-aberto quando o tempo de espera termina)"""
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+    
+    def allow_request(self) -> bool:
+        """Indica se a chamada pode seguir para o upstream"""
+        state = self.state
+        
+        if state == self.CLOSED:
+            return True
+        
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            # Apenas uma chamada de teste por vez enquanto meio-aberto
+            self._probe_in_flight = True
+            return True
+        
+        self.rejected += 1
+        return False
+    
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._state = self.CLOSED
+    
+    def release_probe(self) -> None:
+        """Libera a chamada de teste que terminou sem desfecho (ex.: cancelada): a próxima chamada testa de novo"""
+        if self._state == self.HALF_OPEN:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self._failure_threshold:
+            if self._state != self.OPEN:
+                self.opened_count += 1
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+    
+    def stats(self) -> Dict[str, object]:
+        """Estado e contadores do circuito"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "opened": self.opened_count,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,268 @@
+import asyncio
+import random
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ...domain.services.interfaces import AIServiceInterface
+from ...domain.entities.email import (
+    AnalysisStreamEvent, Email, EmailAnalysisResult, EmailCategory, ProcessedText, StreamEventType
+)
+from ...domain.exceptions import AIServiceError
+from .circuit_breaker import CircuitBreaker
+
+T = TypeVar("T")
+
+
+class ResilientAIService(AIServiceInterface):
+    """
+    Decorator de resiliência para o serviço de IA: prazo por tentativa e por
+    chamada, novas tentativas com backoff exponencial e jitter, circuit
+    breaker e, opcionalmente, requisições hedged contra a cauda de latência.
+    Esgotadas as tentativas (ou com o circuito aberto), responde com o
+    serviço de fallback ou falha rápido com um resultado de erro.
+    """
+    
+    UNAVAILABLE_RESPONSE = "Desculpe, o serviço de análise está indisponível no momento. Tente novamente em instantes."
+    
+    def __init__(
+        self,
+        ai_service: AIServiceInterface,
+        fallback: Optional[AIServiceInterface] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout_seconds: float = 15.0,
+        deadline_seconds: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge_after: Optional[float] = None,
+        rng: Optional[random.Random] = None
+    ):
+        self._ai_service = ai_service
+        self._fallback = fallback
+        self._breaker = circuit_breaker or CircuitBreaker()
+        self._timeout_seconds = timeout_seconds
+        self._deadline_seconds = max(deadline_seconds, timeout_seconds)
+        self._max_retries = max(0, max_retries)
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        # Segunda chamada disparada se a primeira passar deste tempo (None desativa)
+        self._hedge_after = hedge_after
+        self._rng = rng or random.Random()
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        """Analisa com prazo, retry e hedging; usa o fallback se o upstream falhar"""
+        try:
+            return await self._call(
+                lambda: self._ai_service.analyze_email(email, processed_text),
+                hedge=self._hedge_after is not None
+            )
+        except AIServiceError as e:
+            return (await self._fallback_results([(email, processed_text)], e))[0]
+    
+    async def analyze_email_stream(
+        self,
+        email: Email,
+        processed_text: ProcessedText
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """
+        Transmite com prazo para cada trecho. Falhas antes do primeiro evento
+        seguem pelo caminho de analyze_email (retries e fallback); depois dele,
+        o resultado final enviado passa a ser o do fallback.
+        """
+        if self._breaker.state != CircuitBreaker.CLOSED:
+            # Circuito aberto ou em teste: o caminho sem streaming decide (falha rápida, sonda ou fallback)
+            for event in AnalysisStreamEvent.from_result(await self.analyze_email(email, processed_text)):
+                yield event
+            return
+        
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._deadline_seconds
+        events = self._ai_service.analyze_email_stream(email, processed_text).__aiter__()
+        started = False
+        
+        try:
+            while True:
+                timeout = min(self._timeout_seconds, deadline - loop.time())
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                
+                if event.type is StreamEventType.RESULT:
+                    self._breaker.record_success()
+                
+                started = True
+                yield event
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            error = AIServiceError("ia_timeout", f"Sem resposta da IA em {timeout:.1f}s", retryable=True)
+        except AIServiceError as e:
+            error = e
+        finally:
+            await events.aclose()
+        
+        self.failures += 1
+        
+        if not started:
+            for event in AnalysisStreamEvent.from_result(await self.analyze_email(email, processed_text)):
+                yield event
+            return
+        
+        if error.retryable:
+            self._breaker.record_failure()
+        
+        result = (await self._fallback_results([(email, processed_text)], error))[0]
+        yield AnalysisStreamEvent(StreamEventType.RESULT, result=result)
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[Email, ProcessedText]]
+    ) -> List[EmailAnalysisResult]:
+        """O lote é tratado como uma chamada (sem hedging, que duplicaria o custo do lote inteiro)"""
+        try:
+            return await self._call(lambda: self._ai_service.analyze_batch(items), hedge=False)
+        except AIServiceError as e:
+            return await self._fallback_results(items, e)
+    
+    def stats(self) -> Dict[str, object]:
+        """Contadores de tentativas, falhas, fallbacks, hedging e o estado do circuito"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "circuit": self._breaker.stats()
+        }
+    
+    async def _call(self, factory: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        """Executa a chamada respeitando o circuito, o prazo total e o limite de tentativas"""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._deadline_seconds
+        
+        probe = self._breaker.state == CircuitBreaker.HALF_OPEN
+        if not self._breaker.allow_request():
+            raise AIServiceError("ia_circuito_aberto", "Serviço de IA desativado temporariamente após falhas consecutivas")
+        
+        try:
+            return await self._attempts(factory, hedge, deadline)
+        except BaseException:
+            # Sonda cancelada (ex.: cliente do SSE desconectou) ou com erro inesperado: sem
+            # liberá-la, o circuito meio-aberto recusaria todas as chamadas seguintes
+            if probe:
+                self._breaker.release_probe()
+            raise
+    
+    async def _attempts(self, factory: Callable[[], Awaitable[T]], hedge: bool, deadline: float) -> T:
+        """Tentativas com backoff até o sucesso, um erro não retentável ou o fim do prazo"""
+        loop = asyncio.get_running_loop()
+        
+        # O circuito registra o desfecho da chamada (após os retries), não cada tentativa:
+        # falhas transitórias recuperadas não devem abri-lo
+        attempt = 0
+        while True:
+            timeout = min(self._timeout_seconds, deadline - loop.time())
+            
+            try:
+                if hedge:
+                    result = await self._hedged(factory, timeout)
+                else:
+                    result = await asyncio.wait_for(factory(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                error = AIServiceError("ia_timeout", f"Sem resposta da IA em {timeout:.1f}s", retryable=True)
+            except AIServiceError as e:
+                error = e
+            else:
+                self._breaker.record_success()
+                return result
+            
+            self.failures += 1
+            
+            if not error.retryable:
+                # O upstream respondeu: o problema é a requisição, não a saúde do serviço
+                self._breaker.record_success()
+                raise error
+            
+            delay = self._backoff(attempt)
+            
+            if (
+                attempt >= self._max_retries
+                or loop.time() + delay >= deadline
+                or self._breaker.state == CircuitBreaker.OPEN
+            ):
+                self._breaker.record_failure()
+                raise error
+            
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    async def _hedged(self, factory: Callable[[], Awaitable[T]], timeout: float) -> T:
+        """Dispara uma segunda chamada se a primeira demorar; vale a primeira resposta bem-sucedida"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        tasks = [asyncio.ensure_future(factory())]
+        
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=min(self._hedge_after, timeout))
+            if not done:
+                self.hedged += 1
+                tasks.append(asyncio.ensure_future(factory()))
+            
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=end - loop.time(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is not tasks[0]
+                        return task.result()
+                    error = task.exception()
+            
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial com jitter completo (evita novas tentativas sincronizadas)"""
+        return self._rng.uniform(0, min(self._backoff_max, self._backoff_base * 2 ** attempt))
+    
+    async def _fallback_results(
+        self,
+        items: List[Tuple[Email, ProcessedText]],
+        error: AIServiceError
+    ) -> List[EmailAnalysisResult]:
+        """Resultados do fallback local ou, sem ele, erro rápido com o código da falha"""
+        self.fallbacks += len(items)
+        
+        if self._fallback is not None:
+            return await self._fallback.analyze_batch(items)
+        
+        return [
+            EmailAnalysisResult(
+                category=EmailCategory.PRODUCTIVE,  # Default seguro
+                response=self.UNAVAILABLE_RESPONSE,
+                error=error.message,
+                error_code=error.code
+            )
+            for _ in items
+        ]
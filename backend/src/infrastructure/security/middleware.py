@@ -1,46 +1,136 @@
+import math
+import mmap
 import time
-from typing import Dict, Optional
-from fastapi import Request, HTTPException, status
+from typing import Dict, Iterable, Optional
+from fastapi import Request, HTTPException, UploadFile, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from ...domain.entities.file import FileContent
+from .rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
 
-class SecurityMiddleware(BaseHTTPMiddleware):
-    """Middleware de segurança personalizado"""
+
+class SecurityMiddleware:
+    """
+    Middleware de segurança personalizado (ASGI puro): limita o tamanho do
+    corpo, aplica o rate limiting e adiciona os headers de segurança sem
+    envolver a resposta como o BaseHTTPMiddleware.
+    """
+    
+    SECURITY_HEADERS = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        (b"content-security-policy", b"default-src 'self'"),
+    ]
     
-    def __init__(self, app):
-        super().__init__(app)
-        self.request_counts: Dict[str, Dict[str, int]] = {}
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        api_key_header: str = "X-API-Key",
+        trust_proxy_headers: bool = False,
+        exempt_paths: Iterable[str] = ("/", "/health", "/metrics"),  # Health checks e scrapes não gastam a cota
+        max_body_size: int = 50 * 1024 * 1024  # 50MB
+    ):
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.api_key_header = api_key_header.lower().encode("latin-1")
+        self.trust_proxy_headers = trust_proxy_headers
+        self.exempt_paths = frozenset(exempt_paths)
+        self.max_body_size = max_body_size
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Processa requisições aplicando verificações de segurança"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + self.SECURITY_HEADERS
+            await send(message)
+        
+        headers = dict(scope["headers"])
+        
+        # 1. Verifica tamanho do corpo da requisição pelo content-length
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._body_too_large_response()(scope, receive, send_with_headers)
+            return
         
-        # 1. Verifica tamanho do corpo da requisição
-        if hasattr(request, 'content_length') and request.content_length:
-            if request.content_length > 50 * 1024 * 1024:  # 50MB
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="Arquivo muito grande"
-                )
-        
-        # 2. Headers de segurança
-        response = await call_next(request)
-        
-        # Adiciona headers de segurança
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Content-Security-Policy"] = "default-src 'self'"
-        
-        return response
+        # 2. Rate limiting por cliente
+        try:
+            await self._check_rate_limit(scope, headers)
+        except RateLimitExceeded as e:
+            await rate_limit_exceeded_handler(Request(scope), e)(scope, receive, send_with_headers)
+            return
+        
+        # 3. Conta os bytes recebidos (corpos sem content-length ou chunked)
+        await self.app(scope, self._limited_receive(receive), send_with_headers)
+    
+    def _limited_receive(self, receive: Receive) -> Receive:
+        """Envolve o receive, abortando assim que o corpo exceder o limite"""
+        received = 0
+        
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # O FastAPI repassa HTTPException levantada durante a leitura do corpo
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Arquivo muito grande"
+                    )
+            
+            return message
+        
+        return limited_receive
+    
+    def _body_too_large_response(self) -> JSONResponse:
+        """Resposta 413 no mesmo formato do handler de HTTPException da aplicação"""
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "error": "Erro na requisição",
+                "detail": "Arquivo muito grande",
+                "status_code": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            }
+        )
+    
+    async def _check_rate_limit(self, scope: Scope, headers: Dict[bytes, bytes]) -> None:
+        """Consome um token do bucket do cliente (API key cadastrada ou IP)"""
+        if self.rate_limiter is None or scope["path"] in self.exempt_paths:
+            return
+        
+        api_key = headers.get(self.api_key_header)
+        key = self.rate_limiter.client_key(
+            api_key.decode("latin-1") if api_key else None,
+            self._client_ip(scope, headers)
+        )
+        await self.rate_limiter.check(key)
+    
+    def _client_ip(self, scope: Scope, headers: Dict[bytes, bytes]) -> Optional[str]:
+        """IP do cliente; atrás de proxy confiável (ex.: Vercel) usa o X-Forwarded-For"""
+        if self.trust_proxy_headers:
+            forwarded = headers.get(b"x-forwarded-for")
+            if forwarded:
+                return forwarded.decode("latin-1").split(",")[0].strip()
+        
+        client = scope.get("client")
+        return client[0] if client else None
 
 class FileSecurityValidator:
     """Validador de segurança para arquivos"""
     
     ALLOWED_EXTENSIONS = {'.pdf', '.eml', '.txt', '.text'}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    READ_CHUNK_SIZE = 1024 * 1024  # 1MB
     
     # Assinaturas de arquivo para validação
     FILE_SIGNATURES = {
@@ -51,32 +141,106 @@ class FileSecurityValidator:
     }
     
     @classmethod
-    def validate_file(cls, filename: str, content: bytes) -> bool:
+    def validate_file(cls, filename: str, content: FileContent) -> bool:
         """Valida se o arquivo é seguro"""
         
         # 1. Verifica extensão
         if not cls._is_allowed_extension(filename):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tipo de arquivo não permitido. Permitidos: {', '.join(cls.ALLOWED_EXTENSIONS)}"
-            )
+            raise cls._extension_error()
         
         # 2. Verifica tamanho
         if len(content) > cls.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Arquivo muito grande. Máximo: {cls.MAX_FILE_SIZE // 1024 // 1024}MB"
-            )
+            raise cls._size_error()
         
         # 3. Verifica assinatura do arquivo
         if not cls._validate_file_signature(filename, content):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Arquivo corrompido ou tipo não corresponde à extensão"
-            )
+            raise cls._signature_error()
         
         return True
     
+    @classmethod
+    async def read_and_validate(cls, file: UploadFile) -> FileContent:
+        """
+        Lê o upload uma única vez e valida o conteúdo.
+        O limite de tamanho é aplicado antes/durante a leitura, não depois.
+        Uploads já gravados em disco pelo parser multipart são mapeados
+        em memória (mmap) em vez de copiados para o heap.
+        """
+        filename = file.filename or ""
+        
+        # 1. Verifica extensão (sem ler o arquivo)
+        if not cls._is_allowed_extension(filename):
+            raise cls._extension_error()
+        
+        # 2. Lê respeitando o limite de tamanho
+        if file.size is not None:
+            # Tamanho já conhecido pelo parser multipart: rejeita sem ler nada
+            if file.size > cls.MAX_FILE_SIZE:
+                raise cls._size_error()
+            content = cls._map_spooled_file(file) or await file.read()
+        else:
+            content = await cls._read_limited(file)
+        
+        if len(content) > cls.MAX_FILE_SIZE:
+            raise cls._size_error()
+        
+        # 3. Verifica assinatura do arquivo
+        if not cls._validate_file_signature(filename, content):
+            raise cls._signature_error()
+        
+        return content
+    
+    @staticmethod
+    def _map_spooled_file(file: UploadFile) -> Optional[mmap.mmap]:
+        """Mapeia o arquivo temporário em disco, se houver (mesma checagem do Starlette)"""
+        if not getattr(file.file, "_rolled", True):
+            return None  # Ainda em memória (arquivos pequenos)
+        
+        try:
+            return mmap.mmap(file.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            return None  # Sem descritor de arquivo ou arquivo vazio
+    
+    @classmethod
+    async def _read_limited(cls, file: UploadFile) -> bytes:
+        """Lê em blocos, abortando assim que o limite de tamanho é ultrapassado"""
+        chunks = []
+        total = 0
+        
+        while True:
+            chunk = await file.read(cls.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            total += len(chunk)
+            if total > cls.MAX_FILE_SIZE:
+                raise cls._size_error()
+            
+            chunks.append(chunk)
+        
+        return b"".join(chunks)
+    
+    @classmethod
+    def _extension_error(cls) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de arquivo não permitido. Permitidos: {', '.join(cls.ALLOWED_EXTENSIONS)}"
+        )
+    
+    @classmethod
+    def _size_error(cls) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Arquivo muito grande. Máximo: {cls.MAX_FILE_SIZE // 1024 // 1024}MB"
+        )
+    
+    @classmethod
+    def _signature_error(cls) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo corrompido ou tipo não corresponde à extensão"
+        )
+    
     @classmethod
     def _is_allowed_extension(cls, filename: str) -> bool:
         """Verifica se a extensão é permitida"""
@@ -84,26 +248,19 @@ class FileSecurityValidator:
         return extension in cls.ALLOWED_EXTENSIONS
     
     @classmethod
-    def _validate_file_signature(cls, filename: str, content: bytes) -> bool:
+    def _validate_file_signature(cls, filename: str, content: FileContent) -> bool:
         """Valida a assinatura do arquivo"""
         if len(content) < 10:
             return False
         
         # Para PDFs
         if filename.lower().endswith('.pdf'):
-            return content.startswith(b'%PDF')
+            return content[:4] == b'%PDF'
         
-        # Para arquivos de texto
+        # Para arquivos de texto: qualquer sequência de bytes é latin-1 válido
+        # (fallback do TextParser), então não é preciso decodificar uma cópia
         if filename.lower().endswith(('.txt', '.text')):
-            try:
-                content.decode('utf-8')
-                return True
-            except UnicodeDecodeError:
-                try:
-                    content.decode('latin-1')
-                    return True
-                except UnicodeDecodeError:
-                    return False
+            return True
         
         # Para emails
         if filename.lower().endswith('.eml'):
@@ -115,11 +272,14 @@ class FileSecurityValidator:
 
 def rate_limit_exceeded_handler(request: Request, exc: Exception):
     """Handler personalizado para rate limit excedido"""
+    # Arredonda para cima: o cliente não deve voltar antes de haver um token
+    retry_after = max(1, math.ceil(getattr(exc, "retry_after", 60)))
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         content={
             "error": "Rate limit excedido",
             "detail": "Muitas requisições. Tente novamente mais tarde.",
-            "retry_after": 60
-        }
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
     )
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class RateLimitExceeded(Exception):
+    """Cliente excedeu o limite de requisições"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit excedido, tente novamente em {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class RateLimitDecision:
+    """Resultado da verificação de um bucket"""
+    allowed: bool
+    retry_after: float = 0.0  # Segundos até haver um token disponível
+
+
+class BucketStore(ABC):
+    """Armazenamento dos token buckets (estado: tokens e instante da última atualização)"""
+    
+    @abstractmethod
+    async def consume(self, key: str, capacity: float, refill_rate: float, now: float) -> RateLimitDecision:
+        """Reabastece o bucket até `now` e tenta consumir um token"""
+        pass
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores do armazenamento"""
+        return {}
+    
+    def close(self) -> None:
+        """Libera recursos do armazenamento"""
+        pass
+
+
+def _refill_and_take(
+    tokens: float, updated_at: float, capacity: float, refill_rate: float, now: float
+) -> Tuple[float, RateLimitDecision]:
+    """Algoritmo do token bucket: retorna os tokens restantes e a decisão"""
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+    
+    if tokens >= 1:
+        return tokens - 1, RateLimitDecision(allowed=True)
+    
+    return tokens, RateLimitDecision(allowed=False, retry_after=(1 - tokens) / refill_rate)
+
+
+class MemoryBucketStore(BucketStore):
+    """Buckets em memória (um worker), com despejo dos buckets ociosos"""
+    
+    def __init__(self, max_buckets: int = 10000):
+        self._max_buckets = max(1, max_buckets)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    async def consume(self, key: str, capacity: float, refill_rate: float, now: float) -> RateLimitDecision:
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, decision = _refill_and_take(tokens, updated_at, capacity, refill_rate, now)
+            # Reinsere no fim: a ordem do dict é a ordem de último acesso
+            self._buckets[key] = (tokens, now)
+            self._evict(capacity / refill_rate, now)
+            return decision
+    
+    def _evict(self, refill_seconds: float, now: float) -> None:
+        """
+        Remove buckets a partir do mais antigo. Um bucket ocioso por mais que o
+        tempo de reabastecimento completo equivale a um bucket novo, então
+        descartá-lo não altera o limite. Acima de max_buckets, o mais antigo
+        sai mesmo que não esteja cheio.
+        """
+        while self._buckets:
+            oldest_key = next(iter(self._buckets))
+            _, updated_at = self._buckets[oldest_key]
+            
+            if now - updated_at < refill_seconds and len(self._buckets) <= self._max_buckets:
+                break
+            
+            del self._buckets[oldest_key]
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, int]:
+        return {"buckets": len(self._buckets), "evictions": self.evictions}
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets em SQLite, compartilhados entre workers do uvicorn na mesma máquina"""
+    
+    PRUNE_EVERY = 1000  # Limpa buckets ociosos a cada N consumos
+    
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rate_limit_updated ON rate_limit_buckets (updated_at)"
+        )
+        self._operations = 0
+        self.evictions = 0
+    
+    async def consume(self, key: str, capacity: float, refill_rate: float, now: float) -> RateLimitDecision:
+        return await asyncio.to_thread(self._consume, key, capacity, refill_rate, now)
+    
+    def _consume(self, key: str, capacity: float, refill_rate: float, now: float) -> RateLimitDecision:
+        with self._lock:
+            # BEGIN IMMEDIATE serializa leitura + escrita entre processos
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens, decision = _refill_and_take(tokens, updated_at, capacity, refill_rate, now)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                
+                self._operations += 1
+                if self._operations % self.PRUNE_EVERY == 0:
+                    self.evictions += self._connection.execute(
+                        "DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - capacity / refill_rate,)
+                    ).rowcount
+                
+                self._connection.execute("COMMIT")
+                return decision
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            buckets = self._connection.execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+        return {"buckets": buckets, "evictions": self.evictions}
+    
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def _hash_api_key(api_key: str) -> str:
+    """Hash da API key (para não mantê-la em memória/disco)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+
+
+class TokenBucketRateLimiter:
+    """
+    Rate limiter por cliente: permite `calls` requisições em rajada e
+    reabastece à taxa de `calls / period` tokens por segundo. O bucket é o
+    do IP do cliente; só API keys cadastradas em `api_keys` ganham bucket
+    próprio (uma key qualquer no header não pode contornar o limite).
+    """
+    
+    def __init__(
+        self,
+        store: BucketStore,
+        calls: int,
+        period: float,
+        api_keys: Iterable[str] = (),
+        clock: Callable[[], float] = time.time
+    ):
+        self._store = store
+        self._capacity = float(max(1, calls))
+        self._refill_rate = self._capacity / max(period, 1e-9)
+        self._api_keys = frozenset(_hash_api_key(api_key) for api_key in api_keys if api_key)
+        self._clock = clock
+        self.allowed = 0
+        self.limited = 0
+    
+    async def check(self, key: str) -> RateLimitDecision:
+        """Consome um token do cliente; levanta RateLimitExceeded se não houver"""
+        decision = await self._store.consume(key, self._capacity, self._refill_rate, self._clock())
+        
+        if not decision.allowed:
+            self.limited += 1
+            raise RateLimitExceeded(decision.retry_after)
+        
+        self.allowed += 1
+        return decision
+    
+    def client_key(self, api_key: Optional[str], client_ip: Optional[str]) -> str:
+        """Chave do bucket: a API key (como hash) se estiver cadastrada, senão o IP"""
+        if api_key:
+            hashed = _hash_api_key(api_key)
+            if hashed in self._api_keys:
+                return "key:" + hashed
+        return "ip:" + (client_ip or "desconhecido")
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores do rate limiter"""
+        return {"allowed": self.allowed, "limited": self.limited, **self._store.stats()}
+    
+    def close(self) -> None:
+        """Fecha o armazenamento"""
+        self._store.close()
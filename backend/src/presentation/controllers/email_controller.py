@@ -1,12 +1,16 @@
-from fastapi import Form, UploadFile, File
-from typing import Optional
+import json
+from typing import AsyncIterator, List, Optional
 
 from ...application.use_cases.process_email_use_case import ProcessEmailUseCase
 from ...domain.services.interfaces import TextProcessorInterface
 from ...infrastructure.parsers.file_parser_factory import FileParserFactory
-from ...domain.entities.file import FileInfo
+from ...domain.entities.email import AnalysisStreamEvent, StreamEventType
+from ...domain.entities.file import UploadedFile
+from ...domain.exceptions import FileParsingError
 from ..models.responses import (
     EmailResponse, 
+    EmailRequest,
+    BatchEmailResponse,
     FileUploadResponse, 
     PreprocessResponse, 
     HealthResponse
@@ -28,9 +32,9 @@ class EmailController:
     
     async def process_email(
         self, 
-        body: str = Form(""), 
-        subject: str = Form(""), 
-        file: Optional[UploadFile] = File(None)
+        body: str = "", 
+        subject: str = "", 
+        file: Optional[UploadedFile] = None
     ) -> EmailResponse:
         """Processa um email e retorna a análise"""
         try:
@@ -46,19 +50,54 @@ class EmailController:
                 erro=str(e)
             )
     
-    async def extract_text_from_file(self, file: UploadFile = File(...)) -> FileUploadResponse:
-        """Extrai texto de um arquivo"""
+    async def process_email_stream(
+        self,
+        body: str = "",
+        subject: str = "",
+        file: Optional[UploadedFile] = None
+    ) -> AsyncIterator[str]:
+        """Processa um email emitindo eventos SSE: categoria, trechos da resposta e resultado final"""
         try:
-            file_content = await file.read()
-            await file.seek(0)
+            async for event in self._process_email_use_case.execute_stream(body, subject, file):
+                yield self._format_event(event)
+                
+        except Exception as e:
+            error = EmailResponse(
+                categoria="Erro",
+                resposta="Desculpe, ocorreu um erro interno. Tente novamente mais tarde.",
+                erro=str(e)
+            )
+            yield self._sse(StreamEventType.RESULT.value, error.model_dump(exclude_none=True))
+    
+    async def process_email_batch(
+        self,
+        emails: List[EmailRequest],
+        files: Optional[List[UploadedFile]] = None
+    ) -> BatchEmailResponse:
+        """Processa vários emails e retorna as análises na mesma ordem"""
+        try:
+            results = await self._process_email_use_case.execute_batch(
+                [(email.body, email.subject) for email in emails],
+                files
+            )
             
-            file_info = FileInfo(
-                filename=file.filename or "",
-                content_type=file.content_type,
-                size=len(file_content)
+            return BatchEmailResponse(
+                resultados=[EmailResponse(**result.to_dict()) for result in results],
+                total=len(results)
             )
             
-            extracted_text = self._file_parser_factory.parse_file(file_content, file_info)
+        except Exception as e:
+            return BatchEmailResponse(
+                resultados=[],
+                total=0,
+                erro=str(e)
+            )
+    
+    async def extract_text_from_file(self, file: UploadedFile) -> FileUploadResponse:
+        """Extrai texto de um arquivo"""
+        try:
+            file_info = file.get_info()
+            extracted_text = await self._file_parser_factory.parse_file_async(file.content, file_info)
             
             return FileUploadResponse(
                 filename=file_info.filename,
@@ -69,6 +108,18 @@ class EmailController:
                 status="success"
             )
             
+        except FileParsingError as e:
+            return FileUploadResponse(
+                filename=file.filename or "unknown",
+                content_type=file.content_type,
+                extracted_text="",
+                text_length=0,
+                extraction_success=False,
+                status="error",
+                error=e.message,
+                error_code=e.code
+            )
+            
         except Exception as e:
             return FileUploadResponse(
                 filename=file.filename or "unknown",
@@ -79,7 +130,7 @@ class EmailController:
                 status="error"
             )
     
-    def preprocess_text(self, body: str = Form(...)) -> PreprocessResponse:
+    def preprocess_text(self, body: str) -> PreprocessResponse:
         """Testa o pré-processamento de texto"""
         try:
             processed_text = self._text_processor.preprocess_text(body)
@@ -99,6 +150,20 @@ class EmailController:
                 status="error"
             )
     
+    def _format_event(self, event: AnalysisStreamEvent) -> str:
+        """Converte o evento da análise no formato Server-Sent Events"""
+        if event.type is StreamEventType.CATEGORY:
+            return self._sse(event.type.value, {"categoria": event.text})
+        
+        if event.type is StreamEventType.DELTA:
+            return self._sse(event.type.value, {"texto": event.text})
+        
+        return self._sse(event.type.value, EmailResponse(**event.result.to_dict()).model_dump(exclude_none=True))
+    
+    @staticmethod
+    def _sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
     def health_check(self) -> HealthResponse:
         """Endpoint de health check"""
         return HealthResponse(
@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from ...domain.entities.file import UploadedFile
+from ...domain.entities.job import JobRequest
+from ...infrastructure.jobs.job_queue import JobQueue
+from ..models.responses import EmailRequest, JobResponse, JobSubmittedResponse
+
+
+class JobController:
+    """Controller para os endpoints de jobs assíncronos"""
+    
+    def __init__(self, job_queue: JobQueue):
+        self._job_queue = job_queue
+    
+    async def submit(
+        self,
+        emails: List[EmailRequest],
+        files: Optional[List[UploadedFile]] = None
+    ) -> JobSubmittedResponse:
+        """Enfileira o processamento; JobQueueFullError se a fila estiver cheia"""
+        job = await self._job_queue.submit(JobRequest(
+            emails=[(email.body, email.subject) for email in emails],
+            files=files or []
+        ))
+        
+        return JobSubmittedResponse(id=job.id, status=job.status.value, url=f"/jobs/{job.id}")
+    
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        """Estado do job (None se não existir ou já tiver expirado)"""
+        job = await self._job_queue.get(job_id)
+        
+        if job is None:
+            return None
+        
+        return JobResponse(**job.to_dict())
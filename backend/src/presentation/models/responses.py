@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class EmailRequest(BaseModel):
@@ -13,6 +13,15 @@ class EmailResponse(BaseModel):
     categoria: str
     resposta: str
     erro: Optional[str] = None
+    codigo_erro: Optional[str] = None
+    tokens_prompt: Optional[int] = None
+
+
+class BatchEmailResponse(BaseModel):
+    """Modelo de resposta do processamento de emails em lote"""
+    resultados: List[EmailResponse]
+    total: int
+    erro: Optional[str] = None
 
 
 class FileUploadResponse(BaseModel):
@@ -23,6 +32,8 @@ class FileUploadResponse(BaseModel):
     text_length: int
     extraction_success: bool
     status: str
+    error: Optional[str] = None
+    error_code: Optional[str] = None
 
 
 class PreprocessResponse(BaseModel):
@@ -37,3 +48,23 @@ class HealthResponse(BaseModel):
     """Resposta do health check"""
     message: str
     status: str
+
+
+class JobSubmittedResponse(BaseModel):
+    """Resposta da criação de um job assíncrono"""
+    id: str
+    status: str
+    url: str
+
+
+class JobResponse(BaseModel):
+    """Estado de um job: resultado (mesmo JSON de /processar ou /processar/lote) quando concluído"""
+    id: str
+    status: str
+    criado_em: float
+    itens: int
+    bytes_entrada: int
+    tentativas: int
+    tempos: Dict[str, float]
+    resultado: Optional[dict] = None
+    erro: Optional[str] = None
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from benchmarks.fakes import FakeAIService
+from src.domain.entities.email import EmailAnalysisResult, EmailCategory
+from src.infrastructure.bulk.bulk_classifier import BulkClassifier, BulkProgress, JsonlResultWriter
+from src.infrastructure.bulk.mail_sources import iter_mail_items
+
+OK = EmailAnalysisResult(category=EmailCategory.PRODUCTIVE, response="Vamos verificar.")
+FAILED = EmailAnalysisResult(category=EmailCategory.PRODUCTIVE, response="Tente novamente.", error="falha", error_code="ia_timeout")
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def interrupted_checkpoint(path, done, partial_id):
+    """Checkpoint de uma execução interrompida no meio da escrita da linha de `partial_id`"""
+    writer = JsonlResultWriter(str(path))
+    for item_id in done:
+        writer.write(item_id, OK)
+    writer.close()
+    
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": partial_id, **OK.to_dict()}, ensure_ascii=False)[:20])
+    return path.stat().st_size
+
+
+def test_resume_truncates_the_partial_last_line(tmp_path):
+    path = tmp_path / "resultados.jsonl"
+    size = interrupted_checkpoint(path, ["a", "b", "c"], "d")
+    
+    writer = JsonlResultWriter(str(path))
+    
+    assert writer.completed == {"a", "b", "c"}
+    assert path.stat().st_size < size
+    
+    writer.write("d", OK)
+    writer.close()
+    # A linha nova começa em uma linha própria: o arquivo continua JSONL válido
+    assert [record["id"] for record in lines(path)] == ["a", "b", "c", "d"]
+
+
+def test_retry_errors_uses_the_last_line_of_each_id(tmp_path):
+    path = tmp_path / "resultados.jsonl"
+    writer = JsonlResultWriter(str(path))
+    writer.write("a", FAILED)
+    writer.write("b", FAILED)
+    writer.write("a", OK)
+    writer.close()
+    
+    assert JsonlResultWriter(str(path)).completed == {"a", "b"}
+    assert JsonlResultWriter(str(path), retry_errors=True).completed == {"a"}
+
+
+def test_resumed_run_classifies_only_the_missing_messages(tmp_path):
+    source = tmp_path / "caixa"
+    source.mkdir()
+    for index in range(5):
+        (source / f"{index}.txt").write_text(f"Preciso do status do chamado {index}, aberto na semana passada.")
+    path = tmp_path / "resultados.jsonl"
+    interrupted_checkpoint(path, ["0.txt", "1.txt", "2.txt"], "3.txt")
+    
+    ai_service = FakeAIService(latency=0)
+    writer = JsonlResultWriter(str(path))
+    classifier = BulkClassifier(ai_service, workers=1, ai_concurrency=2)
+    
+    try:
+        asyncio.run(classifier.run(
+            iter_mail_items(str(source), skip=writer.completed),
+            writer,
+            BulkProgress(stream=None, skipped=len(writer.completed))
+        ))
+    finally:
+        writer.close()
+    
+    records = lines(path)
+    assert ai_service.calls == 2
+    assert sorted(record["id"] for record in records) == [f"{index}.txt" for index in range(5)]
+    assert all(record["categoria"] == "Produtivo" for record in records[3:])
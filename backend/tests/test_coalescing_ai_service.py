@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from src.domain.entities.email import Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from src.domain.exceptions import AIServiceError
+from src.domain.services.interfaces import AIServiceInterface
+from src.infrastructure.cache.coalescing_ai_service import CoalescingAIService
+
+TEXT = "Solicito atualização do chamado 123 aberto na semana passada."
+
+
+class GatedAIService(AIServiceInterface):
+    """Upstream falso que só responde quando o teste libera o portão"""
+    
+    def __init__(self, fail: bool = False):
+        self.gate = asyncio.Event()
+        self.fail = fail
+        self.calls = 0
+        self.batches = []
+        self.finished = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        self.calls += 1
+        await self.gate.wait()
+        self.finished += 1
+        if self.fail:
+            raise AIServiceError("ia_indisponivel", "falha simulada")
+        return EmailAnalysisResult(category=EmailCategory.PRODUCTIVE, response=processed_text.processed)
+    
+    async def analyze_batch(self, items):
+        self.batches.append([processed_text.processed for _, processed_text in items])
+        return [await self.analyze_email(email, processed_text) for email, processed_text in items]
+
+
+def item(text: str = TEXT):
+    return Email(content=text), ProcessedText(text, text)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_requests_share_one_call():
+    upstream = GatedAIService()
+    service = CoalescingAIService(upstream)
+    
+    async def run():
+        tasks = [asyncio.ensure_future(service.analyze_email(*item())) for _ in range(5)]
+        await settle()
+        upstream.gate.set()
+        return await asyncio.gather(*tasks)
+    
+    results = asyncio.run(run())
+    
+    assert upstream.calls == 1
+    assert all(result is results[0] for result in results)
+    assert service.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+
+def test_cancelling_the_first_caller_keeps_the_shared_call():
+    upstream = GatedAIService()
+    service = CoalescingAIService(upstream)
+    
+    async def run():
+        first = asyncio.ensure_future(service.analyze_email(*item()))
+        await settle()
+        second = asyncio.ensure_future(service.analyze_email(*item()))
+        await settle()
+        
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        
+        upstream.gate.set()
+        return await second
+    
+    result = asyncio.run(run())
+    
+    assert result.response == TEXT
+    assert upstream.calls == 1
+    assert upstream.finished == 1
+    assert service.stats()["in_flight"] == 0
+
+
+def test_call_finishes_and_is_forgotten_when_every_caller_gives_up():
+    upstream = GatedAIService()
+    service = CoalescingAIService(upstream)
+    
+    async def run():
+        tasks = [asyncio.ensure_future(service.analyze_email(*item())) for _ in range(2)]
+        await settle()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert service.stats()["in_flight"] == 1
+        
+        upstream.gate.set()
+        await settle()
+    
+    asyncio.run(run())
+    
+    assert upstream.finished == 1
+    assert service.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    upstream = GatedAIService(fail=True)
+    service = CoalescingAIService(upstream)
+    
+    async def run():
+        tasks = [asyncio.ensure_future(service.analyze_email(*item())) for _ in range(3)]
+        await settle()
+        upstream.gate.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results = asyncio.run(run())
+    
+    assert all(isinstance(result, AIServiceError) for result in results)
+    assert upstream.calls == 1
+    # A próxima requisição tenta de novo em vez de reaproveitar a falha
+    upstream.fail = False
+    assert asyncio.run(run())[0].response == TEXT
+    assert upstream.calls == 2
+
+
+def test_cancelled_batch_still_resolves_items_shared_with_single_requests():
+    upstream = GatedAIService()
+    service = CoalescingAIService(upstream)
+    other = "Segue em anexo o relatório mensal de vendas."
+    
+    async def run():
+        batch = asyncio.ensure_future(service.analyze_batch([item(), item(other), item()]))
+        await settle()
+        single = asyncio.ensure_future(service.analyze_email(*item(other)))
+        await settle()
+        
+        batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batch
+        
+        upstream.gate.set()
+        return await single
+    
+    result = asyncio.run(run())
+    
+    assert result.response == other
+    # A duplicata dentro do lote e a requisição avulsa não geram chamadas extras
+    assert upstream.batches == [[TEXT, other]]
+    assert service.stats() == {"in_flight": 0, "calls": 2, "coalesced": 2}
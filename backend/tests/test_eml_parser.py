@@ -0,0 +1,64 @@
+import pytest
+
+from benchmarks.corpus import make_eml
+from src.infrastructure.parsers import eml_parser
+from src.infrastructure.parsers.eml_parser import EMLParser
+
+BODY = "Olá, preciso da segunda via da fatura de março. Obrigado, João"
+
+
+class CountingFeedParser(eml_parser.BytesFeedParser):
+    """Feed parser que soma os bytes recebidos"""
+    
+    fed = 0
+    
+    def feed(self, data):
+        CountingFeedParser.fed += len(data)
+        super().feed(data)
+
+
+@pytest.fixture
+def counting_parser(monkeypatch):
+    CountingFeedParser.fed = 0
+    monkeypatch.setattr(eml_parser, "BytesFeedParser", CountingFeedParser)
+    return CountingFeedParser
+
+
+@pytest.mark.parametrize("cte, charset", [("base64", "utf-8"), ("quoted-printable", "iso-8859-1"), ("8bit", "utf-8")])
+def test_decodes_transfer_encodings_and_charsets(cte, charset):
+    text = EMLParser().parse(make_eml(BODY, subject="Fatura de março", cte=cte, charset=charset))
+    
+    assert text.startswith("Assunto: Fatura de março\nDe: Cliente <cliente@empresa.com.br>")
+    assert BODY in text
+
+
+def test_stops_feeding_after_the_first_text_part(counting_parser):
+    attachments = [b"\x00" * 512 * 1024 for _ in range(4)]
+    content = make_eml(BODY, attachments=attachments)
+    
+    assert BODY in EMLParser().parse(content)
+    # Os anexos depois do corpo não chegam ao parser
+    assert counting_parser.fed < len(content) / 4
+
+
+def test_attachments_before_the_text_are_not_kept(counting_parser):
+    content = make_eml(BODY, attachments=[b"\x01" * 256 * 1024, b"\x02" * 256 * 1024], text_last=True)
+    parser = EMLParser()
+    
+    message, scanner = parser._scan_message(content)
+    attachments = [part for part in message.walk() if part.is_attachment()]
+    
+    assert len(attachments) == 2
+    assert all(part.get_payload() == "" for part in attachments)
+    assert BODY in parser._extract_body(scanner)
+    assert counting_parser.fed == len(content)
+
+
+def test_falls_back_to_html_when_there_is_no_plain_text():
+    html = "<html><body><p>Bom dia,</p><p>segue o relat&oacute;rio&nbsp;mensal.</p><script>x()</script></body></html>"
+    content = make_eml(BODY, html=html).replace(b"text/plain", b"text/x-ignorado")
+    
+    text = EMLParser().parse(content)
+    
+    assert "segue o relatório mensal." in text
+    assert "x()" not in text
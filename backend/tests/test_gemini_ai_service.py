@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+from benchmarks.fakes import FakeGeminiModel, QuotaFakeGeminiModel
+from src.domain.entities.email import Email, ProcessedText
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+
+
+class DroppingModel(FakeGeminiModel):
+    """Responde os lotes sem o email `dropped_id` (e registra os prompts recebidos)"""
+    
+    def __init__(self, dropped_id: int, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.dropped_id = dropped_id
+        self.prompts = []
+    
+    def _answer(self, prompt, fail: bool = False) -> str:
+        self.prompts.append(str(prompt))
+        answer = json.loads(super()._answer(prompt, fail))
+        if isinstance(answer, list):
+            answer = [item for item in answer if item["id"] != self.dropped_id]
+        return json.dumps(answer, ensure_ascii=False)
+
+
+def items(count: int):
+    bodies = [f"Preciso do status do chamado {1000 + index}, aberto na semana passada." for index in range(count)]
+    return [(Email(content=body), ProcessedText(body, body)) for body in bodies]
+
+
+def test_concurrent_calls_stay_within_the_semaphore():
+    model = QuotaFakeGeminiModel(requests_per_window=1000, latency=0.05)
+    service = GeminiAIService("teste", model=model, max_concurrency=3)
+    
+    async def run():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        
+        task = asyncio.ensure_future(ticker())
+        start = time.monotonic()
+        results = await asyncio.gather(*(service.analyze_email(email, text) for email, text in items(9)))
+        elapsed = time.monotonic() - start
+        task.cancel()
+        return results, elapsed, ticks
+    
+    results, elapsed, ticks = asyncio.run(run())
+    
+    assert all(result.error is None for result in results)
+    assert model.peak_in_flight == 3
+    # 9 chamadas de 50 ms, 3 por vez: ~150 ms, não os ~450 ms de uma por vez
+    assert elapsed < 0.35
+    # O event loop continua livre durante as chamadas
+    assert ticks >= 10
+
+
+def test_batch_is_split_by_item_count_and_token_budget():
+    model = FakeGeminiModel(latency=0)
+    service = GeminiAIService("teste", model=model, batch_max_items=3)
+    
+    results = asyncio.run(service.analyze_batch(items(7)))
+    
+    assert len(results) == 7 and all(result.error is None for result in results)
+    # Grupos de 3, 3 e 1 (o último vira uma chamada individual)
+    assert model.calls == 3
+    
+    model = FakeGeminiModel(latency=0)
+    service = GeminiAIService("teste", model=model, batch_token_budget=1)
+    asyncio.run(service.analyze_batch(items(4)))
+    # Nenhum par de emails cabe no orçamento: uma chamada por email
+    assert model.calls == 4
+
+
+def test_items_missing_from_the_batch_answer_fall_back_to_single_calls():
+    model = DroppingModel(dropped_id=1)
+    service = GeminiAIService("teste", model=model)
+    batch = items(3)
+    
+    results = asyncio.run(service.analyze_batch(batch))
+    
+    assert all(result.error is None for result in results)
+    assert model.calls == 2
+    assert "--- Email 2 ---" in model.prompts[0]
+    # A chamada individual é para o email que faltou na resposta do lote
+    assert "--- Email" not in model.prompts[1]
+    assert batch[1][0].content in model.prompts[1]
@@ -0,0 +1,229 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeUpstreamError, QuotaFakeGeminiModel
+from src.infrastructure.external.gemini_client_pool import GeminiClientPool, PooledClient
+from src.infrastructure.resilience.adaptive_limiter import AdaptiveConcurrencyLimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class StreamingModel:
+    """Modelo que transmite dois trechos; opcionalmente falha ou trava depois do primeiro"""
+    
+    def __init__(self, after_first: str = "ok"):
+        self.after_first = after_first
+    
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        async def chunks():
+            yield "primeiro"
+            if self.after_first == "erro":
+                raise FakeUpstreamError(500, "conexão interrompida")
+            if self.after_first == "trava":
+                await asyncio.Event().wait()
+            yield "segundo"
+        
+        return chunks()
+
+
+def make_pool(*models, **limit_options):
+    options = dict(initial_limit=4, cooldown_seconds=0.05, max_cooldown_seconds=0.2)
+    options.update(limit_options)
+    return GeminiClientPool([
+        PooledClient(name=f"chave{index}", model=model, limit=AdaptiveConcurrencyLimit(**options))
+        for index, model in enumerate(models)
+    ])
+
+
+def in_flight(pool: GeminiClientPool) -> int:
+    return sum(client["in_flight"] for client in pool.stats()["clients"].values())
+
+
+def test_limit_grows_on_success_and_backs_off_on_429():
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(initial_limit=4, cooldown_seconds=1.0, max_cooldown_seconds=8.0, clock=clock)
+    
+    for _ in range(4):
+        limit.acquire()
+        limit.on_success(0.1)
+    assert limit.limit == 8
+    
+    limit.acquire()
+    limit.on_overload()
+    assert limit.limit == 4
+    assert not limit.available()
+    assert limit.stats()["paused"]
+    
+    # Respostas da mesma rajada não reduzem de novo nem alongam a pausa
+    limit.acquire()
+    limit.on_overload()
+    assert limit.limit == 4
+    assert limit.paused_until == 1.0
+    
+    clock.now = 1.0
+    assert limit.available()
+    clock.now = 2.0
+    limit.acquire()
+    limit.on_overload()
+    # 429 seguido após o fim da pausa: a pausa dobra
+    assert limit.paused_until == 2.0 + 2.0
+    assert limit.limit == 2
+
+
+def test_limit_backs_off_when_latency_grows():
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(initial_limit=10, clock=clock)
+    
+    for _ in range(20):
+        clock.now += 1
+        limit.acquire()
+        limit.on_success(0.1)
+    grown = limit.limit
+    
+    clock.now += 1
+    limit.acquire()
+    limit.on_success(1.0)
+    
+    assert limit.limit < grown
+    assert limit.stats()["decreases"] == 1
+
+
+def test_fails_over_to_an_untried_client_on_quota_exhaustion():
+    exhausted = QuotaFakeGeminiModel(requests_per_window=0, latency=0.001)
+    healthy = QuotaFakeGeminiModel(requests_per_window=100, latency=0.001)
+    pool = make_pool(exhausted, healthy)
+    
+    response = asyncio.run(pool.generate_content_async("prompt"))
+    stats = pool.stats()
+    
+    assert response.text == QuotaFakeGeminiModel.DEFAULT_RESPONSE
+    assert stats["failovers"] >= 1
+    assert stats["clients"]["chave0"]["overloads"] == 1
+    assert stats["clients"]["chave0"]["paused"]
+    assert stats["clients"]["chave1"]["successes"] == 1
+    assert in_flight(pool) == 0
+
+
+def test_raises_429_after_trying_every_client():
+    pool = make_pool(*(QuotaFakeGeminiModel(requests_per_window=0) for _ in range(3)))
+    
+    with pytest.raises(FakeUpstreamError) as info:
+        asyncio.run(pool.generate_content_async("prompt"))
+    
+    assert info.value.code == 429
+    assert sum(client["calls"] for client in pool.stats()["clients"].values()) == 3
+    assert in_flight(pool) == 0
+
+
+def test_waits_for_a_free_slot():
+    model = QuotaFakeGeminiModel(requests_per_window=100, latency=0.02)
+    pool = make_pool(model, initial_limit=1, max_limit=1)
+    
+    async def run():
+        return await asyncio.gather(*(pool.generate_content_async("prompt") for _ in range(3)))
+    
+    assert len(asyncio.run(run())) == 3
+    assert model.peak_in_flight == 1
+    assert pool.stats()["waits"] >= 1
+
+
+def test_stream_holds_the_slot_until_it_finishes():
+    pool = make_pool(StreamingModel())
+    
+    async def run():
+        stream = await pool.generate_content_async("prompt", stream=True)
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk)
+            assert in_flight(pool) == 1
+        return chunks
+    
+    assert asyncio.run(run()) == ["primeiro", "segundo"]
+    assert in_flight(pool) == 0
+    assert pool.stats()["clients"]["chave0"]["successes"] == 1
+
+
+def test_stream_error_releases_the_slot():
+    pool = make_pool(StreamingModel(after_first="erro"))
+    
+    async def run():
+        stream = await pool.generate_content_async("prompt", stream=True)
+        async for _ in stream:
+            pass
+    
+    with pytest.raises(FakeUpstreamError):
+        asyncio.run(run())
+    assert in_flight(pool) == 0
+    assert pool.stats()["clients"]["chave0"]["successes"] == 0
+
+
+def test_cancelled_stream_releases_the_slot():
+    pool = make_pool(StreamingModel(after_first="trava"))
+    
+    async def run():
+        async def consume():
+            stream = await pool.generate_content_async("prompt", stream=True)
+            async for _ in stream:
+                pass
+        
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        assert in_flight(pool) == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(run())
+    assert in_flight(pool) == 0
+
+
+def test_cancelled_call_releases_the_slot():
+    pool = make_pool(QuotaFakeGeminiModel(requests_per_window=100, latency=5.0))
+    
+    async def run():
+        task = asyncio.ensure_future(pool.generate_content_async("prompt"))
+        await asyncio.sleep(0.01)
+        assert in_flight(pool) == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(run())
+    assert in_flight(pool) == 0
+
+
+def test_only_extra_keys_use_the_keyed_model():
+    created = []
+    
+    def factory(kind):
+        return lambda api_key, model_name: created.append((kind, api_key, model_name)) or kind
+    
+    pool = GeminiClientPool.from_config(
+        ["principal", "extra"],
+        ["modelo"],
+        limit_factory=AdaptiveConcurrencyLimit,
+        model_factory=factory("chave_extra"),
+        primary_model_factory=factory("publico")
+    )
+    
+    assert pool.size == 2
+    assert created == [("publico", "principal", "modelo"), ("chave_extra", "extra", "modelo")]
+
+
+def test_sdk_internals_used_by_keyed_model_still_exist():
+    # Quebra aqui ao atualizar o google-generativeai: as chaves extras dependem de atributos privados do SDK
+    pytest.importorskip("google.generativeai")
+    from src.infrastructure.external.gemini_client_pool import KeyedGeminiModel
+    
+    model = KeyedGeminiModel("chave-de-teste", "gemini-1.5-flash")
+    
+    assert hasattr(model._clients, "get_default_client")
+    assert model._model._client is None
+    assert model._model._async_client is None
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from benchmarks.corpus import EDGE_CASES, large_text, preprocess_corpus
+from benchmarks.reference_preprocessor import ReferenceTextProcessor
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+from src.infrastructure.external.preprocessing_pool import PreprocessingPool
+
+# Caracteres que exercitam as regex de limpeza (emails, URLs, telefones, acentos, controle)
+FUZZ_ALPHABET = (
+    "abcdeiosuçãáéíóúâêôõàüñABCÇÃÉ0123456789 .,;:!?@/-_()#&=%+*\n\t\r\x00"
+    "ßİǅŒæ€߀😀中"
+)
+FUZZ_FRAGMENTS = ["http://", "https://", "www.", ".com.br", "@mail.com", "(11) 9", "-", "ção", "mente", "ando"]
+
+
+def fuzz_corpus(size: int = 300, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = []
+        for _ in range(rng.randint(1, 40)):
+            if rng.random() < 0.2:
+                parts.append(rng.choice(FUZZ_FRAGMENTS))
+            else:
+                parts.append("".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 12))))
+        corpus.append("".join(parts))
+    return corpus
+
+
+CORPUS = list(EDGE_CASES) + preprocess_corpus(150, seed=42) + fuzz_corpus() + [large_text(200_000)]
+
+
+@pytest.fixture(scope="module")
+def processors():
+    return HybridTextProcessor(), ReferenceTextProcessor()
+
+
+@pytest.mark.parametrize("index", range(len(CORPUS)))
+def test_matches_reference_implementation(processors, index):
+    current, reference = processors
+    text = CORPUS[index]
+    
+    assert current.preprocess_text(text).processed == reference.preprocess_text(text).processed
+
+
+def test_batch_matches_single_calls(processors):
+    current, _ = processors
+    
+    assert current.preprocess_batch(iter(CORPUS)) == [current.preprocess_text(text) for text in CORPUS]
+
+
+def test_pooled_batch_matches_serial_batch(processors):
+    current, _ = processors
+    pool = PreprocessingPool(max_workers=2, chunks_per_worker=3)
+    pooled = HybridTextProcessor(batch_pool=pool, parallel_threshold=1)
+    
+    try:
+        assert pooled.preprocess_batch(CORPUS) == current.preprocess_batch(CORPUS)
+        assert pool.stats()["texts"] == len(CORPUS)
+    finally:
+        pooled.shutdown()
@@ -0,0 +1,168 @@
+import asyncio
+import importlib
+import sqlite3
+
+from src.domain.entities.job import JobRequest, JobStatus
+from src.infrastructure.jobs.job_queue import JobQueue
+from src.infrastructure.jobs.job_store import SQLiteJobStore
+
+
+def request(body: str = "Preciso do status do chamado 123") -> JobRequest:
+    return JobRequest(emails=[(body, "")])
+
+
+async def handler(job_request: JobRequest) -> dict:
+    return {"emails": len(job_request.emails)}
+
+
+class FlakyJobStore(SQLiteJobStore):
+    """Armazenamento cujo primeiro claim falha como um banco travado por outro processo"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.claim_failures = 1
+    
+    def claim(self, job_id):
+        if self.claim_failures:
+            self.claim_failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().claim(job_id)
+
+
+async def wait_finished(queue: JobQueue, job_ids, timeout: float = 5.0):
+    async def poll():
+        while True:
+            jobs = [await queue.get(job_id) for job_id in job_ids]
+            if all(job.status in (JobStatus.DONE, JobStatus.FAILED) for job in jobs):
+                return jobs
+            await asyncio.sleep(0.01)
+    
+    return await asyncio.wait_for(poll(), timeout)
+
+
+def test_worker_survives_store_errors(tmp_path):
+    store = FlakyJobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store, handler, workers=1)
+    
+    async def run():
+        first = await queue.submit(request())
+        second = await queue.submit(request())
+        jobs = await wait_finished(queue, [first.id, second.id])
+        await queue.stop()
+        return jobs
+    
+    first, second = asyncio.run(run())
+    queue.close()
+    
+    assert first.status is JobStatus.FAILED
+    assert "database is locked" in first.error
+    assert second.status is JobStatus.DONE
+    assert second.result == {"emails": 1}
+
+
+def test_stop_releases_the_lease_of_running_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    started = []
+    
+    async def stuck_handler(job_request: JobRequest) -> dict:
+        started.append(job_request)
+        await asyncio.Event().wait()
+    
+    queue = JobQueue(SQLiteJobStore(path), stuck_handler, workers=1)
+    
+    async def run():
+        job = await queue.submit(request())
+        while not started:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+    
+    job = asyncio.run(run())
+    queue.close()
+    
+    store = SQLiteJobStore(path)
+    released = store.get(job.id)
+    assert released.status is JobStatus.QUEUED
+    assert released.attempts == 0
+    
+    # A próxima inicialização retoma o job sem esperar a concessão expirar
+    restarted = JobQueue(store, handler, workers=1)
+    
+    async def resume():
+        await restarted.start()
+        jobs = await wait_finished(restarted, [job.id])
+        await restarted.stop()
+        return jobs[0]
+    
+    resumed = asyncio.run(resume())
+    restarted.close()
+    
+    assert resumed.status is JobStatus.DONE
+    assert resumed.attempts == 1
+
+
+def test_recover_skips_jobs_leased_by_a_live_process(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    running = SQLiteJobStore(path, lease_seconds=300)
+    job = running.create(request())
+    queued = running.create(request())
+    assert running.claim(job.id) is not None
+    
+    # Outro worker do uvicorn reinicia com o mesmo banco: não repete o job em andamento
+    restarted = SQLiteJobStore(path, lease_seconds=300)
+    assert restarted.recover() == [queued.id]
+    assert restarted.get(job.id).status is JobStatus.RUNNING
+    
+    running.close()
+    restarted.close()
+
+
+def test_expired_lease_goes_back_to_the_queue(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    crashed = SQLiteJobStore(path, lease_seconds=0)
+    job = crashed.create(request())
+    assert crashed.claim(job.id) is not None
+    crashed.close()
+    
+    store = SQLiteJobStore(path)
+    assert store.requeue_expired() == [job.id]
+    assert store.requeue_expired() == []
+    assert store.get(job.id).status is JobStatus.QUEUED
+    assert store.claim(job.id) is not None
+    assert store.get(job.id).attempts == 2
+    store.close()
+
+
+def test_adds_lease_column_to_existing_database(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        """
+        CREATE TABLE jobs (
+            id TEXT PRIMARY KEY, status TEXT NOT NULL, emails TEXT NOT NULL, items INTEGER NOT NULL,
+            input_bytes INTEGER NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,
+            started_at REAL, finished_at REAL, result TEXT, error TEXT
+        )
+        """
+    )
+    connection.execute(
+        "INSERT INTO jobs (id, status, emails, items, input_bytes, created_at) VALUES ('antigo', ?, '[]', 0, 0, 0)",
+        (JobStatus.RUNNING.value,)
+    )
+    connection.commit()
+    connection.close()
+    
+    store = SQLiteJobStore(path)
+    assert store.recover() == ["antigo"]
+    store.close()
+
+
+def test_jobs_disabled_by_default_on_vercel(monkeypatch):
+    import config
+    
+    monkeypatch.delenv("JOBS_ENABLED", raising=False)
+    monkeypatch.setenv("VERCEL", "1")
+    assert importlib.reload(config).JobConfig.ENABLED is False
+    
+    monkeypatch.delenv("VERCEL")
+    assert importlib.reload(config).JobConfig.ENABLED is True
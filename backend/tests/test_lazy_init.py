@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("google.generativeai", "PyPDF2")
+
+# Sobe o app, atende rotas que não usam IA nem PDF e informa quais módulos pesados foram importados
+SCRIPT = """
+import asyncio
+import json
+import sys
+
+import httpx
+
+import main
+
+
+async def run():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+        statuses = [
+            (await client.get("/health")).status_code,
+            (await client.post("/preprocess", data={"body": "Preciso do status do chamado 123"})).status_code,
+        ]
+    return statuses
+
+
+statuses = asyncio.run(run())
+print(json.dumps({"statuses": statuses, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def start_app(lazy: bool) -> dict:
+    env = dict(
+        os.environ,
+        LAZY_INIT="true" if lazy else "false",
+        GEMINI_API_KEY="teste",
+        JOBS_ENABLED="false",
+        RATE_LIMIT_ENABLED="false"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_lazy_init_does_not_import_the_sdk_or_the_pdf_library():
+    report = start_app(lazy=True)
+    
+    assert report["statuses"] == [200, 200]
+    assert report["loaded"] == []
+
+
+def test_eager_init_imports_the_sdk():
+    # Controle: sem LAZY_INIT o SDK é importado na inicialização
+    report = start_app(lazy=False)
+    
+    assert report["statuses"] == [200, 200]
+    assert "google.generativeai" in report["loaded"]
@@ -0,0 +1,97 @@
+import asyncio
+
+from benchmarks.corpus import TEMPLATES, template_emails
+from benchmarks.fakes import FakeAIService
+from src.domain.entities.email import Email, EmailCategory, ProcessedText
+from src.infrastructure.classification.fast_path_ai_service import FastPathAIService
+from src.infrastructure.classification.local_fallback_ai_service import LocalFallbackAIService
+from src.infrastructure.classification.naive_bayes_classifier import NaiveBayesClassifier
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+
+TRAINING_PATH = "data/training_examples.jsonl"
+PROCESSOR = HybridTextProcessor()
+
+CONFIDENT = "Feliz natal e um próspero ano novo para toda a equipe! Agradeço a parceria. Abraços"
+# Sinais das duas categorias misturados: quem decide é a IA
+AMBIGUOUS = "Feliz natal! Segue o boleto da fatura com erro no sistema. Abraços e obrigado"
+
+
+def processed(text: str) -> ProcessedText:
+    return PROCESSOR.preprocess_text(text)
+
+
+def trained() -> NaiveBayesClassifier:
+    return NaiveBayesClassifier.from_jsonl(TRAINING_PATH, PROCESSOR, target_precision=0.98)
+
+
+def test_confidence_does_not_saturate_with_length():
+    classifier = trained()
+    tokens = processed(AMBIGUOUS).processed.split()
+    
+    _, short = classifier.predict(tokens)
+    _, repeated = classifier.predict(tokens * 50)
+    
+    assert repeated < classifier.confidence_threshold
+    assert abs(repeated - short) < 0.05
+
+
+def test_fitted_threshold_meets_the_target_precision_on_held_out_emails():
+    classifier = trained()
+    local = []
+    
+    for template, text in template_emails(300):
+        category, confidence = classifier.predict(processed(text).processed.split())
+        if confidence >= classifier.confidence_threshold:
+            local.append(category == EmailCategory(TEMPLATES[template][0]))
+    
+    assert 0.5 < classifier.confidence_threshold < 1.0
+    assert len(local) >= 100
+    assert sum(local) / len(local) >= 0.98
+
+
+def test_threshold_stays_closed_when_the_target_is_unreachable():
+    tokens = "relatorio mensal contrato".split()
+    documents = [(tokens, category) for category in EmailCategory for _ in range(5)]
+    
+    assert NaiveBayesClassifier.fit_threshold(documents, target_precision=0.98) == 1.0
+
+
+def test_fast_path_answers_confident_emails_and_delegates_the_rest():
+    upstream = FakeAIService(latency=0)
+    service = FastPathAIService(upstream, trained())
+    
+    local = asyncio.run(service.analyze_email(Email(content=CONFIDENT), processed(CONFIDENT)))
+    assert local.category is EmailCategory.UNPRODUCTIVE
+    assert local.response == FastPathAIService.REPLY_TEMPLATES[EmailCategory.UNPRODUCTIVE]
+    assert upstream.calls == 0
+    
+    delegated = asyncio.run(service.analyze_email(Email(content=AMBIGUOUS), processed(AMBIGUOUS)))
+    assert delegated.response == FakeAIService.RESPONSE
+    assert upstream.calls == 1
+    assert service.stats()["local"] == 1 and service.stats()["delegated"] == 1
+
+
+def test_fast_path_batch_sends_only_uncertain_emails_upstream():
+    upstream = FakeAIService(latency=0)
+    service = FastPathAIService(upstream, trained())
+    items = [(Email(content=text), processed(text)) for text in (CONFIDENT, AMBIGUOUS, CONFIDENT)]
+    
+    results = asyncio.run(service.analyze_batch(items))
+    
+    assert [result.response == FakeAIService.RESPONSE for result in results] == [False, True, False]
+    assert upstream.calls == 1
+    assert service.stats()["delegated"] == 1
+
+
+def test_local_fallback_answers_whatever_the_confidence():
+    service = LocalFallbackAIService(trained())
+    
+    confident = asyncio.run(service.analyze_email(Email(content=CONFIDENT), processed(CONFIDENT)))
+    unknown = asyncio.run(service.analyze_email(Email(content="xyzw qwerty"), ProcessedText("xyzw qwerty", "xyzw qwerty")))
+    
+    assert confident.category is EmailCategory.UNPRODUCTIVE
+    assert confident.error_code == LocalFallbackAIService.ERROR_CODE
+    # Sem nenhum token conhecido: categoria padrão, ainda marcada como degradada
+    assert unknown.category is EmailCategory.PRODUCTIVE
+    assert unknown.error_code == LocalFallbackAIService.ERROR_CODE
+    assert service.stats()["answered"] == 2
@@ -0,0 +1,52 @@
+from src.infrastructure.cache.near_duplicate_index import MinHasher, NearDuplicateIndex
+
+TEMPLATE = (
+    "prezados solicito atualizacao do chamado {numero} aberto pelo cliente {nome} "
+    "referente ao sistema de faturamento que apresenta erro ao emitir notas fiscais desde ontem"
+)
+
+
+def signature(hasher: MinHasher, index: int) -> bytes:
+    return hasher.signature(TEMPLATE.format(numero=index, nome=f"cliente{index}").split())
+
+
+def db_rows(index: NearDuplicateIndex) -> int:
+    return index._connection.execute("SELECT COUNT(*) FROM near_duplicates").fetchone()[0]
+
+
+def test_finds_near_duplicates():
+    hasher = MinHasher()
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add(signature(hasher, 1), {"categoria": "Produtivo"})
+    
+    match = index.query(signature(hasher, 2))
+    unrelated = hasher.signature("feliz natal e um otimo ano novo para toda a equipe querida".split())
+    
+    assert match is not None and match[1] == {"categoria": "Produtivo"}
+    assert index.query(unrelated) is None
+
+
+def test_disk_table_stays_near_the_limit(tmp_path):
+    hasher = MinHasher()
+    index = NearDuplicateIndex(max_entries=20, db_path=str(tmp_path / "near.sqlite3"))
+    
+    for number in range(200):
+        index.add(signature(hasher, number), {"n": number})
+        assert db_rows(index) <= 20 + 2
+    
+    assert index.stats()["entries"] == 20
+    index.close()
+
+
+def test_reloads_most_recent_entries(tmp_path):
+    path = str(tmp_path / "near.sqlite3")
+    hasher = MinHasher()
+    index = NearDuplicateIndex(max_entries=20, db_path=path)
+    for number in range(50):
+        index.add(signature(hasher, number), {"n": number})
+    index.close()
+    
+    reopened = NearDuplicateIndex(max_entries=20, db_path=path)
+    assert reopened.stats()["entries"] == 20
+    assert reopened._entries[signature(hasher, 49)][1] == {"n": 49}
+    reopened.close()
@@ -0,0 +1,113 @@
+import asyncio
+import importlib
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from src.infrastructure.observability.metrics import PipelineMetrics
+from src.infrastructure.observability.middleware import MetricsMiddleware, ProfilingMiddleware
+from src.infrastructure.observability.profiler import (
+    ProfileStore, ProfileTokenSigner, ProfilingAuthorizer, SamplingProfiler
+)
+
+
+def build_app(metrics: PipelineMetrics) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        if job_id == "inexistente":
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        return {"id": job_id}
+    
+    @app.get("/falha")
+    async def fail():
+        raise RuntimeError("falha simulada")
+    
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return app
+
+
+def get(app: FastAPI, *paths: str):
+    async def run():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            return [(await client.get(path)).status_code for path in paths]
+    
+    return asyncio.run(run())
+
+
+def test_requests_are_labelled_with_the_route_template():
+    metrics = PipelineMetrics()
+    
+    assert get(build_app(metrics), "/jobs/a1", "/jobs/b2", "/jobs/c3", "/jobs/inexistente") == [200, 200, 200, 404]
+    
+    assert metrics.requests.value("GET", "/jobs/{job_id}", "200") == 3
+    assert metrics.requests.value("GET", "/jobs/{job_id}", "404") == 1
+    assert metrics.request_duration.count("GET", "/jobs/{job_id}") == 4
+    # Nenhuma série por id
+    assert "a1" not in metrics.render()
+
+
+def test_unmatched_paths_and_errors_share_fixed_labels():
+    metrics = PipelineMetrics()
+    
+    assert get(build_app(metrics), "/nao/existe/1", "/outra/2", "/falha") == [404, 404, 500]
+    
+    assert metrics.requests.value("GET", MetricsMiddleware.UNMATCHED_PATH, "404") == 2
+    assert metrics.requests.value("GET", "/falha", "500") == 1
+    assert "/nao/existe" not in metrics.render()
+
+
+def profiled_app(authorizer: ProfilingAuthorizer):
+    app = FastAPI()
+    store = ProfileStore()
+    
+    @app.get("/processar")
+    async def process():
+        return {"ok": True}
+    
+    app.add_middleware(ProfilingMiddleware, profiler=SamplingProfiler(), store=store, authorize=authorizer)
+    return app, store
+
+
+def profile_id(app: FastAPI, path: str, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            return (await client.get(path, headers=headers)).headers.get("x-profile-id")
+    
+    return asyncio.run(run())
+
+
+def test_query_flag_only_profiles_in_debug():
+    production, production_store = profiled_app(ProfilingAuthorizer(allow_query_flag=False))
+    debug, debug_store = profiled_app(ProfilingAuthorizer(allow_query_flag=True))
+    
+    assert profile_id(production, "/processar?profile=1") is None
+    assert production_store.list()["solicitados"] == []
+    
+    assert debug_store.get(profile_id(debug, "/processar?profile=1")) is not None
+    assert profile_id(debug, "/processar?profile=10") is None
+
+
+def test_signed_header_profiles_without_debug():
+    signer = ProfileTokenSigner("segredo")
+    app, store = profiled_app(ProfilingAuthorizer(signer, allow_query_flag=False))
+    
+    assert profile_id(app, "/processar", {"X-Profile-Token": ProfileTokenSigner("outro").sign()}) is None
+    assert store.get(profile_id(app, "/processar", {"X-Profile-Token": signer.sign()})) is not None
+
+
+def test_query_flag_follows_debug(monkeypatch):
+    import config
+    
+    try:
+        monkeypatch.setenv("DEBUG", "false")
+        assert importlib.reload(config).ProfilingConfig.QUERY_FLAG is False
+        
+        monkeypatch.setenv("DEBUG", "true")
+        assert importlib.reload(config).ProfilingConfig.QUERY_FLAG is True
+    finally:
+        monkeypatch.undo()
+        importlib.reload(config)
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.domain.exceptions import FileParsingError
+from src.infrastructure.parsers.pdf_extraction_pool import PDFExtractionPool
+from src.infrastructure.parsers.pdf_parser import PDFParser
+
+
+class BlockingParser(PDFParser):
+    """Parser que só termina quando o teste libera (uma thread travada no PyPDF2)"""
+    
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+    
+    def parse(self, file_content) -> str:
+        self.release.wait(5)
+        return bytes(file_content).decode()
+
+
+class SlowParser(PDFParser):
+    """Parser que trava nos conteúdos b"lento"; roda no processo filho (precisa ser serializável)"""
+    
+    def parse(self, file_content) -> str:
+        if bytes(file_content) == b"lento":
+            time.sleep(60)
+        return bytes(file_content).decode()
+
+
+def test_thread_mode_refuses_new_pdfs_while_expired_threads_run():
+    parser = BlockingParser()
+    pool = PDFExtractionPool(parser, max_workers=0, timeout_seconds=0.05, thread_workers=1)
+    
+    async def run():
+        with pytest.raises(FileParsingError) as timeout:
+            await pool.extract(b"primeiro")
+        assert timeout.value.code == "pdf_timeout"
+        
+        # A thread expirada ainda ocupa a única vaga
+        with pytest.raises(FileParsingError) as saturated:
+            await pool.extract(b"segundo")
+        assert saturated.value.code == "pdf_extracao_saturada"
+        
+        parser.release.set()
+        while pool.stats()["threads_busy"]:
+            await asyncio.sleep(0.01)
+        return await pool.extract(b"terceiro")
+    
+    try:
+        assert asyncio.run(run()) == "terceiro"
+        assert pool.stats()["timeouts"] == 1
+        assert pool.stats()["saturated"] == 1
+    finally:
+        parser.release.set()
+        pool.shutdown()
+
+
+def test_process_timeout_recycles_the_pool():
+    pool = PDFExtractionPool(SlowParser(), max_workers=1, timeout_seconds=3.0)
+    
+    async def run():
+        first = pool._get_executor()
+        with pytest.raises(FileParsingError) as timeout:
+            await pool.extract(b"lento")
+        assert timeout.value.code == "pdf_timeout"
+        # O pool travado foi descartado: o próximo PDF usa processos novos
+        assert pool._executor is None
+        text = await pool.extract(b"rapido")
+        assert pool._executor is not first
+        return first, text
+    
+    first, text = asyncio.run(run())
+    try:
+        assert text == "rapido"
+        assert pool.stats()["timeouts"] == 1
+    finally:
+        PDFExtractionPool._terminate(first)
+        pool.shutdown()
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeGeminiModel
+from src.domain.entities.email import Email, ProcessedText
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+from src.infrastructure.external.prompt_builder import PromptBuilder
+from src.infrastructure.observability.instrumented_ai_service import InstrumentedAIService
+from src.infrastructure.observability.metrics import PipelineMetrics
+
+TEXTS = [
+    "!" * 55,
+    "!" * 5000,
+    "😀" * 300,
+    "?! " * 400,
+    "palavra " * 200 + "😀!" * 200,
+    "a" * 10000,
+]
+
+
+@pytest.mark.parametrize("budget", [1, 50, 51, 60, 100])
+@pytest.mark.parametrize("text", TEXTS)
+def test_truncation_always_fits_the_budget(budget, text):
+    builder = PromptBuilder(token_budget=budget)
+    
+    compact = builder.compact(Email(content=text))
+    
+    assert compact.tokens <= max(50, budget)
+    assert compact.tokens == builder.estimate_tokens(compact.text)
+
+
+def test_keeps_head_and_tail_of_long_text():
+    builder = PromptBuilder(token_budget=100)
+    text = "inicio " + "meio " * 500 + "fim"
+    
+    compact = builder.compact(Email(content=text))
+    
+    assert compact.text.startswith("inicio")
+    assert compact.text.endswith("fim")
+    assert "[...]" in compact.text
+
+
+def test_batch_prompt_tokens_are_attributed_per_email():
+    model = FakeGeminiModel(latency=0.001)
+    gemini = GeminiAIService("teste", model=model)
+    metrics = PipelineMetrics()
+    service = InstrumentedAIService(gemini, metrics)
+    bodies = ["Preciso do status do chamado 123, está parado há dias.", "Obrigado pela ajuda de ontem! " * 20]
+    items = [(Email(content=body), ProcessedText(body, body)) for body in bodies]
+    
+    results = asyncio.run(service.analyze_batch(items))
+    
+    assert model.calls == 1
+    tokens = [result.prompt_tokens for result in results]
+    # O email maior responde por mais tokens; a soma não passa do prompt enviado
+    assert tokens[1] > tokens[0] > 0
+    assert sum(tokens) <= gemini.prompt_tokens
+    assert results[0].to_dict()["tokens_prompt"] == tokens[0]
+    assert metrics.prompt_tokens.count("lote") == 2
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.infrastructure.security.middleware import SecurityMiddleware
+from src.infrastructure.security.rate_limiter import (
+    MemoryBucketStore, RateLimitExceeded, TokenBucketRateLimiter
+)
+
+
+def make_limiter(calls: int = 5, api_keys=(), max_buckets: int = 10000) -> TokenBucketRateLimiter:
+    # Relógio parado: nenhum token é reabastecido durante o teste
+    return TokenBucketRateLimiter(
+        MemoryBucketStore(max_buckets=max_buckets), calls=calls, period=60, api_keys=api_keys, clock=lambda: 1000.0
+    )
+
+
+def request_statuses(limiter: TokenBucketRateLimiter, api_keys, path: str = "/processar") -> list:
+    app = FastAPI()
+    
+    @app.get("/processar")
+    @app.get("/health")
+    @app.get("/metrics")
+    async def processar():
+        return {"ok": True}
+    
+    app.add_middleware(SecurityMiddleware, rate_limiter=limiter)
+    
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=("203.0.113.7", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            return [
+                (await client.get(path, headers={"X-API-Key": key} if key else {})).status_code
+                for key in api_keys
+            ]
+    
+    return asyncio.run(run())
+
+
+def test_limits_requests_without_key():
+    statuses = request_statuses(make_limiter(calls=5), [None] * 8)
+    
+    assert statuses.count(200) == 5
+    assert statuses.count(429) == 3
+
+
+@pytest.mark.parametrize("path", ["/health", "/metrics"])
+def test_health_and_metrics_are_not_rate_limited(path):
+    limiter = make_limiter(calls=1)
+    
+    assert request_statuses(limiter, [None] * 5, path=path) == [200] * 5
+    assert limiter.stats()["buckets"] == 0
+
+
+def test_rotating_unknown_keys_share_the_ip_bucket():
+    limiter = make_limiter(calls=5)
+    statuses = request_statuses(limiter, [f"chave-aleatoria-{index}" for index in range(20)])
+    
+    assert statuses.count(429) == 15
+    # Keys desconhecidas não criam buckets (não expulsam os de clientes legítimos)
+    assert limiter.stats()["buckets"] == 1
+
+
+def test_registered_key_gets_its_own_bucket():
+    limiter = make_limiter(calls=2, api_keys=["parceiro"])
+    statuses = request_statuses(limiter, [None, None, None, "parceiro", "parceiro", "parceiro"])
+    
+    assert statuses == [200, 200, 429, 200, 200, 429]
+
+
+def test_client_key_hashes_registered_keys():
+    limiter = make_limiter(api_keys=["parceiro"])
+    
+    assert limiter.client_key("parceiro", "10.0.0.1").startswith("key:")
+    assert "parceiro" not in limiter.client_key("parceiro", "10.0.0.1")
+    assert limiter.client_key("outra", "10.0.0.1") == "ip:10.0.0.1"
+    assert limiter.client_key(None, None) == "ip:desconhecido"
+
+
+def test_check_raises_with_retry_after():
+    limiter = make_limiter(calls=1)
+    asyncio.run(limiter.check("ip:1"))
+    
+    with pytest.raises(RateLimitExceeded) as info:
+        asyncio.run(limiter.check("ip:1"))
+    assert info.value.retry_after == pytest.approx(60.0)
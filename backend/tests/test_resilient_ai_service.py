@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeGeminiModel
+from src.domain.entities.email import Email, EmailAnalysisResult, EmailCategory, ProcessedText
+from src.domain.exceptions import AIServiceError
+from src.domain.services.interfaces import AIServiceInterface
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+from src.infrastructure.resilience.circuit_breaker import CircuitBreaker
+from src.infrastructure.resilience.resilient_ai_service import ResilientAIService
+
+TEXT = "Solicito atualização do chamado 123 aberto na semana passada."
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedAIService(AIServiceInterface):
+    """
+    Upstream falso com o comportamento de cada chamada definido no teste:
+    ("ok", latência), ("erro", retentável) ou ("trava",) (nunca responde).
+    Depois do roteiro, repete o último passo.
+    """
+    
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+    
+    async def analyze_email(self, email: Email, processed_text: ProcessedText) -> EmailAnalysisResult:
+        step = self.steps[min(self.calls, len(self.steps) - 1)]
+        self.calls += 1
+        
+        if step[0] == "erro":
+            await asyncio.sleep(0)
+            raise AIServiceError("ia_indisponivel", "falha simulada", retryable=step[1])
+        if step[0] == "trava":
+            await asyncio.Event().wait()
+        
+        await asyncio.sleep(step[1])
+        return EmailAnalysisResult(category=EmailCategory.UNPRODUCTIVE, response=f"resposta {self.calls}")
+    
+    async def analyze_batch(self, items):
+        return [await self.analyze_email(email, processed_text) for email, processed_text in items]
+
+
+def make_service(upstream: AIServiceInterface, breaker: CircuitBreaker = None, **kwargs) -> ResilientAIService:
+    options = dict(timeout_seconds=1.0, deadline_seconds=2.0, max_retries=2, backoff_base=0.001, backoff_max=0.002)
+    options.update(kwargs)
+    return ResilientAIService(upstream, circuit_breaker=breaker, rng=random.Random(0), **options)
+
+
+def analyze(service: AIServiceInterface) -> EmailAnalysisResult:
+    return asyncio.run(service.analyze_email(Email(content=TEXT), ProcessedText(TEXT, TEXT)))
+
+
+def test_retries_transient_failures():
+    upstream = ScriptedAIService(("erro", True), ("erro", True), ("ok", 0))
+    service = make_service(upstream)
+    
+    result = analyze(service)
+    
+    assert result.error is None
+    assert upstream.calls == 3
+    assert service.stats()["retries"] == 2
+    assert service.stats()["circuit"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_does_not_retry_non_retryable_errors():
+    upstream = ScriptedAIService(("erro", False))
+    service = make_service(upstream)
+    
+    result = analyze(service)
+    
+    assert result.error_code == "ia_indisponivel"
+    assert upstream.calls == 1
+    # O upstream respondeu: um erro da requisição não conta contra o circuito
+    assert service.stats()["circuit"]["consecutive_failures"] == 0
+
+
+def test_gives_up_at_the_deadline():
+    upstream = ScriptedAIService(("ok", 5.0))
+    service = make_service(upstream, timeout_seconds=0.05, deadline_seconds=0.12, max_retries=10)
+    start = time.monotonic()
+    
+    result = analyze(service)
+    
+    assert result.error_code == "ia_timeout"
+    assert time.monotonic() - start < 1.0
+    assert upstream.calls <= 3
+
+
+def test_hedged_request_wins_over_slow_first_call():
+    upstream = ScriptedAIService(("ok", 5.0), ("ok", 0.01))
+    service = make_service(upstream, hedge_after=0.02)
+    
+    result = analyze(service)
+    
+    assert result.response == "resposta 2"
+    assert service.stats()["hedged"] == 1
+    assert service.stats()["hedge_wins"] == 1
+
+
+def test_fake_gemini_model_faults_fall_back_to_error_result():
+    model = FakeGeminiModel(latency=0.001, failure_rate=1.0, error_status=503)
+    service = make_service(GeminiAIService("teste", model=model, propagate_errors=True), max_retries=1)
+    
+    result = analyze(service)
+    
+    assert result.error_code == "ia_indisponivel"
+    assert model.calls == 2
+
+
+def test_circuit_breaker_transitions():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    # Apenas uma chamada de teste por vez
+    assert not breaker.allow_request()
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    clock.now = 20.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["opened"] == 2
+
+
+def test_circuit_opens_after_exhausted_calls_and_fails_fast():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    upstream = ScriptedAIService(("erro", True))
+    service = make_service(upstream, breaker, max_retries=0)
+    
+    assert analyze(service).error_code == "ia_indisponivel"
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    assert analyze(service).error_code == "ia_circuito_aberto"
+    assert upstream.calls == 1
+
+
+@pytest.mark.parametrize("cancel", ["task", "stream"])
+def test_cancelled_half_open_probe_does_not_wedge_the_circuit(cancel):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    upstream = ScriptedAIService(("erro", True), ("trava",), ("ok", 0))
+    service = make_service(upstream, breaker, max_retries=0, timeout_seconds=30.0, deadline_seconds=30.0)
+    email, processed_text = Email(content=TEXT), ProcessedText(TEXT, TEXT)
+    
+    assert analyze(service).error is not None
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    
+    async def cancel_probe():
+        if cancel == "task":
+            probe = asyncio.ensure_future(service.analyze_email(email, processed_text))
+        else:
+            # Cliente do SSE que desconecta durante a sonda
+            async def consume():
+                async for _ in service.analyze_email_stream(email, processed_text):
+                    pass
+            probe = asyncio.ensure_future(consume())
+        
+        await asyncio.sleep(0.01)
+        assert upstream.calls == 2
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+    
+    asyncio.run(cancel_probe())
+    
+    # Upstream recuperado: a próxima chamada é a nova sonda e fecha o circuito
+    result = analyze(service)
+    
+    assert result.error is None
+    assert breaker.state == CircuitBreaker.CLOSED
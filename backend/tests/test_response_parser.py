@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.fakes import FakeResponse
+from src.domain.entities.email import Email, EmailCategory, ProcessedText, StreamEventType
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+from src.infrastructure.external.response_parser import ResponseParser, StreamingResponseParser
+
+TEXT = "Preciso do status do chamado 123, aberto na semana passada."
+VALID = '{"categoria": "Produtivo", "resposta": "Vamos verificar o chamado."}'
+
+
+class ScriptedModel:
+    """Modelo falso que devolve as respostas na ordem dada (repetindo a última)"""
+    
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+    
+    async def generate_content_async(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return FakeResponse(self.answers[min(len(self.prompts), len(self.answers)) - 1])
+
+
+@pytest.mark.parametrize("text", [
+    VALID,
+    f"```json\n{VALID}\n```",
+    f"Claro! Segue a análise:\n{VALID}\nQualquer dúvida, estou à disposição.",
+    # Chave solta antes do objeto: o próximo candidato é tentado
+    f"Formato {{categoria, resposta}}: {VALID}",
+    '{"categoria": "Produtivo", "resposta": "Vamos verificar o chamado.",}',
+    '{"categoria": "productive", "resposta": "Vamos verificar o chamado."}',
+])
+def test_extracts_the_object_from_tolerated_noise(text):
+    result = ResponseParser().parse_single(text)
+    
+    assert result.category is EmailCategory.PRODUCTIVE
+    assert result.response == "Vamos verificar o chamado."
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Não consegui analisar o email.",
+    '{"categoria": "Talvez", "resposta": "ok"}',
+    '{"categoria": "Produtivo", "resposta": "   "}',
+])
+def test_rejects_invalid_objects(text):
+    parser = ResponseParser()
+    
+    assert parser.parse_single(text) is None
+    assert parser.stats()["parse_failures"] == 1
+
+
+def test_batch_keeps_only_valid_items_with_known_ids():
+    answer = json.dumps([
+        {"id": 0, "categoria": "Produtivo", "resposta": "a"},
+        {"id": 1, "categoria": "Outro", "resposta": "b"},
+        {"id": 5, "categoria": "Improdutivo", "resposta": "c"},
+        {"id": True, "categoria": "Improdutivo", "resposta": "d"},
+        "texto solto",
+        {"id": 2, "categoria": "Improdutivo", "resposta": "e"},
+    ])
+    
+    parsed = ResponseParser().parse_batch(f"Resultado:\n```json\n{answer}\n```", expected=3)
+    
+    assert sorted(parsed) == [0, 2]
+    assert parsed[2].category is EmailCategory.UNPRODUCTIVE
+    assert ResponseParser().parse_batch(VALID, expected=3) is None
+
+
+def test_invalid_response_is_repaired_with_a_short_prompt():
+    model = ScriptedModel('categoria: Produtivo\nresposta: "Vamos verificar."', VALID)
+    service = GeminiAIService("teste", model=model)
+    
+    result = asyncio.run(service.analyze_email(Email(content=TEXT), ProcessedText(TEXT, TEXT)))
+    stats = service._response_parser.stats()
+    
+    assert result.error is None
+    assert result.response == "Vamos verificar o chamado."
+    assert len(model.prompts) == 2
+    # O reparo reenvia a resposta, não o email
+    assert "categoria: Produtivo" in model.prompts[1]
+    assert TEXT not in model.prompts[1]
+    assert stats["parse_failures"] == 1
+    assert stats["repairs"] == stats["repairs_succeeded"] == 1
+
+
+def test_failed_repair_returns_the_invalid_response_result():
+    model = ScriptedModel("resposta inválida")
+    service = GeminiAIService("teste", model=model)
+    
+    result = asyncio.run(service.analyze_email(Email(content=TEXT), ProcessedText(TEXT, TEXT)))
+    
+    assert result.error == "Resposta da IA em formato inválido"
+    # Apenas uma tentativa de reparo
+    assert len(model.prompts) == 2
+    assert service._response_parser.stats()["repair_success_rate"] == 0.0
+
+
+def test_streaming_parser_waits_for_complete_escapes():
+    text = '{"categoria": "Improdutivo", "resposta": "Obrigado \\u00e9 \\ud83d\\ude00 \\"até\\" logo"}'
+    parser = StreamingResponseParser()
+    events = [event for char in text for event in parser.feed(char)]
+    
+    assert events[0].type is StreamEventType.CATEGORY and events[0].text == "Improdutivo"
+    assert all(event.type is StreamEventType.DELTA for event in events[1:])
+    assert "".join(event.text for event in events[1:]) == 'Obrigado é 😀 "até" logo'
+    assert parser.text == text
@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.infrastructure.cache.cached_ai_service import CachedAIService
+from src.infrastructure.cache.result_cache import MemoryResultCache, SQLiteResultCache
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteResultCache(path)
+    cache.set("a", {"categoria": "Produtivo"})
+    cache.close()
+    
+    reopened = SQLiteResultCache(path)
+    assert reopened.get("a") == {"categoria": "Produtivo"}
+    assert reopened.get("b") is None
+    assert reopened.stats()["hits"] == 1
+    reopened.close()
+
+
+def test_size_stays_near_the_limit_and_keeps_hot_entries(tmp_path):
+    cache = SQLiteResultCache(str(tmp_path / "cache.sqlite3"), max_entries=20)
+    cache.set("quente", {"n": -1})
+    
+    for index in range(200):
+        cache.set(f"k{index}", {"n": index})
+        assert cache.get("quente") == {"n": -1}
+        assert cache.stats()["entries"] <= 20 + 2
+    
+    assert cache.stats()["evictions"] >= 178
+    assert cache.get("k199") == {"n": 199}
+    assert cache.get("k0") is None
+    cache.close()
+
+
+def test_hits_do_not_write_until_flushed(tmp_path):
+    cache = SQLiteResultCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", {"n": 1})
+    changes = cache._connection.total_changes
+    
+    for _ in range(SQLiteResultCache.ACCESS_FLUSH_EVERY - 1):
+        assert cache.get("a") == {"n": 1}
+    assert cache._connection.total_changes == changes
+    
+    for index in range(SQLiteResultCache.ACCESS_FLUSH_EVERY):
+        cache.set(f"k{index}", {"n": index})
+        cache.get(f"k{index}")
+    assert cache._connection.total_changes > changes + SQLiteResultCache.ACCESS_FLUSH_EVERY
+    cache.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = SQLiteResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.01)
+    cache.set("a", {"n": 1})
+    time.sleep(0.02)
+    
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_cached_service_closes_disk_cache(tmp_path):
+    disk = SQLiteResultCache(str(tmp_path / "cache.sqlite3"))
+    service = CachedAIService(ai_service=None, memory_cache=MemoryResultCache(), disk_cache=disk)
+    
+    service.close()
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        disk._connection.execute("SELECT 1")
@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+
+from src.infrastructure.security.middleware import SecurityMiddleware
+
+
+def make_app(max_body_size: int = 1024):
+    app = FastAPI()
+    app.state.calls = 0
+    
+    @app.post("/processar")
+    async def processar(request: Request):
+        app.state.calls += 1
+        return {"bytes": len(await request.body())}
+    
+    app.add_middleware(SecurityMiddleware, max_body_size=max_body_size)
+    return app
+
+
+def post(app: FastAPI, content, headers=None) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            return await client.post("/processar", content=content, headers=headers)
+    
+    return asyncio.run(run())
+
+
+async def chunks(count: int, size: int = 256):
+    for _ in range(count):
+        yield b"a" * size
+
+
+def test_adds_security_headers():
+    response = post(make_app(), b"ok")
+    
+    assert response.status_code == 200
+    for name, value in SecurityMiddleware.SECURITY_HEADERS:
+        assert response.headers[name.decode()] == value.decode()
+
+
+def test_rejects_declared_oversized_body_before_the_app():
+    app = make_app()
+    
+    response = post(app, b"a" * 2048)
+    
+    assert response.status_code == 413
+    assert response.json()["status_code"] == 413
+    assert "x-frame-options" in response.headers
+    assert app.state.calls == 0
+
+
+def test_counts_bytes_of_bodies_without_content_length():
+    app = make_app()
+    
+    small = post(app, chunks(2))
+    large = post(app, chunks(40))
+    
+    assert small.status_code == 200 and small.json() == {"bytes": 512}
+    assert large.status_code == 413
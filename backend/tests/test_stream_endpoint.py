@@ -0,0 +1,78 @@
+import asyncio
+import importlib
+import json
+
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeAIService, FakeGeminiModel
+from src.infrastructure.external.gemini_ai_service import GeminiAIService
+
+TEXT = "Preciso do status do chamado 123, aberto na semana passada."
+REPLY = "Olá! Vamos verificar o chamado \"123\" e retornamos em breve."
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Envia um POST para /processar/stream com o serviço de IA informado e devolve os eventos SSE"""
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    monkeypatch.setenv("JOBS_ENABLED", "false")
+    import config
+    # Outros testes recarregam o config: sem isso o main criaria o banco de jobs no diretório atual
+    importlib.reload(config)
+    import main
+    from src.infrastructure.dependency_container import DependencyContainer
+    
+    def post(ai_service, **form):
+        monkeypatch.setattr(main, "email_controller", DependencyContainer("teste", ai_service=ai_service).email_controller)
+        
+        async def run():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+                return await client.post("/processar/stream", data=form)
+        
+        response = asyncio.run(run())
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        return parse_events(response.text)
+    
+    return post
+
+
+def parse_events(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_events_arrive_as_category_then_reply_chunks_then_result(stream):
+    answer = json.dumps({"categoria": "Improdutivo", "resposta": REPLY}, ensure_ascii=False)
+    model = FakeGeminiModel(latency=0.01, response_text=answer, chunk_size=7)
+    
+    events = stream(GeminiAIService("teste", model=model), body=TEXT)
+    names = [name for name, _ in events]
+    
+    assert names[0] == "categoria" and events[0][1] == {"categoria": "Improdutivo"}
+    assert names[-1] == "resultado"
+    assert set(names[1:-1]) == {"resposta"} and len(names) > 4
+    # Os trechos reconstroem exatamente a resposta final
+    assert "".join(data["texto"] for _, data in events[1:-1]) == REPLY
+    assert events[-1][1]["categoria"] == "Improdutivo"
+    assert events[-1][1]["resposta"] == REPLY
+
+
+def test_non_streaming_service_emits_the_same_order(stream):
+    events = stream(FakeAIService(latency=0), body=TEXT)
+    
+    assert [name for name, _ in events] == ["categoria", "resposta", "resultado"]
+    assert events[1][1]["texto"] == events[2][1]["resposta"]
+
+
+def test_invalid_input_emits_only_the_result(stream):
+    events = stream(FakeAIService(latency=0), body="oi")
+    
+    assert [name for name, _ in events] == ["resultado"]
+    assert events[0][1]["erro"]
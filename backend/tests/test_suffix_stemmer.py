@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from src.infrastructure.external.hybrid_processor import HybridTextProcessor
+from src.infrastructure.external.suffix_stemmer import SuffixStemmer
+
+
+def linear_stem(rules, word: str) -> str:
+    """Varredura linear original: a primeira regra da lista que casa"""
+    for suffix, replacement in rules:
+        if word.endswith(suffix) and len(word) > len(suffix) + 2:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+PROCESSOR_RULES = HybridTextProcessor()._suffix_rules
+
+
+@pytest.mark.parametrize("rules, word, expected", [
+    # A ordem da lista vence o sufixo mais longo
+    ([("s", ""), ("os", "x")], "carros", "carro"),
+    ([("os", "x"), ("s", "")], "carros", "carrx"),
+    # O sufixo mais longo não cabe na palavra: vale a próxima regra que casa
+    ([("mente", ""), ("te", "")], "mente", "men"),
+    # Regras duplicadas: vale a primeira
+    ([("ção", "r"), ("ção", "X")], "informação", "informar"),
+    ([("ção", "r"), ("ação", "ar")], "informação", "informar"),
+    ([("ando", "ar")], "ando", "ando"),
+])
+def test_matches_linear_scan_priority(rules, word, expected):
+    assert SuffixStemmer(rules).stem(word) == expected == linear_stem(rules, word)
+
+
+def test_matches_linear_scan_on_random_words():
+    stemmer = SuffixStemmer(PROCESSOR_RULES)
+    rng = random.Random(3)
+    suffixes = [suffix for suffix, _ in PROCESSOR_RULES] + ["", "s", "ões"]
+    
+    for _ in range(5000):
+        stem = "".join(rng.choice("abcdeimnorstuçã") for _ in range(rng.randint(0, 6)))
+        word = stem + rng.choice(suffixes) + rng.choice(["", "", rng.choice(suffixes)])
+        assert stemmer.stem(word) == linear_stem(PROCESSOR_RULES, word), word
+
+
+def test_memo_counts_hits_and_stays_bounded():
+    stemmer = SuffixStemmer(PROCESSOR_RULES, memo_size=2)
+    
+    for word in ["falando", "falando", "correndo", "partindo", "falando"]:
+        stemmer.stem(word)
+    stats = stemmer.stats()
+    
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["entries"] == 2
@@ -0,0 +1,87 @@
+import asyncio
+import io
+import mmap
+import tempfile
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from src.infrastructure.security.middleware import FileSecurityValidator
+
+TEXT = "Preciso do status do chamado 123, aberto na semana passada.\n".encode()
+
+
+class CountingUploadFile(UploadFile):
+    """UploadFile que conta as leituras e os bytes lidos"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+        self.bytes_read = 0
+    
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        data = await super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def read_and_validate(file: UploadFile):
+    return asyncio.run(FileSecurityValidator.read_and_validate(file))
+
+
+def test_reads_a_small_upload_once():
+    file = CountingUploadFile(io.BytesIO(TEXT), size=len(TEXT), filename="email.txt")
+    
+    assert read_and_validate(file) == TEXT
+    assert file.reads == 1
+
+
+def test_maps_spooled_uploads_instead_of_reading_them():
+    spooled = tempfile.SpooledTemporaryFile(max_size=16)
+    spooled.write(b"%PDF-1.4 " + TEXT)
+    spooled.seek(0)
+    file = CountingUploadFile(spooled, size=len(TEXT) + 9, filename="documento.pdf")
+    
+    content = read_and_validate(file)
+    
+    assert isinstance(content, mmap.mmap)
+    assert content[:4] == b"%PDF"
+    assert file.reads == 0
+    content.close()
+
+
+def test_rejects_a_known_oversized_upload_without_reading(monkeypatch):
+    monkeypatch.setattr(FileSecurityValidator, "MAX_FILE_SIZE", 1024)
+    file = CountingUploadFile(io.BytesIO(b"a" * 4096), size=4096, filename="email.txt")
+    
+    with pytest.raises(HTTPException) as info:
+        read_and_validate(file)
+    
+    assert info.value.status_code == 413
+    assert file.reads == 0
+
+
+def test_stops_reading_an_unsized_upload_past_the_limit(monkeypatch):
+    monkeypatch.setattr(FileSecurityValidator, "MAX_FILE_SIZE", 1024)
+    monkeypatch.setattr(FileSecurityValidator, "READ_CHUNK_SIZE", 256)
+    file = CountingUploadFile(io.BytesIO(b"a" * 100_000), filename="email.txt")
+    
+    with pytest.raises(HTTPException) as info:
+        read_and_validate(file)
+    
+    assert info.value.status_code == 413
+    assert file.bytes_read <= 1024 + 256
+
+
+@pytest.mark.parametrize("filename, content, status", [
+    ("planilha.xlsx", TEXT, 400),
+    ("documento.pdf", TEXT, 400),
+])
+def test_rejects_bad_extension_or_signature(filename, content, status):
+    file = CountingUploadFile(io.BytesIO(content), size=len(content), filename=filename)
+    
+    with pytest.raises(HTTPException) as info:
+        read_and_validate(file)
+    
+    assert info.value.status_code == status